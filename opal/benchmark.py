@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the news parsers, court table parsing and court URL
+pagination
+
+Every benchmark runs against recorded HTML in tests/fixtures, so no network
+or browser is needed. Results can be saved as a baseline and later runs are
+compared against it: a benchmark that is slower than its baseline by more
+than the threshold fails the run with exit code 1.
+
+    python -m opal.benchmark --save-baseline    # on the CI machine, once
+    python -m opal.benchmark --check            # fails on regressions or a missing baseline
+
+With --scale the benchmarks are replaced by scaling curves: corpora of the
+given sizes are generated by opal.synthetic_corpus and parsed one document at
+a time, reporting time, throughput and memory for each size.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+from bs4 import BeautifulSoup
+from opal.court_case_parser import ParserAppealsAL
+from opal.court_url_paginator import _decode_url, build_court_url, parse_court_url
+from opal.output_writers import write_json_atomic
+from opal.parser_module import Parser1819, ParserDailyNews
+from opal.process_memory import process_tree_rss
+from opal.synthetic_corpus import BASE_URLS, court_results_html, iter_documents
+from opal.url_catcher_module import filter_news_links
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "tests", "fixtures")
+DEFAULT_BASELINE_PATH = "benchmark_baseline.json"
+
+# Allowed slowdown against the baseline before a benchmark fails (0.25 = 25%)
+DEFAULT_THRESHOLD = 0.25
+
+# Rows in the large court results table
+DEFAULT_TABLE_ROWS = 1000
+
+# Court result pages generated and decoded by the URL benchmarks
+URL_PAGES = 500
+
+# Each timing round runs a benchmark for at least this long
+MIN_ROUND_SECONDS = 0.05
+
+
+class Benchmark:
+    """A named operation to time and the number of items it processes per call"""
+
+    def __init__(self, name: str, func: Callable[[], object], items: int = 1):
+        """
+        Args:
+            name: Name used in results and baselines
+            func: Operation to time, called without arguments
+            items: Articles, rows, links or URLs handled by one call
+        """
+        self.name = name
+        self.func = func
+        self.items = items
+
+
+def read_fixture(fixtures_dir: str, name: str) -> str:
+    """Contents of one recorded fixture file"""
+    with open(os.path.join(fixtures_dir, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def repeat_table_rows(html: str, rows: int) -> str:
+    """
+    Grow the results table of a court page to the given number of rows by
+    repeating its recorded rows
+
+    Args:
+        html: Court results page
+        rows: Data rows in the returned table
+
+    Returns:
+        HTML of the page with the larger table
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table")
+    recorded = table.find_all("tr")[1:]
+    for row in recorded:
+        row.extract()
+    body = "".join(str(recorded[i % len(recorded)]) for i in range(rows))
+    return str(soup).replace("</table>", f"{body}</table>", 1)
+
+
+def build_benchmarks(fixtures_dir: str = DEFAULT_FIXTURES_DIR, table_rows: int = DEFAULT_TABLE_ROWS,
+                     synthetic_table: bool = False) -> List[Benchmark]:
+    """
+    Set up every benchmark from the fixtures (setup is not timed)
+
+    Args:
+        fixtures_dir: Directory with the recorded HTML
+        table_rows: Rows in the large court results table
+        synthetic_table: Generate the large table with distinct synthetic
+            cases instead of repeating the recorded rows
+
+    Returns:
+        Benchmarks in the order they are run
+    """
+    article_1819 = read_fixture(fixtures_dir, "sample_1819_article.html")
+    article_daily = read_fixture(fixtures_dir, "sample_daily_article.html")
+    listing = read_fixture(fixtures_dir, "news_listing_1819.html")
+    search_url = read_fixture(fixtures_dir, "court_search_url.txt").strip()
+    if synthetic_table:
+        results_page = court_results_html(0, table_rows)
+    else:
+        results_page = repeat_table_rows(read_fixture(fixtures_dir, "court_results_page.html"), table_rows)
+
+    court_parser = ParserAppealsAL()
+    table_rows_soup = BeautifulSoup(results_page, "html.parser").find("table").find_all("tr")[1:]
+    page_urls = [build_court_url(search_url, page) for page in range(URL_PAGES)]
+    listing_url = "https://1819news.com/news"
+    listing_links = len(BeautifulSoup(listing, "html.parser").find_all("a"))
+
+    def parse_table_rows():
+        return [court_parser.parse_table_row(row) for row in table_rows_soup]
+
+    def build_urls():
+        return [build_court_url(search_url, page, page_size=100) for page in range(URL_PAGES)]
+
+    def parse_urls():
+        # Decode every URL, not the lru_cache entries of the previous round
+        _decode_url.cache_clear()
+        return [parse_court_url(url) for url in page_urls]
+
+    return [
+        Benchmark("parser_1819.parse_article",
+                  lambda: Parser1819().parse_article(article_1819, "https://1819news.com/news/item/a")),
+        Benchmark("daily_news.parse_article",
+                  lambda: ParserDailyNews().parse_article(article_daily, "https://www.aldailynews.com/a/")),
+        Benchmark("appeals_al.parse_table_row", parse_table_rows, table_rows),
+        Benchmark("appeals_al.parse_results_html",
+                  lambda: court_parser.parse_results_html(results_page), table_rows),
+        Benchmark("url_catcher.filter_news_links",
+                  lambda: filter_news_links(listing, listing_url, "https://1819news.com/", "/news/item", set()),
+                  listing_links),
+        Benchmark("court_url.build_court_url", build_urls, URL_PAGES),
+        Benchmark("court_url.parse_court_url", parse_urls, URL_PAGES),
+    ]
+
+
+def time_benchmark(benchmark: Benchmark, repeat: int = 5) -> Dict:
+    """
+    Time a benchmark over several rounds, each long enough to measure reliably
+
+    Args:
+        benchmark: Benchmark to run
+        repeat: Number of timed rounds
+
+    Returns:
+        Dictionary with seconds per call (min, median, max), seconds per item
+        and the calls made per round
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            benchmark.func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_ROUND_SECONDS:
+            break
+        loops *= 2
+
+    per_call = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            benchmark.func()
+        per_call.append((time.perf_counter() - start) / loops)
+
+    return {
+        "min": min(per_call),
+        "median": statistics.median(per_call),
+        "max": max(per_call),
+        "per_item": min(per_call) / benchmark.items,
+        "items": benchmark.items,
+        "loops": loops,
+    }
+
+
+def run_benchmarks(benchmarks: List[Benchmark], repeat: int = 5,
+                   names: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """
+    Time benchmarks and print one line per result
+
+    Args:
+        benchmarks: Benchmarks from build_benchmarks
+        repeat: Number of timed rounds per benchmark
+        names: Only run benchmarks whose name contains one of these (None for all)
+
+    Returns:
+        Timings by benchmark name
+    """
+    results = {}
+    for benchmark in benchmarks:
+        if names and not any(name in benchmark.name for name in names):
+            continue
+        result = results[benchmark.name] = time_benchmark(benchmark, repeat)
+        print(f"{benchmark.name:<32} {result['min'] * 1000:10.3f} ms/call "
+              f"{result['per_item'] * 1e6:10.2f} us/item  ({result['items']} items, {result['loops']} loops)")
+    return results
+
+
+def compare_to_baseline(results: Dict[str, Dict], baseline: Dict[str, Dict],
+                        threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Find benchmarks that got slower than their baseline by more than the threshold
+
+    The fastest round of each run is compared, which is the least affected by
+    other load on the machine. Benchmarks missing from the baseline are skipped.
+
+    Args:
+        results: Timings from run_benchmarks
+        baseline: Timings saved by an earlier run
+        threshold: Allowed slowdown as a fraction (0.25 = 25%)
+
+    Returns:
+        One dictionary per regression with name, baseline, current and change
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["min"]
+        change = result["min"] / before - 1 if before else 0.0
+        if change > threshold:
+            regressions.append({"name": name, "baseline": before, "current": result["min"],
+                                "change": round(change, 4)})
+    return regressions
+
+
+def _document_parser(kind: str) -> Callable[[str], Any]:
+    """Function that parses one generated document of a kind the way the pipeline does"""
+    if kind == "1819":
+        parser = Parser1819()
+        return lambda html: parser.parse_article(html, BASE_URLS["1819"])
+    if kind == "daily":
+        parser = ParserDailyNews()
+        return lambda html: parser.parse_article(html, BASE_URLS["daily"])
+    if kind == "listing":
+        seen = set()
+        return lambda html: filter_news_links(html, BASE_URLS["1819"], BASE_URLS["1819"], "/news/item", seen)
+    if kind == "court":
+        parser = ParserAppealsAL()
+        return lambda html: parser.parse_results_html(html)["cases"]
+    raise ValueError(f"Unknown document kind: {kind}")
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident memory of this process, or None where it cannot be read"""
+    return process_tree_rss(os.getpid()).get(os.getpid())
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """Highest resident memory of this process so far (Unix only)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure_scaling(kind: str, count: int, seed: int = 0, keep: bool = False) -> Dict:
+    """
+    Parse a generated corpus one document at a time and measure time and memory
+
+    Args:
+        kind: Document kind of opal.synthetic_corpus ('1819', 'daily', 'listing' or 'court')
+        count: Articles, listing links or court cases in the corpus
+        seed: Corpus seed
+        keep: Hold every parsed result in memory, as the json output format does,
+            instead of discarding it like the streaming formats
+
+    Returns:
+        Dictionary with document and item counts, generation and parse seconds,
+        parse throughput and resident memory after the run and at its peak
+    """
+    parse = _document_parser(kind)
+    kept = []
+    documents = items = 0
+    parse_seconds = 0.0
+    start = time.perf_counter()
+    for _, html, doc_items in iter_documents(kind, count, seed):
+        parse_start = time.perf_counter()
+        result = parse(html)
+        parse_seconds += time.perf_counter() - parse_start
+        if keep:
+            kept.append(result)
+        documents += 1
+        items += doc_items
+    total_seconds = time.perf_counter() - start
+    return {
+        "kind": kind,
+        "count": count,
+        "documents": documents,
+        "items": items,
+        "generate_seconds": round(total_seconds - parse_seconds, 3),
+        "parse_seconds": round(parse_seconds, 3),
+        "items_per_second": round(items / parse_seconds, 1) if parse_seconds else None,
+        "rss_bytes": _rss_bytes(),
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "kept": len(kept),
+    }
+
+
+def run_scaling(kind: str, counts: List[int], seed: int = 0, keep: bool = False) -> List[Dict]:
+    """
+    Measure a scaling curve over increasing corpus sizes and print one line per size
+
+    Peak memory is the peak of the whole process, so sizes are run smallest first.
+    """
+    curve = []
+    for count in sorted(counts):
+        point = measure_scaling(kind, count, seed, keep)
+        curve.append(point)
+        rss = f"{point['rss_bytes'] / 2**20:.0f} MB" if point["rss_bytes"] else "n/a"
+        peak = f"{point['peak_rss_bytes'] / 2**20:.0f} MB" if point["peak_rss_bytes"] else "n/a"
+        print(f"{kind} x {count:>9}: parse {point['parse_seconds']:9.2f} s, "
+              f"generate {point['generate_seconds']:9.2f} s, {point['items_per_second']} items/s, "
+              f"RSS {rss}, peak {peak}")
+    return curve
+
+
+def environment() -> Dict:
+    """Machine details saved with a baseline; timings only compare on the same setup"""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def read_json(path: str) -> Dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the offline parser and pagination benchmarks')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES_DIR,
+                        help='Directory with the recorded HTML fixtures (default: tests/fixtures)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH,
+                        help=f'Baseline file to compare with or save to (default: {DEFAULT_BASELINE_PATH})')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Save these results as the new baseline instead of comparing')
+    parser.add_argument('--check', action='store_true',
+                        help='Fail with exit code 1 when there is no baseline to compare against '
+                             '(without it a missing baseline only prints a note)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Allowed slowdown against the baseline as a fraction (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Timed rounds per benchmark (default: 5)')
+    parser.add_argument('--table-rows', type=int, default=DEFAULT_TABLE_ROWS,
+                        help=f'Rows in the large court results table (default: {DEFAULT_TABLE_ROWS})')
+    parser.add_argument('--synthetic-table', action='store_true',
+                        help='Generate the large court table with distinct synthetic cases '
+                             'instead of repeating the recorded rows')
+    parser.add_argument('--only', action='append',
+                        help='Only run benchmarks whose name contains this text (repeatable)')
+    parser.add_argument('--scale', type=int, nargs='+', metavar='COUNT',
+                        help='Measure a scaling curve over synthetic corpora of these sizes instead '
+                             'of running the benchmarks (e.g. 10000 100000 1000000)')
+    parser.add_argument('--scale-kind', choices=['1819', 'daily', 'listing', 'court'], default='1819',
+                        help='Documents of the scaling corpus (default: 1819 articles)')
+    parser.add_argument('--scale-keep', action='store_true',
+                        help='Keep every parsed result in memory, like --format json does')
+    parser.add_argument('--scale-output', help='Write the scaling curve as JSON to this file')
+    args = parser.parse_args()
+
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    if args.table_rows < 1:
+        parser.error("--table-rows must be at least 1")
+    if args.threshold < 0:
+        parser.error("--threshold must not be negative")
+    if args.check and (args.save_baseline or args.scale):
+        parser.error("--check compares against a baseline and cannot be combined with --save-baseline or --scale")
+
+    if args.scale:
+        if min(args.scale) < 1:
+            parser.error("--scale sizes must be at least 1")
+        curve = run_scaling(args.scale_kind, args.scale, keep=args.scale_keep)
+        if args.scale_output:
+            write_json_atomic(args.scale_output, {"environment": environment(), "curve": curve})
+            print(f"\nScaling curve saved to {args.scale_output}")
+        return
+
+    settings = {"table_rows": args.table_rows, "synthetic_table": args.synthetic_table}
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        baseline = read_json(args.baseline)
+        if baseline.get("settings") != settings:
+            parser.error(f"{args.baseline} was recorded with {baseline.get('settings')}, "
+                         f"not {settings}; use the same settings or --save-baseline")
+        if baseline.get("environment") != environment():
+            print(f"Warning: {args.baseline} was recorded on a different setup: {baseline.get('environment')}")
+    elif args.check:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        sys.exit(1)
+
+    results = run_benchmarks(build_benchmarks(args.fixtures, args.table_rows, args.synthetic_table),
+                             args.repeat, args.only)
+
+    if args.save_baseline:
+        write_json_atomic(args.baseline, {"environment": environment(), "settings": settings,
+                                          "results": results})
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+
+    regressions = compare_to_baseline(results, baseline["results"], args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression['name']}: {regression['baseline'] * 1000:.3f} ms -> "
+                  f"{regression['current'] * 1000:.3f} ms ({regression['change']:+.0%})")
+        sys.exit(1)
+    print(f"\nNo regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
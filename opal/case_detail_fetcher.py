@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Case Detail Fetcher for Alabama Appeals Court Public Portal
+Follows the case_number links from a results extraction and parses each
+case's detail page into parties, docket entries and judges
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from opal.court_case_parser import ParserAppealsAL, PORTAL_BASE_URL, case_fingerprint
+from opal.log_config import add_logging_arguments, configure_logging
+from opal.rate_limiter import RateLimiter
+
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CACHE_PATH = "case_detail_cache.jsonl"
+
+# A detail page counts as loaded once it shows a definition list or a table
+DETAIL_WAIT_SELECTOR = "dl, table"
+
+# Report fetch progress after this many newly fetched cases
+PROGRESS_EVERY = 50
+
+# Header keywords used to recognize the tables on a case detail page
+PARTY_KEYWORDS = ('party', 'parties', 'appellant', 'appellee', 'petitioner', 'respondent', 'attorney')
+DOCKET_KEYWORDS = ('docket', 'event', 'entry', 'entries', 'activity', 'description')
+JUDGE_KEYWORDS = ('judge', 'justice', 'panel')
+
+
+def _table_headers(table) -> List[str]:
+    """Header texts of a table, taken from th cells or the first row"""
+    headers = [th.get_text(strip=True) for th in table.find_all('th')]
+    if headers:
+        return headers
+    first_row = table.find('tr')
+    if first_row:
+        return [td.get_text(strip=True) for td in first_row.find_all('td')]
+    return []
+
+
+def _table_records(table, headers: List[str]) -> List[Dict[str, str]]:
+    """Rows of a table as dictionaries keyed by header text"""
+    records = []
+    rows = table.find_all('tr')
+    for row in rows:
+        cells = row.find_all('td')
+        if not cells or [cell.get_text(strip=True) for cell in cells] == headers:
+            continue
+        record = {}
+        for i, cell in enumerate(cells):
+            key = headers[i] if i < len(headers) and headers[i] else f"column {i + 1}"
+            record[key] = cell.get_text(" ", strip=True)
+        records.append(record)
+    return records
+
+
+def _section_title(table) -> str:
+    """Text of the nearest heading before a table"""
+    heading = table.find_previous(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'legend', 'caption'])
+    return heading.get_text(strip=True) if heading else ""
+
+
+def _matches(text: str, keywords) -> bool:
+    """Check whether any keyword appears in the text"""
+    text = text.lower()
+    return any(keyword in text for keyword in keywords)
+
+
+def parse_case_detail(html: str, case_number: str, url: str) -> Dict:
+    """
+    Parse a case detail page into a structured record
+
+    Tables are sorted into parties, docket entries and judges by their
+    section heading and column headers. Label/value pairs (definition lists
+    and two-column rows) are collected into fields.
+
+    Args:
+        html: Page source of the case detail page
+        case_number: Case number the page belongs to
+        url: URL the page was loaded from
+
+    Returns:
+        Dictionary with the parsed case detail
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    record = {
+        "case_number": case_number,
+        "url": url,
+        "fetched_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "fields": {},
+        "parties": [],
+        "docket_entries": [],
+        "judges": [],
+        "other_tables": []
+    }
+
+    # Label/value pairs from definition lists
+    for term in soup.find_all('dt'):
+        value = term.find_next_sibling('dd')
+        label = term.get_text(strip=True).rstrip(':')
+        if label and value:
+            record["fields"][label] = value.get_text(" ", strip=True)
+
+    for table in soup.find_all('table'):
+        headers = _table_headers(table)
+        rows = table.find_all('tr')
+
+        # Two-column tables without a header row are label/value pairs
+        if not table.find('th') and rows and all(len(row.find_all('td')) == 2 for row in rows):
+            for row in rows:
+                label_cell, value_cell = row.find_all('td')
+                label = label_cell.get_text(strip=True).rstrip(':')
+                if label:
+                    record["fields"][label] = value_cell.get_text(" ", strip=True)
+            continue
+
+        records = _table_records(table, headers)
+        context = f"{_section_title(table)} {' '.join(headers)}"
+        if _matches(context, JUDGE_KEYWORDS):
+            record["judges"].extend(records)
+        elif _matches(context, PARTY_KEYWORDS):
+            record["parties"].extend(records)
+        elif _matches(context, DOCKET_KEYWORDS):
+            record["docket_entries"].extend(records)
+        else:
+            record["other_tables"].append({"title": _section_title(table), "rows": records})
+
+    return record
+
+
+class CaseDetailCache:
+    """
+    Case detail records keyed by case number, kept in a JSON Lines file
+
+    Every stored record is appended as one line, so saving costs the same
+    however large the cache is and a crash loses at most the line being
+    written. When a case is stored again the later line wins; compact()
+    rewrites the file with one line per case.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        """
+        Initialize the cache, loading any existing entries
+
+        Args:
+            path: Location of the cache file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries = {}
+        self._lines = 0
+        damaged = False
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                            self.entries[entry["case_number"]] = {"fingerprint": entry["fingerprint"],
+                                                                  "record": entry["record"]}
+                        except (json.JSONDecodeError, KeyError, TypeError):
+                            # A line cut short by a crash or in another format; the case is fetched again
+                            damaged = True
+                            continue
+                        self._lines += 1
+            except OSError as e:
+                logger.warning("Could not read case detail cache %s: %s", path, e)
+        if damaged:
+            # Rewrite now so new lines are not appended to the damaged one
+            self._lines = -1
+            self.compact()
+
+    def get(self, case_number: str, fingerprint: str) -> Optional[Dict]:
+        """
+        Return the cached record if the case is unchanged since it was fetched
+
+        Args:
+            case_number: Case number text
+            fingerprint: case_fingerprint of the current results row
+
+        Returns:
+            Cached detail record or None
+        """
+        with self._lock:
+            entry = self.entries.get(case_number)
+        if entry and entry.get("fingerprint") == fingerprint:
+            return entry.get("record")
+        return None
+
+    def put(self, case_number: str, fingerprint: str, record: Dict):
+        """Store a detail record for a case and append it to the cache file"""
+        line = json.dumps({"case_number": case_number, "fingerprint": fingerprint, "record": record},
+                          ensure_ascii=False)
+        with self._lock:
+            self.entries[case_number] = {"fingerprint": fingerprint, "record": record}
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+                self._lines += 1
+
+    def compact(self):
+        """Rewrite the cache file with one line per case, replacing it atomically"""
+        if not self.path:
+            return
+        with self._lock:
+            if self._lines == len(self.entries):
+                return
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for case_number, entry in self.entries.items():
+                    f.write(json.dumps({"case_number": case_number, **entry}, ensure_ascii=False) + "\n")
+            os.replace(temp_path, self.path)
+            self._lines = len(self.entries)
+
+
+class CaseDetailFetcher:
+    """Fetches case detail pages concurrently under a shared rate limit"""
+
+    def __init__(self, max_workers: int = 4, requests_per_second: float = 0.5,
+                 cache_path: Optional[str] = DEFAULT_CACHE_PATH, headless: bool = True):
+        """
+        Initialize the fetcher
+
+        Args:
+            max_workers: Number of browser sessions fetching in parallel
+            requests_per_second: Page load rate across all workers
+            cache_path: Case detail cache file (None to disable caching)
+            headless: Run browsers in headless mode
+        """
+        self.max_workers = max_workers
+        self.headless = headless
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.cache = CaseDetailCache(cache_path)
+        self._local = threading.local()
+        self._parsers = []
+        self._parsers_lock = threading.Lock()
+
+    def _worker_parser(self) -> ParserAppealsAL:
+        """Browser session owned by the current worker thread"""
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = ParserAppealsAL(headless=self.headless, rate_limiter=self.rate_limiter)
+            self._local.parser = parser
+            with self._parsers_lock:
+                self._parsers.append(parser)
+        return parser
+
+    def fetch_case(self, case: Dict) -> Dict:
+        """
+        Fetch and parse the detail page of a single case
+
+        Args:
+            case: Case dictionary as returned by parse_table_row
+
+        Returns:
+            Detail record, or a dictionary with an "error" key if the page failed
+        """
+        case_number = case.get("case_number", {}).get("text", "")
+        url = urljoin(PORTAL_BASE_URL, case.get("case_number", {}).get("link", ""))
+        html_content = self._worker_parser().make_request(url, wait_selector=DETAIL_WAIT_SELECTOR)
+        if not html_content:
+            return {"case_number": case_number, "url": url, "error": "Failed to load page"}
+        return parse_case_detail(html_content, case_number, url)
+
+    def fetch_all(self, cases: List[Dict]) -> Dict:
+        """
+        Fetch detail records for every case with a link, skipping unchanged cached cases
+
+        Args:
+            cases: Cases from a results extraction
+
+        Returns:
+            Dictionary with fetch counts and the detail records
+        """
+        details = {}
+        pending = []
+        queued = set()
+        cached = 0
+        for case in cases:
+            case_number = case.get("case_number", {}).get("text", "")
+            if not case_number or not case.get("case_number", {}).get("link"):
+                continue
+            if case_number in details or case_number in queued:
+                continue
+            queued.add(case_number)
+            record = self.cache.get(case_number, case_fingerprint(case))
+            if record is not None:
+                details[case_number] = record
+                cached += 1
+            else:
+                pending.append(case)
+
+        logger.info("%d cases cached, %d to fetch with %d workers", cached, len(pending), self.max_workers,
+                    extra={"cached": cached, "pending": len(pending), "workers": self.max_workers})
+
+        fetched = 0
+        failed = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self.fetch_case, case): case for case in pending}
+                for future in as_completed(futures):
+                    case = futures[future]
+                    case_number = case["case_number"]["text"]
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        record = {"case_number": case_number, "error": str(e)}
+
+                    if "error" in record:
+                        logger.warning("Error fetching %s: %s", case_number, record['error'],
+                                       extra={"case_number": case_number})
+                        failed.append(case_number)
+                        continue
+
+                    details[case_number] = record
+                    self.cache.put(case_number, case_fingerprint(case), record)
+                    fetched += 1
+                    if fetched % PROGRESS_EVERY == 0:
+                        logger.info("Fetched %d of %d case details", fetched, len(pending),
+                                    extra={"fetched": fetched, "pending": len(pending)})
+        finally:
+            self.cache.compact()
+            self.close()
+
+        return {
+            "status": "success",
+            "total_cases": len(details),
+            "fetched": fetched,
+            "cached": cached,
+            "failed": failed,
+            "extraction_date": datetime.now().strftime("%Y-%m-%d"),
+            "details": list(details.values())
+        }
+
+    def close(self):
+        """Close every worker browser"""
+        with self._parsers_lock:
+            for parser in self._parsers:
+                parser._close_driver()
+            self._parsers = []
+        self._local = threading.local()
+
+
+def main():
+    """Command line interface for the case detail fetcher"""
+    parser = argparse.ArgumentParser(description='Fetch case detail pages for cases in a court extraction JSON file')
+    parser.add_argument('input', help='JSON file written by a court extractor (must contain "cases")')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Number of concurrent browser sessions (default: 4)')
+    parser.add_argument('--rate', type=float, default=0.5,
+                        help='Maximum page loads per second across all workers (default: 0.5)')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH,
+                        help=f'Case detail cache file (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--output-prefix', default='case_details',
+                        help='Prefix for output files (default: case_details)')
+    add_logging_arguments(parser)
+
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_format, args.quiet)
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        cases = json.load(f).get("cases", [])
+
+    fetcher = CaseDetailFetcher(max_workers=args.workers, requests_per_second=args.rate,
+                                cache_path=args.cache)
+    output_data = fetcher.fetch_all(cases)
+
+    json_filename = f"{args.output_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(json_filename, "w", encoding="utf-8") as f:
+        json.dump(output_data, f, indent=4, ensure_ascii=False)
+
+    print(f"\n✓ {output_data['total_cases']} case details "
+          f"({output_data['fetched']} fetched, {output_data['cached']} from cache)")
+    print(f"✓ Results saved to {json_filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Checkpoints for resuming long court and news extractions
+
+After each results page or article is written, the checkpoint file records
+which pages or URLs are complete and where the output stands. A run started
+with --resume reads it, reopens the same output at that position and skips
+the completed work instead of fetching it again.
+"""
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from opal.output_writers import write_json_atomic
+
+
+# Output formats that can be reopened at a checkpointed position
+RESUMABLE_FORMATS = ["jsonl", "csv", "sqlite"]
+
+
+def can_resume(output_format: str, compression: Optional[str] = None) -> bool:
+    """Whether output in this format can be checkpointed and resumed (compressed CSV cannot)"""
+    return output_format in RESUMABLE_FORMATS and not (output_format == "csv" and compression)
+
+
+class ExtractionCheckpoint:
+    """Completed pages or article URLs of one extraction and the position of its output"""
+
+    def __init__(self, path: str, job: Dict, writer=None):
+        """
+        Start a new checkpoint (nothing is written until the first item completes)
+
+        Args:
+            path: Checkpoint file
+            job: Settings that identify the extraction; a checkpoint is only
+                resumed by a run with the same settings
+            writer: Output writer whose position is saved with every checkpoint
+        """
+        self.path = path
+        self.writer = writer
+        self.state = {"job": job, "completed": [], "output": None, "data": {}, "updated": None}
+        self._completed = set()
+        self._held = None
+
+    @classmethod
+    def load(cls, path: str, job: Dict, writer=None) -> "ExtractionCheckpoint":
+        """
+        Read a checkpoint to resume from
+
+        Args:
+            path: Checkpoint file
+            job: Settings of the run that wants to resume
+            writer: Output writer, usually attached later once it is reopened
+
+        Raises:
+            FileNotFoundError: If there is no checkpoint to resume
+            ValueError: If the checkpoint is unreadable or belongs to other settings
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Could not read checkpoint {path}: {e}")
+        if state.get("job") != job:
+            raise ValueError(f"Checkpoint {path} belongs to an extraction with different settings: "
+                             f"{state.get('job')}")
+        checkpoint = cls(path, job, writer)
+        checkpoint.state = state
+        checkpoint._completed = set(state["completed"])
+        return checkpoint
+
+    @property
+    def completed(self) -> List:
+        """Completed page numbers or URLs, in the order they finished"""
+        return self.state["completed"]
+
+    @property
+    def output(self) -> Optional[Dict]:
+        """Writer position to reopen the output at, or None before anything was written"""
+        return self.state["output"]
+
+    def is_done(self, item) -> bool:
+        """Whether a page number or URL was completed before"""
+        return item in self._completed
+
+    def next_page(self) -> int:
+        """First page that is not complete yet (pages complete in order)"""
+        return max(self.completed) + 1 if self.completed else 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value stored with set, for example the page size or article URL list"""
+        return self.state["data"].get(key, default)
+
+    def set(self, key: str, value: Any):
+        """Store a value needed to resume and save the checkpoint"""
+        self.state["data"][key] = value
+        self.save()
+
+    def mark_done(self, item):
+        """
+        Record a page number or URL as complete, after its records were written
+
+        After hold_marks the item is only recorded by the next release_marks.
+
+        Args:
+            item: Page number or article URL
+        """
+        if self._held is not None:
+            self._held.append(item)
+            return
+        if item not in self._completed:
+            self._completed.add(item)
+            self.state["completed"].append(item)
+        if self.writer is not None:
+            self.state["output"] = self.writer.position()
+        self.save()
+
+    def hold_marks(self):
+        """
+        Hold items marked done until release_marks, for callers that write
+        records in batches after the producer has marked their page or URL
+        """
+        if self._held is None:
+            self._held = []
+
+    def release_marks(self):
+        """Record the held items once their records have been written, saving the checkpoint once"""
+        if not self._held:
+            return
+        items, self._held = self._held, []
+        for item in items:
+            if item not in self._completed:
+                self._completed.add(item)
+                self.state["completed"].append(item)
+        if self.writer is not None:
+            self.state["output"] = self.writer.position()
+        self.save()
+
+    def save(self):
+        """Write the checkpoint file"""
+        self.state["updated"] = datetime.now().isoformat(timespec="seconds")
+        write_json_atomic(self.path, self.state)
+
+    def remove(self):
+        """Delete the checkpoint once the extraction has finished"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
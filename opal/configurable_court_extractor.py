@@ -3,18 +3,80 @@
 Configurable Court Case Extractor for Alabama Appeals Court
 Allows users to set custom search parameters OR use pre-built URLs
 """
+import copy
 import json
+import logging
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
-from urllib.parse import quote
+from typing import Any, Dict, List, Optional
 from opal.court_case_parser import ParserAppealsAL
-from opal.court_url_paginator import parse_court_url
+from opal.court_criteria import CourtCriteria
+from opal.court_id_cache import CourtIdCache, DEFAULT_COURT_ID_CACHE_PATH, is_valid_court_id
+from opal.court_sync import CourtSyncStore, DEFAULT_SYNC_STATE_PATH, sync_key_for_url
+from opal.court_url_paginator import (
+    DEFAULT_PAGE_SIZE, build_court_url, negotiate_page_size, parse_court_page_info,
+    total_pages_for, verify_case_count
+)
+from opal import metrics
+from opal.checkpoint import ExtractionCheckpoint, can_resume
+from opal.log_config import add_logging_arguments, configure_logging
+from opal.csv_output import COMPRESSION_SUFFIXES, CsvWriter
+from opal.output_writers import OUTPUT_FORMATS, TaggedWriter, check_output_format, open_writer
+from opal.rate_limiter import RateLimiter
+from opal.profiling import add_instrumentation_arguments, start_instrumentation
+from opal.progress import ProgressTracker, add_progress_argument, configure_progress
+from opal.sqlite_output import DEFAULT_DATABASE_PATH
+
+
+logger = logging.getLogger(__name__)
+
+# Court ID that is known to return results when discovery finds nothing
+FALLBACK_COURT_ID = '68f021c4-6a44-4735-9a76-5360b2e8af13'
+
+# Courts that can be searched, in the order they are reported
+COURT_KEYS = ('civil', 'criminal', 'supreme')
+
+
+def parse_court_list(value):
+    """
+    Parse a --court value into court keys
+    
+    Args:
+        value: One court, a comma-separated list of courts, or 'all'
+        
+    Returns:
+        List of unique court keys in the order given
+        
+    Raises:
+        ValueError: If a court is not known
+    """
+    if value.strip().lower() == 'all':
+        return list(COURT_KEYS)
+    courts = []
+    for court in value.split(','):
+        court = court.strip().lower()
+        if court not in COURT_KEYS:
+            raise ValueError(f"Invalid court: {court}. Choose from {', '.join(COURT_KEYS)} or all")
+        if court not in courts:
+            courts.append(court)
+    if not courts:
+        raise ValueError("No court given")
+    return courts
 
 
 class CourtSearchBuilder:
     """Builder class for constructing Alabama Court search URLs with court-specific parameters"""
     
-    def __init__(self):
+    def __init__(self, id_cache=None):
+        """
+        Initialize the builder
+        
+        Args:
+            id_cache: CourtIdCache holding previously discovered IDs (defaults to
+                the cache file in the working directory)
+        """
         self.base_url = "https://publicportal.alappeals.gov/portal/search/case/results"
         
         # Court definitions with their specific IDs and configurations
@@ -51,8 +113,19 @@ class CourtSearchBuilder:
             'custom': 'custom'
         }
         
+        # Case category IDs (these would need to be discovered from the portal)
+        self.category_ids = {
+            'Appeal': 1000001,
+            'Certiorari': 1000002, 
+            'Original Proceeding': 1000003,
+            'Petition': 1000004,
+            'Certified Question': 1000005  # Supreme Court only
+        }
+        
         self.current_court = 'civil'  # Default court
+        self.page_size = DEFAULT_PAGE_SIZE
         self.session_initialized = False
+        self.id_cache = id_cache if id_cache is not None else CourtIdCache()
         self.reset_params()
     
     def reset_params(self):
@@ -62,7 +135,7 @@ class CourtSearchBuilder:
             'advanced': 'false',
             'courtID': court_info['id'],  # May be None until discovered
             'page': {
-                'size': 25,
+                'size': self.page_size,
                 'number': 0,
                 'totalElements': 0,
                 'totalPages': 0
@@ -82,14 +155,53 @@ class CourtSearchBuilder:
             }
         }
     
-    def discover_court_ids(self, parser_instance):
+    def apply_cached_ids(self, courts=None):
+        """
+        Use court and category IDs from the cache if it is still fresh
+        
+        Args:
+            courts: Court keys the cache must hold an ID for (default: the current court)
+        
+        Returns:
+            True if the cache was fresh and supplied an ID for every court in courts
+        """
+        if not self.id_cache.is_fresh():
+            return False
+        
+        cached_courts = self.id_cache.courts()
+        if any(court_key not in cached_courts for court_key in (courts or [self.current_court])):
+            return False
+        
+        for court_key, court_id in cached_courts.items():
+            if court_key in self.courts:
+                self.courts[court_key]['id'] = court_id
+        self.category_ids.update(self.id_cache.categories())
+        self.params['courtID'] = self.courts[self.current_court]['id']
+        self.session_initialized = True
+        return True
+    
+    def discover_court_ids(self, parser_instance, force=False, courts=None):
         """
         Discover court IDs by navigating to the website and inspecting the court selection interface
         
+        IDs found in a fresh cache are used without loading the website. Newly
+        discovered IDs are written back to the cache; the fallback civil court
+        ID used when discovery finds nothing is never cached.
+        
         Args:
-            parser_instance: Instance of ParserAppealsAL with active WebDriver
+            parser_instance: Instance of ParserAppealsAL used to load the search page
+            force: Ignore the cache and always inspect the website
+            courts: Court keys that will be searched; the website is inspected
+                unless the cache holds an ID for each (default: the current court)
         """
+        if not force and self.apply_cached_ids(courts):
+            print(f"Using cached court IDs from {self.id_cache.path}")
+            return
+        
         try:
+            if not parser_instance.driver:
+                parser_instance._setup_driver()
+            
             # Navigate to the main search page
             search_page_url = "https://publicportal.alappeals.gov/portal/search/case"
             parser_instance.driver.get(search_page_url)
@@ -98,16 +210,15 @@ class CourtSearchBuilder:
             from selenium.webdriver.support.ui import WebDriverWait
             from selenium.webdriver.support import expected_conditions as EC
             from selenium.webdriver.common.by import By
-            import time
             
             wait = WebDriverWait(parser_instance.driver, 10)
-            
-            # Wait for page to fully load
-            time.sleep(3)
+            discovered = {}
             
             # Try to find court selection elements
-            # This is a placeholder implementation - actual selectors would need to be discovered
             try:
+                # Wait for the search form's dropdowns instead of sleeping a fixed time
+                wait.until(EC.presence_of_element_located((By.TAG_NAME, "select")))
+                
                 # Look for any dropdown or selection elements that might contain court options
                 court_elements = parser_instance.driver.find_elements(By.XPATH, "//select[@id='court'] | //select[contains(@name, 'court')] | //div[contains(@class, 'court')]")
                 
@@ -118,26 +229,46 @@ class CourtSearchBuilder:
                         for option in options:
                             court_name = option.text.lower()
                             court_id = option.get_attribute("value")
+                            if not is_valid_court_id(court_id):
+                                continue
                             
                             # Map court names to our court keys
                             if "civil" in court_name and "appeals" in court_name:
-                                self.courts['civil']['id'] = court_id
+                                court_key = 'civil'
                             elif "criminal" in court_name and "appeals" in court_name:
-                                self.courts['criminal']['id'] = court_id
+                                court_key = 'criminal'
                             elif "supreme" in court_name:
-                                self.courts['supreme']['id'] = court_id
+                                court_key = 'supreme'
+                            else:
+                                continue
+                            self.courts[court_key]['id'] = court_id
+                            discovered[court_key] = court_id
                 else:
                     # If no court selector found, use fallback approach
                     print("Court selector not found, using fallback discovery method...")
                     # Use known working ID for civil court as baseline
-                    self.courts['civil']['id'] = '68f021c4-6a44-4735-9a76-5360b2e8af13'
+                    self.courts['civil']['id'] = FALLBACK_COURT_ID
+                
+                # Case category IDs come from the category dropdown when present
+                category_elements = parser_instance.driver.find_elements(By.XPATH, "//select[contains(@id, 'ategory')] | //select[contains(@name, 'ategory')]")
+                for element in category_elements:
+                    for option in element.find_elements(By.TAG_NAME, "option"):
+                        category_name = option.text.strip()
+                        category_id = (option.get_attribute("value") or "").strip()
+                        if category_name in self.category_ids and category_id.isdigit():
+                            self.category_ids[category_name] = int(category_id)
                     
             except Exception as inner_e:
                 print(f"Court element discovery failed: {inner_e}")
                 # Use fallback IDs
-                self.courts['civil']['id'] = '68f021c4-6a44-4735-9a76-5360b2e8af13'
+                if not self.courts['civil']['id']:
+                    self.courts['civil']['id'] = FALLBACK_COURT_ID
             
             self.session_initialized = True
+            self.params['courtID'] = self.courts[self.current_court]['id']
+            # Only IDs read from the portal are cached, so a fallback is retried next run
+            if discovered:
+                self.id_cache.save(discovered, self.category_ids)
             print("Court ID discovery completed:")
             for court_key, court_info in self.courts.items():
                 status = "✓" if court_info['id'] else "⚠"
@@ -147,7 +278,28 @@ class CourtSearchBuilder:
             print(f"Warning: Could not discover court IDs automatically: {e}")
             print("Try running your search on the website and searching by URL populated by the search")
             # Use fallback ID for civil court
-            self.courts['civil']['id'] = '68f021c4-6a44-4735-9a76-5360b2e8af13'
+            self.courts['civil']['id'] = FALLBACK_COURT_ID
+            self.params['courtID'] = self.courts[self.current_court]['id']
+    
+    def court_mismatch(self, cases):
+        """
+        Check whether search results belong to a different court than requested
+        
+        A stale or wrong court ID makes the portal return another court's
+        cases, which shows up as case numbers with the wrong prefix.
+        
+        Args:
+            cases: Cases parsed from a results page
+            
+        Returns:
+            True if none of the case numbers carry the current court's prefix
+        """
+        numbers = [case.get('case_number', {}).get('text', '') for case in cases]
+        numbers = [number for number in numbers if number]
+        if not numbers:
+            return False
+        prefix = f"{self.courts[self.current_court]['case_prefix']}-"
+        return not any(number.upper().startswith(prefix) for number in numbers)
     
     def set_court_id_manually(self, court_key, court_id):
         """
@@ -204,10 +356,14 @@ class CourtSearchBuilder:
             period: Predefined period ('7d', '1m', '3m', '6m', '1y', 'custom')
         """
         if period == 'custom' and start_date and end_date:
-            # Convert dates to the format expected by the portal
+            # Convert dates to the MM/DD/YYYY format expected by the portal
+            start = datetime.strptime(start_date, '%Y-%m-%d')
+            end = datetime.strptime(end_date, '%Y-%m-%d')
+            if start > end:
+                raise ValueError(f"Start date {start_date} is after end date {end_date}")
             self.params['case']['filedDateChoice'] = 'custom'
-            self.params['case']['filedDateStart'] = start_date.replace('-', '*2f')
-            self.params['case']['filedDateEnd'] = end_date.replace('-', '*2f')
+            self.params['case']['filedDateStart'] = start.strftime('%m/%d/%Y')
+            self.params['case']['filedDateEnd'] = end.strftime('%m/%d/%Y')
         else:
             # Use predefined period - validate it exists
             if period not in self.date_periods:
@@ -230,8 +386,8 @@ class CourtSearchBuilder:
             else:
                 start = today - timedelta(days=365)
             
-            self.params['case']['filedDateStart'] = start.strftime('%m*2f%d*2f%Y')
-            self.params['case']['filedDateEnd'] = today.strftime('%m*2f%d*2f%Y')
+            self.params['case']['filedDateStart'] = start.strftime('%m/%d/%Y')
+            self.params['case']['filedDateEnd'] = today.strftime('%m/%d/%Y')
     
     def set_case_category(self, category_name=None):
         """
@@ -248,17 +404,8 @@ class CourtSearchBuilder:
         # Validate category is available for current court
         self.validate_case_category(category_name)
         
-        # Map category names to IDs (these would need to be discovered from the portal)
-        category_map = {
-            'Appeal': 1000001,
-            'Certiorari': 1000002, 
-            'Original Proceeding': 1000003,
-            'Petition': 1000004,
-            'Certified Question': 1000005  # Supreme Court only
-        }
-        
-        if category_name in category_map:
-            self.params['case']['caseCategoryID'] = category_map[category_name]
+        if category_name in self.category_ids:
+            self.params['case']['caseCategoryID'] = self.category_ids[category_name]
         else:
             raise ValueError(f"Unknown category: {category_name}")
     
@@ -306,6 +453,32 @@ class CourtSearchBuilder:
         self.params['sort']['sortBy'] = sort_by
         self.params['sort']['sortDesc'] = 'true' if descending else 'false'
     
+    def set_page_size(self, page_size):
+        """
+        Set the number of results requested per page
+        
+        Args:
+            page_size: Rows per page (kept across set_court calls)
+        """
+        if page_size < 1:
+            raise ValueError(f"Invalid page size: {page_size}. Must be at least 1")
+        self.page_size = page_size
+        self.params['page']['size'] = page_size
+    
+    def negotiate_page_size(self, parser_instance):
+        """
+        Probe the portal for the largest page size it honors and use it
+        
+        Args:
+            parser_instance: Instance of ParserAppealsAL used to load the probe page
+            
+        Returns:
+            Parsed result of page 0 at the negotiated size (None if the probe failed)
+        """
+        page_size, first_result = negotiate_page_size(self.build_url(0), parser_instance)
+        self.set_page_size(page_size)
+        return first_result
+    
     def set_page_info(self, page_number=0, page_size=25, total_elements=0, total_pages=0):
         """Set pagination information"""
         self.params['page'].update({
@@ -315,45 +488,55 @@ class CourtSearchBuilder:
             'totalPages': total_pages
         })
     
-    def build_criteria_string(self):
-        """Build the criteria string for the URL"""
-        criteria_parts = []
+    def build_criteria(self):
+        """
+        Build the search criteria as a CourtCriteria object
         
-        # Basic parameters
-        criteria_parts.append(f"advanced~{self.params['advanced']}")
-        criteria_parts.append(f"courtID~%27{self.params['courtID']}")
+        Returns:
+            CourtCriteria holding the current parameters
+        """
+        def flag(value):
+            return value == 'true' if isinstance(value, str) else bool(value)
         
-        # Page parameters
         page = self.params['page']
-        page_str = f"page~%28size~{page['size']}~number~{page['number']}~totalElements~{page['totalElements']}~totalPages~{page['totalPages']}%29"
-        criteria_parts.append(page_str)
-        
-        # Sort parameters
         sort = self.params['sort']
-        sort_str = f"sort~%28sortBy~%27{sort['sortBy']}~sortDesc~{sort['sortDesc']}%29"
-        criteria_parts.append(sort_str)
-        
-        # Case parameters
         case = self.params['case']
-        case_parts = []
-        case_parts.append(f"caseCategoryID~{case['caseCategoryID']}")
-        case_parts.append(f"caseNumberQueryTypeID~{case['caseNumberQueryTypeID']}")
-        case_parts.append(f"caseTitleQueryTypeID~{case['caseTitleQueryTypeID']}")
-        case_parts.append(f"filedDateChoice~%27{case['filedDateChoice']}")
-        case_parts.append(f"filedDateStart~%27{case['filedDateStart']}")
-        case_parts.append(f"filedDateEnd~%27{case['filedDateEnd']}")
-        case_parts.append(f"excludeClosed~{case['excludeClosed']}")
+        
+        case_values = {
+            'caseCategoryID': case['caseCategoryID'],
+            'caseNumberQueryTypeID': case['caseNumberQueryTypeID'],
+            'caseTitleQueryTypeID': case['caseTitleQueryTypeID'],
+            'filedDateChoice': case['filedDateChoice'],
+            'filedDateStart': case['filedDateStart'],
+            'filedDateEnd': case['filedDateEnd'],
+            'excludeClosed': flag(case['excludeClosed'])
+        }
         
         # Add optional case filters
         if 'caseNumber' in case:
-            case_parts.append(f"caseNumber~{quote(case['caseNumber'])}")
+            case_values['caseNumber'] = case['caseNumber']
         if 'caseTitle' in case:
-            case_parts.append(f"caseTitle~{quote(case['caseTitle'])}")
-        
-        case_str = f"case~%28{'~'.join(case_parts)}%29"
-        criteria_parts.append(case_str)
+            case_values['caseTitle'] = case['caseTitle']
         
-        return f"~%28{'~'.join(criteria_parts)}%29"
+        return CourtCriteria({
+            'advanced': flag(self.params['advanced']),
+            'courtID': self.params['courtID'],
+            'page': {
+                'size': page['size'],
+                'number': page['number'],
+                'totalElements': page['totalElements'],
+                'totalPages': page['totalPages']
+            },
+            'sort': {
+                'sortBy': sort['sortBy'],
+                'sortDesc': flag(sort['sortDesc'])
+            },
+            'case': case_values
+        }, url_prefix=f"{self.base_url}?criteria=")
+    
+    def build_criteria_string(self):
+        """Build the criteria string for the URL"""
+        return self.build_criteria().encode()
     
     def build_url(self, page_number=0):
         """Build complete search URL"""
@@ -363,8 +546,479 @@ class CourtSearchBuilder:
                           total_elements=self.params['page']['totalElements'],
                           total_pages=self.params['page']['totalPages'])
         
-        criteria = self.build_criteria_string()
-        return f"{self.base_url}?criteria={criteria}"
+        return self.build_criteria().to_url()
+
+
+def save_court_results(output_data, output_prefix, csv_compression=None):
+    """
+    Write extraction results to a timestamped JSON file and CSV table
+    
+    Args:
+        output_data: Results dictionary with a 'cases' list
+        output_prefix: Prefix for output files
+        csv_compression: None, 'gzip' or 'zstd' to compress the CSV table
+        
+    Returns:
+        Name of the JSON file written
+    """
+    all_cases = output_data['cases']
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    json_filename = f"{output_prefix}_{timestamp}.json"
+    
+    with open(json_filename, "w", encoding="utf-8") as f:
+        json.dump(output_data, f, indent=4, ensure_ascii=False)
+    
+    print(f"\n✓ Successfully extracted {len(all_cases)} court cases")
+    print(f"✓ Results saved to {json_filename}")
+    
+    # Create CSV if there are results
+    if all_cases:
+        csv_filename = f"{output_prefix}_{timestamp}.csv{COMPRESSION_SUFFIXES.get(csv_compression, '')}"
+        with CsvWriter(csv_filename, compression=csv_compression, manifest=False) as csv_writer:
+            csv_writer.write_many(all_cases)
+        
+        print(f"✓ CSV table saved to {csv_filename}")
+    
+    return json_filename
+
+
+@dataclass
+class CourtSearchOptions:
+    """What a single-court extraction searches for: a court and filters, or a pre-built URL"""
+    court: str = 'civil'
+    date_period: str = '1y'
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    case_number: Optional[str] = None
+    case_title: Optional[str] = None
+    case_category: Optional[str] = None
+    exclude_closed: bool = False
+    max_pages: Optional[int] = None
+    custom_url: Optional[str] = None
+
+    def checkpoint_job(self, output_format: str) -> Dict:
+        """
+        Settings that identify the extraction in its checkpoint
+
+        Args:
+            output_format: Format the cases are written in
+
+        Returns:
+            Dictionary a resumed run must match
+        """
+        return dict(asdict(self), output_format=output_format)
+
+    def search_parameters(self) -> Dict:
+        """
+        Search parameters reported with the results
+
+        Returns:
+            The search_parameters section of the output
+        """
+        return {
+            "court": self.court if not self.custom_url else "Custom URL",
+            "date_period": self.date_period if not self.custom_url else "Custom URL",
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "case_number_filter": self.case_number,
+            "case_title_filter": self.case_title,
+            "case_category": self.case_category,
+            "exclude_closed": self.exclude_closed,
+            "custom_url": self.custom_url
+        }
+
+    def sync_key(self) -> str:
+        """Key the sync state of this search is kept under"""
+        return self.court if not self.custom_url else sync_key_for_url(self.custom_url)
+
+    def apply_to(self, search_builder: "CourtSearchBuilder") -> None:
+        """
+        Set the date range and filters on a builder whose court is already set
+
+        Args:
+            search_builder: Builder to configure
+
+        Raises:
+            ValueError: If a custom date period is missing either date
+        """
+        if self.date_period == 'custom':
+            if not self.start_date or not self.end_date:
+                raise ValueError("Custom date range requires both start_date and end_date")
+            search_builder.set_date_range(self.start_date, self.end_date, 'custom')
+        else:
+            search_builder.set_date_range(period=self.date_period)
+
+        if self.case_number:
+            search_builder.set_case_number_filter(self.case_number)
+        if self.case_title:
+            search_builder.set_case_title_filter(self.case_title)
+        if self.case_category:
+            search_builder.set_case_category(self.case_category)
+
+        search_builder.set_exclude_closed(self.exclude_closed)
+
+    def print_banner(self, court_name: str) -> None:
+        """Print the court and search parameters at the start of an extraction"""
+        print("Alabama Appeals Court - Configurable Data Extraction")
+        print("=" * 55)
+        print(f"Court: {court_name}")
+        print(f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        if not self.custom_url:
+            print(f"Date period: {self.date_period}")
+            if self.date_period == 'custom':
+                print(f"Date range: {self.start_date} to {self.end_date}")
+            if self.case_number:
+                print(f"Case number filter: {self.case_number}")
+            if self.case_title:
+                print(f"Case title filter: {self.case_title}")
+            if self.case_category:
+                print(f"Case category: {self.case_category}")
+            print(f"Exclude closed: {self.exclude_closed}")
+        print(f"Max pages: {self.max_pages or 'All available'}")
+        print()
+
+
+@dataclass
+class CourtOutputOptions:
+    """Where a single-court extraction writes its cases and how it can be resumed"""
+    output_prefix: str = "court_cases"
+    output_format: str = 'json'
+    save_output: bool = True
+    writer: Any = None
+    database_path: str = DEFAULT_DATABASE_PATH
+    csv_compression: Optional[str] = None
+    checkpoint_path: Optional[str] = None
+    resume: bool = False
+
+    def wants_checkpoint(self, sync: bool) -> bool:
+        """
+        Whether pages are checkpointed: only output this extraction streams
+        itself, in a format that can be reopened, and never in sync mode
+
+        Args:
+            sync: Whether the extraction runs in sync mode
+        """
+        return bool(self.checkpoint_path and self.save_output and self.writer is None and not sync
+                    and can_resume(self.output_format, self.csv_compression))
+
+    def open_checkpoint(self, search: CourtSearchOptions, sync: bool) -> Optional[ExtractionCheckpoint]:
+        """
+        Start a new checkpoint or load the one being resumed
+
+        Args:
+            search: Search the checkpoint belongs to
+            sync: Whether the extraction runs in sync mode
+
+        Returns:
+            The checkpoint, or None when pages are not checkpointed
+
+        Raises:
+            ValueError: If resume is requested for output that cannot be resumed, or the
+                checkpoint belongs to other search parameters
+            FileNotFoundError: If resume is requested and there is no checkpoint
+        """
+        if self.resume and (sync or not self.checkpoint_path
+                            or not can_resume(self.output_format, self.csv_compression)):
+            raise ValueError("Resuming needs a checkpoint file and uncompressed jsonl, csv or sqlite output "
+                             "without sync")
+        if not self.wants_checkpoint(sync):
+            return None
+        job = search.checkpoint_job(self.output_format)
+        if not self.resume:
+            return ExtractionCheckpoint(self.checkpoint_path, job)
+        checkpoint = ExtractionCheckpoint.load(self.checkpoint_path, job)
+        print(f"Resuming from {self.checkpoint_path}: {len(checkpoint.completed)} pages already done")
+        return checkpoint
+
+    def open_stream(self, checkpoint: Optional[ExtractionCheckpoint] = None):
+        """
+        Open the file or database this extraction streams its cases to
+
+        Args:
+            checkpoint: Checkpoint whose output position a resumed stream continues from
+
+        Returns:
+            The opened writer, or None when cases go to a shared writer or are collected
+        """
+        if self.writer is not None or self.output_format == 'json' or not self.save_output:
+            return None
+        stream = open_writer(self.output_format,
+                             f"{self.output_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                             database_path=self.database_path, compression=self.csv_compression,
+                             resume=checkpoint.output if checkpoint else None)
+        print(f"Streaming cases to {stream.path}")
+        return stream
+
+
+class CourtPageSync:
+    """Filters each page down to new or changed cases and notices known ones"""
+
+    def __init__(self, store: CourtSyncStore, key: str, owns_store: bool = False):
+        """
+        Initialize the page filter
+
+        Args:
+            store: Sync state the pages are compared with
+            key: Court or search key the state is kept under
+            owns_store: Save the store when the extraction finishes (False when the
+                caller shares it with other extractions and saves it)
+        """
+        self.store = store
+        self.key = key
+        self.owns_store = owns_store
+        self.seen_cases = []
+        self.reached_known = False
+
+    @classmethod
+    def open(cls, key: str, sync_store: Optional[CourtSyncStore] = None,
+             sync_state_path: str = DEFAULT_SYNC_STATE_PATH) -> "CourtPageSync":
+        """
+        Compare pages with a shared store, or with one loaded from sync_state_path
+
+        Args:
+            key: Court or search key the state is kept under
+            sync_store: CourtSyncStore shared with other extractions
+            sync_state_path: File holding the known cases when no store is shared
+        """
+        page_sync = cls(sync_store or CourtSyncStore(sync_state_path), key, owns_store=sync_store is None)
+        print(f"Sync mode: watermark for {key} is {page_sync.store.watermark(key) or 'not set'}")
+        return page_sync
+
+    def filter(self, cases: List[Dict]) -> List[Dict]:
+        """
+        Keep the cases that are new or changed since the last sync
+
+        Args:
+            cases: Cases of one results page
+
+        Returns:
+            The new or changed cases
+        """
+        delta, self.reached_known = self.store.filter_page(self.key, cases)
+        self.seen_cases.extend(cases)
+        return delta
+
+    def finish(self) -> None:
+        """Record the cases seen and save the store if this extraction owns it"""
+        self.store.record(self.key, self.seen_cases)
+        if self.owns_store:
+            self.store.save()
+
+    def summary(self) -> Dict:
+        """Sync section of the output"""
+        return {
+            "watermark": self.store.watermark(self.key),
+            "cases_checked": len(self.seen_cases),
+            "reached_known": self.reached_known
+        }
+
+
+def prepare_court_search(search, parser, search_builder=None, refresh_court_ids=False,
+                         court_id_cache_path=DEFAULT_COURT_ID_CACHE_PATH):
+    """
+    Work out the first search URL, discovering court IDs when they are not known
+
+    Args:
+        search: CourtSearchOptions of the extraction
+        parser: ParserAppealsAL used for court ID discovery
+        search_builder: Builder with court IDs already discovered; a copy is configured
+        refresh_court_ids: Rediscover court IDs from the website instead of using the cache
+        court_id_cache_path: File caching discovered court and category IDs
+
+    Returns:
+        Tuple of (search builder or None for a custom URL, court name, first page URL)
+
+    Raises:
+        ValueError: If the court ID cannot be discovered or the date range is incomplete
+    """
+    if search.custom_url:
+        print("Using custom URL with embedded search parameters")
+        print("⚠️  WARNING: Custom URLs contain session-specific parameters that expire.")
+        print("   This URL will only work temporarily and may become invalid after your browser session ends.")
+        print("   For reliable, repeatable searches, use the CLI search parameters instead of --url option.")
+        print()
+        # Generic name since we don't know the court
+        return None, "Custom Search", search.custom_url
+
+    if search_builder is not None:
+        search_builder = copy.deepcopy(search_builder)
+    else:
+        search_builder = CourtSearchBuilder(id_cache=CourtIdCache(court_id_cache_path))
+
+    # Discover court IDs if not already done (cached IDs are used when fresh)
+    if refresh_court_ids or not search_builder.session_initialized:
+        print("Discovering court IDs...")
+        search_builder.discover_court_ids(parser, force=refresh_court_ids, courts=[search.court])
+
+    search_builder.set_court(search.court)
+    court_info = search_builder.get_court_info()
+    if court_info['id'] is None:
+        raise ValueError(f"Could not discover court ID for {court_info['name']}. "
+                       "Try using the --url option with a pre-built search URL instead.")
+
+    search.apply_to(search_builder)
+    return search_builder, court_info['name'], search_builder.build_url(0)
+
+
+def load_first_page(parser, search_builder, base_url, court_name, page_size=None, resume_url=None,
+                    start_page=0):
+    """
+    Load the first results page, at the largest page size the portal honors
+    unless page_size is given
+
+    Args:
+        parser: ParserAppealsAL loading the page
+        search_builder: Builder of the search, None for a custom URL
+        base_url: First page URL of the search
+        court_name: Court reported when the results belong to another court
+        page_size: Rows per results page (None to negotiate it)
+        resume_url: Saved search URL of a resumed run
+        start_page: Page a resumed run continues from
+
+    Returns:
+        Tuple of (page size, first page result)
+    """
+    if page_size is None:
+        print("Negotiating page size and loading first page...")
+        if search_builder is None:
+            page_size, result = negotiate_page_size(base_url, parser)
+        else:
+            result = search_builder.negotiate_page_size(parser)
+            page_size = search_builder.page_size
+    else:
+        print("Loading first page to determine total results...")
+        if search_builder is not None:
+            search_builder.set_page_size(page_size)
+        result = None
+
+    if result is None:
+        if resume_url:
+            first_url = build_court_url(resume_url, start_page, page_size)
+        elif search_builder is None:
+            first_url = build_court_url(base_url, 0, page_size)
+        else:
+            first_url = search_builder.build_url(0)
+        result = parser.parse_article(first_url)
+
+    # A stale court ID shows up as results from another court; rediscover and retry once
+    if search_builder is not None and not resume_url and search_builder.court_mismatch(result.get('cases', [])):
+        print(f"⚠️  Results do not look like {court_name} cases, refreshing court IDs...")
+        stale_id = search_builder.get_court_info()['id']
+        metrics.add("page_load", "retries")
+        search_builder.discover_court_ids(parser, force=True)
+        if search_builder.get_court_info()['id'] != stale_id:
+            result = parser.parse_article(search_builder.build_url(0))
+        else:
+            print("⚠️  Court ID unchanged after refresh; results may belong to another court")
+    return page_size, result
+
+
+def collect_court_pages(parser, page_base_url, first_page_result, page_size, total_pages, court_name,
+                        max_pages=None, limited=False, start_page=0, stream=None, page_sync=None,
+                        checkpoint=None, progress=None):
+    """
+    Page through the results, writing each page's cases to stream or collecting them
+
+    Paging stops at the first empty page, or in sync mode at the first page of
+    already known cases.
+
+    Args:
+        parser: ParserAppealsAL loading the pages
+        page_base_url: Search URL the page URLs are built from
+        first_page_result: Already loaded result of start_page
+        page_size: Rows per results page
+        total_pages: Expected number of pages
+        court_name: Court named in log messages
+        max_pages: Maximum pages to process (None for all)
+        limited: Whether max_pages cuts the results short
+        start_page: Page to continue from
+        stream: Writer receiving the cases (None to collect them)
+        page_sync: CourtPageSync filtering pages in sync mode
+        checkpoint: ExtractionCheckpoint marking each written page
+        progress: ProgressTracker updated after each page
+
+    Returns:
+        Tuple of (collected cases, number of cases written or collected, pages processed)
+
+    Raises:
+        PageLoadError: If a page cannot be loaded
+    """
+    all_cases = []
+    cases_found = 0
+    pages_processed = 0
+    for page_num, page_result in parser.iter_pages(page_base_url, first_page_result=first_page_result,
+                                                   page_size=page_size, max_pages=max_pages,
+                                                   start_page=start_page):
+        pages_processed += 1
+        if progress:
+            if not limited:
+                progress.set_total(parser.pagination['total_pages'])
+            progress.update(records=len(page_result.get('cases', [])))
+        if not page_result.get('cases'):
+            logger.info("%s page %d: no cases found", court_name, page_num + 1,
+                        extra={"court": court_name, "page": page_num + 1, "cases": 0})
+            # If no cases on this page, we might have reached the end
+            break
+
+        if page_sync:
+            page_cases = page_sync.filter(page_result['cases'])
+            logger.debug("%s page %d: found %d cases, %d new or changed", court_name, page_num + 1,
+                         len(page_result['cases']), len(page_cases),
+                         extra={"court": court_name, "page": page_num + 1,
+                                "cases": len(page_result['cases']), "new_or_changed": len(page_cases)})
+        else:
+            page_cases = page_result['cases']
+            logger.debug("%s page %d: found %d cases", court_name, page_num + 1,
+                         len(page_result['cases']),
+                         extra={"court": court_name, "page": page_num + 1,
+                                "cases": len(page_result['cases'])})
+        if stream is not None:
+            stream.write_many(page_cases)
+        else:
+            all_cases.extend(page_cases)
+        cases_found += len(page_cases)
+        if checkpoint:
+            checkpoint.mark_done(page_num)
+        last_page = (parser.pagination['total_pages'] or total_pages) - 1
+        if len(page_result['cases']) < page_size and page_num < last_page:
+            logger.warning("%s page %d returned %d rows but page size is %d", court_name, page_num + 1,
+                           len(page_result['cases']), page_size)
+        if page_sync and page_sync.reached_known:
+            logger.info("Reached already synced cases, stopping")
+            break
+    return all_cases, cases_found, pages_processed
+
+
+def finish_court_output(output_data, output, court_name, stream=None, checkpoint=None):
+    """
+    Close the extraction's own stream or save the collected cases, and report the result
+
+    Args:
+        output_data: Results of the extraction, with the collected cases
+        output: CourtOutputOptions of the extraction
+        court_name: Court named when the cases are only returned
+        stream: Writer opened by this extraction (None if it streamed to a shared
+            writer or collected the cases)
+        checkpoint: ExtractionCheckpoint, removed once the stream is complete
+    """
+    cases_found = output_data['total_cases']
+    summary = {key: value for key, value in output_data.items() if key != 'cases'}
+    if stream is not None and output_data['status'] != "success":
+        stream.close(summary, status="failed")
+        print(f"\n⚠️  Extracted {cases_found} of {output_data['expected_total']} court cases; output is incomplete")
+        print(f"Cases found are in {stream.path}")
+        if checkpoint:
+            print(f"The checkpoint is kept: {checkpoint.path}")
+    elif stream is not None:
+        stream.close(summary)
+        if checkpoint:
+            checkpoint.remove()
+        print(f"\n✓ Successfully extracted {cases_found} court cases")
+        print(f"✓ Results streamed to {stream.path} (summary in {stream.manifest_path})")
+    elif output.save_output and output.writer is None:
+        save_court_results(output_data, output.output_prefix, output.csv_compression)
+    else:
+        print(f"\n✓ Extracted {cases_found} {court_name} cases")
 
 
 def extract_court_cases_with_params(
@@ -378,7 +1032,24 @@ def extract_court_cases_with_params(
     exclude_closed=False,
     max_pages=None,
     output_prefix="court_cases",
-    custom_url=None
+    custom_url=None,
+    page_size=None,
+    sync=False,
+    sync_state_path=DEFAULT_SYNC_STATE_PATH,
+    refresh_court_ids=False,
+    court_id_cache_path=DEFAULT_COURT_ID_CACHE_PATH,
+    recycle_after_pages=None,
+    max_browser_rss_mb=None,
+    search_builder=None,
+    rate_limiter=None,
+    sync_store=None,
+    save_output=True,
+    output_format='json',
+    writer=None,
+    database_path=DEFAULT_DATABASE_PATH,
+    csv_compression=None,
+    checkpoint_path=None,
+    resume=False
 ):
     """
     Extract court cases with configurable search parameters OR a pre-built URL
@@ -395,198 +1066,303 @@ def extract_court_cases_with_params(
         max_pages: Maximum pages to process (None for all)
         output_prefix: Prefix for output files
         custom_url: Pre-built search URL with embedded parameters (overrides all other search params)
+        page_size: Rows per results page (None to probe for the largest size the portal honors)
+        sync: Only emit cases that are new or changed since the last sync, and stop
+            paging at the first page of already known cases
+        sync_state_path: File holding the known cases and per-court watermark
+        refresh_court_ids: Rediscover court IDs from the website instead of using the cache
+        court_id_cache_path: File caching discovered court and category IDs
+        recycle_after_pages: Restart the browser after this many page loads
+        max_browser_rss_mb: Restart the browser once its processes use more memory than this
+        search_builder: Builder with court IDs already discovered; a copy is used so
+            one builder can be shared by concurrent extractions
+        rate_limiter: RateLimiter shared with other extractions running at the same time
+        sync_store: CourtSyncStore shared with other extractions; the caller saves it
+        save_output: Write the JSON and CSV files (False to only return the results)
+        output_format: 'json' to write all cases at the end, 'jsonl' / 'csv' / 'parquet'
+            to stream each page's cases to the file with the summary in a manifest,
+            or 'sqlite' to upsert them into database_path
+        writer: Writer shared with other extractions that receives the cases as they
+            are found instead of collecting them (the caller closes it)
+        database_path: SQLite database used when output_format is 'sqlite'
+        csv_compression: None, 'gzip' or 'zstd' to compress CSV output
+        checkpoint_path: File recording completed pages and the output position after
+            each page, removed when the extraction finishes (streamed jsonl, csv and
+            sqlite output without sync only)
+        resume: Continue from checkpoint_path: the same output is reopened where
+            the checkpoint left it and paging restarts after the last completed page
+    
+    Raises:
+        ValueError: If resume is requested for output that cannot be resumed, or the
+            checkpoint belongs to other search parameters
+        FileNotFoundError: If resume is requested and there is no checkpoint
     """
+    search = CourtSearchOptions(court, date_period, start_date, end_date, case_number, case_title,
+                                case_category, exclude_closed, max_pages, custom_url)
+    output = CourtOutputOptions(output_prefix, output_format, save_output, writer, database_path,
+                                csv_compression, checkpoint_path, resume)
+    checkpoint = output.open_checkpoint(search, sync)
+    if checkpoint and resume:
+        page_size = checkpoint.get("page_size")
+    # The search URL of a resumed run is reused as saved: relative date periods
+    # would otherwise move if the run is resumed on another day
+    resume_url = checkpoint.get("url") if checkpoint else None
+    start_page = checkpoint.next_page() if checkpoint else 0
     
-    if custom_url:
-        # Use the provided URL directly
-        print("Using custom URL with embedded search parameters")
-        print("⚠️  WARNING: Custom URLs contain session-specific parameters that expire.")
-        print("   This URL will only work temporarily and may become invalid after your browser session ends.")
-        print("   For reliable, repeatable searches, use the CLI search parameters instead of --url option.")
-        print()
-        base_url = custom_url
-        court_name = "Custom Search"  # Generic name since we don't know the court
-    else:
-        # Build search URL from parameters
-        search_builder = CourtSearchBuilder()
-        
-        # Create parser instance early for court ID discovery
-        parser = ParserAppealsAL(headless=True, rate_limit_seconds=2)
-        
-        # Discover court IDs if not already done
-        if not search_builder.session_initialized:
-            print("Discovering court IDs from website...")
-            search_builder.discover_court_ids(parser)
-        
-        # Set court
-        search_builder.set_court(court)
-        court_info = search_builder.get_court_info()
-        court_name = court_info['name']
-        
-        # Verify court ID was discovered
-        if court_info['id'] is None:
-            raise ValueError(f"Could not discover court ID for {court_name}. "
-                           "Try using the --url option with a pre-built search URL instead.")
-        
-        # Set date range
-        if date_period == 'custom':
-            if not start_date or not end_date:
-                raise ValueError("Custom date range requires both start_date and end_date")
-            search_builder.set_date_range(start_date, end_date, 'custom')
-        else:
-            search_builder.set_date_range(period=date_period)
-        
-        # Set filters
-        if case_number:
-            search_builder.set_case_number_filter(case_number)
-        if case_title:
-            search_builder.set_case_title_filter(case_title)
-        if case_category:
-            search_builder.set_case_category(case_category)
-        
-        search_builder.set_exclude_closed(exclude_closed)
-        
-        # Build initial URL
-        base_url = search_builder.build_url(0)
+    parser = ParserAppealsAL(headless=True, rate_limit_seconds=2, rate_limiter=rate_limiter,
+                             recycle_after_pages=recycle_after_pages,
+                             max_browser_rss_mb=max_browser_rss_mb)
+    search_builder, court_name, base_url = prepare_court_search(search, parser, search_builder,
+                                                                refresh_court_ids, court_id_cache_path)
+    search.print_banner(court_name)
     
-    print("Alabama Appeals Court - Configurable Data Extraction")
-    print("=" * 55)
-    print(f"Court: {court_name}")
-    print(f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    if not custom_url:
-        print(f"Date period: {date_period}")
-        if date_period == 'custom':
-            print(f"Date range: {start_date} to {end_date}")
-        if case_number:
-            print(f"Case number filter: {case_number}")
-        if case_title:
-            print(f"Case title filter: {case_title}")
-        if case_category:
-            print(f"Case category: {case_category}")
-        print(f"Exclude closed: {exclude_closed}")
-    print(f"Max pages: {max_pages or 'All available'}")
-    print()
-    
-    # Create parser instance (may have been created earlier for court ID discovery)
-    if 'parser' not in locals():
-        parser = ParserAppealsAL(headless=True, rate_limit_seconds=2)
+    stream = None
+    progress = None
     
     try:
-        # First, get the first page to determine total pages
-        print("Loading first page to determine total results...")
-        result = parser.parse_article(base_url)
+        page_size, result = load_first_page(parser, search_builder, base_url, court_name, page_size,
+                                            resume_url, start_page)
         
-        if "cases" not in result or not result['cases']:
+        # A failed first page is retried by iter_pages below, it does not mean no results
+        if not resume_url and not result.get('error') and not result.get('cases'):
             print("No cases found with the specified criteria.")
-            return
+            if save_output:
+                return
+            return {"status": "success", "total_cases": 0, "page_size": page_size, "cases": []}
         
-        # Try to get total pages from the URL after JavaScript execution
+        # Work out total pages from totalElements at our page size
         total_pages = None
+        total_elements = None
         if hasattr(parser, 'driver') and parser.driver:
-            current_url = parser.driver.current_url
-            _, total_pages = parse_court_url(current_url)
+            total_elements = parse_court_page_info(parser.driver.current_url)['totalElements']
+            if total_elements:
+                total_pages = total_pages_for(total_elements, page_size)
             
         if not total_pages:
             # Estimate based on first page results
             total_pages = 1
             print(f"Could not determine total pages, will process incrementally")
         else:
-            print(f"Found {total_pages} total pages")
+            print(f"Found {total_elements} results on {total_pages} pages of {page_size}")
         
         # Apply max_pages limit
+        limited = False
         if max_pages and max_pages < total_pages:
             total_pages = max_pages
+            limited = True
             print(f"Limited to {max_pages} pages")
         
-        all_cases = []
+        stream = output.open_stream(checkpoint)
+        cases_before = stream.records_written if stream is not None else 0
+        page_sync = CourtPageSync.open(search.sync_key(), sync_store, sync_state_path) if sync else None
         
-        # Process all pages
-        for page_num in range(total_pages):
-            print(f"Processing page {page_num + 1}...", end='', flush=True)
-            
-            if page_num == 0:
-                # Use result from first page
-                page_result = result
-            else:
-                # Build URL for subsequent pages only if not using custom URL
-                if custom_url:
-                    # For custom URLs, we need to modify pagination manually
-                    # This is a simplified approach - in practice, you'd need to parse and modify the URL
-                    page_url = custom_url.replace('number~0', f'number~{page_num}')
-                else:
-                    page_url = search_builder.build_url(page_num)
-                page_result = parser.parse_article(page_url)
-            
-            if "cases" in page_result and page_result['cases']:
-                all_cases.extend(page_result['cases'])
-                print(f" Found {len(page_result['cases'])} cases")
-            else:
-                print(" No cases found")
-                # If no cases on this page, we might have reached the end
-                break
+        # Process pages as they are parsed; the end is discovered while paging
+        if resume_url:
+            page_base_url = resume_url
+        elif search_builder is None:
+            page_base_url = build_court_url(base_url, 0, page_size)
+        else:
+            page_base_url = search_builder.build_url(0)
+        if checkpoint:
+            checkpoint.writer = stream
+            checkpoint.state["data"].update(url=page_base_url, page_size=page_size)
+        progress = ProgressTracker(court_name, total=total_pages if total_elements or limited else None,
+                                   done=start_page, byte_stages=("page_load",))
+        all_cases, cases_written, pages_processed = collect_court_pages(
+            parser, page_base_url, result, page_size, total_pages, court_name, max_pages=max_pages,
+            limited=limited, start_page=start_page, stream=stream if stream is not None else writer,
+            page_sync=page_sync, checkpoint=checkpoint, progress=progress)
+        progress.finish()
+        cases_found = cases_before + cases_written
+        
+        # Verify nothing was silently truncated
+        complete = True
+        if page_sync:
+            page_sync.finish()
+        elif not limited and not verify_case_count(cases_found, total_elements):
+            complete = cases_found >= total_elements
         
         # Create output data
         output_data = {
-            "status": "success",
-            "search_parameters": {
-                "court": court if not custom_url else "Custom URL",
-                "date_period": date_period if not custom_url else "Custom URL",
-                "start_date": start_date,
-                "end_date": end_date,
-                "case_number_filter": case_number,
-                "case_title_filter": case_title,
-                "case_category": case_category,
-                "exclude_closed": exclude_closed,
-                "custom_url": custom_url
-            },
-            "total_cases": len(all_cases),
+            "status": "success" if complete else "incomplete",
+            "search_parameters": search.search_parameters(),
+            "total_cases": cases_found,
+            "expected_total": total_elements,
+            "page_size": page_size,
+            "sync": page_sync.summary() if page_sync else None,
             "extraction_date": datetime.now().strftime("%Y-%m-%d"),
             "extraction_time": datetime.now().strftime("%H:%M:%S"),
-            "pages_processed": page_num + 1,
+            "pages_processed": pages_processed,
+            "driver": parser.driver_report(),
+            "output_format": output_format,
             "cases": all_cases
         }
-        
-        # Save results
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        json_filename = f"{output_prefix}_{timestamp}.json"
-        
-        with open(json_filename, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, indent=4, ensure_ascii=False)
-        
-        print(f"\n✓ Successfully extracted {len(all_cases)} court cases")
-        print(f"✓ Results saved to {json_filename}")
-        
-        # Create CSV if there are results
-        if all_cases:
-            csv_filename = f"{output_prefix}_{timestamp}.csv"
-            with open(csv_filename, "w", encoding="utf-8") as f:
-                f.write("Court,Case Number,Case Title,Classification,Filed Date,Status,Case Link\n")
-                
-                for case in all_cases:
-                    court = case.get('court', '').replace(',', ';')
-                    case_num = case.get('case_number', {}).get('text', '').replace(',', ';')
-                    title = case.get('case_title', '').replace(',', ';').replace('"', "'")
-                    classification = case.get('classification', '').replace(',', ';')
-                    filed = case.get('filed_date', '')
-                    status = case.get('status', '')
-                    link = f"https://publicportal.alappeals.gov{case.get('case_number', {}).get('link', '')}"
-                    
-                    f.write(f'"{court}","{case_num}","{title}","{classification}","{filed}","{status}","{link}"\n')
-            
-            print(f"✓ CSV table saved to {csv_filename}")
-        
+        finish_court_output(output_data, output, court_name, stream, checkpoint)
         return output_data
         
     except Exception as e:
         print(f"\nError occurred: {str(e)}")
         import traceback
         traceback.print_exc()
+        if stream is not None:
+            stream.close({"error": str(e)}, status="failed")
+            print(f"Cases found before the error are in {stream.path}")
+        if checkpoint and checkpoint.completed:
+            print(f"Continue where this run stopped with --resume (checkpoint: {checkpoint.path})")
         return None
     finally:
+        if progress:
+            progress.finish()
         parser._close_driver()
         print(f"\nEnd time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 
+def extract_multiple_courts(
+    courts,
+    date_period='1y',
+    start_date=None,
+    end_date=None,
+    case_number=None,
+    case_title=None,
+    case_category=None,
+    exclude_closed=False,
+    max_pages=None,
+    output_prefix="court_cases",
+    page_size=None,
+    sync=False,
+    sync_state_path=DEFAULT_SYNC_STATE_PATH,
+    refresh_court_ids=False,
+    court_id_cache_path=DEFAULT_COURT_ID_CACHE_PATH,
+    recycle_after_pages=None,
+    max_browser_rss_mb=None,
+    requests_per_second=0.5,
+    output_format='json',
+    database_path=DEFAULT_DATABASE_PATH,
+    csv_compression=None
+):
+    """
+    Extract several courts concurrently into one merged dataset
+    
+    Court IDs are discovered once and shared, each court runs in its own
+    thread with its own browser, and all page loads go through one rate limiter.
+    
+    Args:
+        courts: Court keys to search (see COURT_KEYS)
+        requests_per_second: Page load rate across all courts
+        Other arguments are as for extract_court_cases_with_params
+        
+    Returns:
+        Dictionary with the merged results, each case tagged with its court_key,
+        or None on error
+    """
+    rate_limiter = RateLimiter(requests_per_second)
+    sync_store = CourtSyncStore(sync_state_path) if sync else None
+    stream = None
+    if output_format != 'json':
+        stream = open_writer(output_format, f"{output_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                             database_path=database_path, compression=csv_compression)
+    
+    print(f"Alabama Appeals Court - Multi-Court Extraction ({', '.join(courts)})")
+    print("=" * 55)
+    print(f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    # Discover court IDs once for every court
+    template = CourtSearchBuilder(id_cache=CourtIdCache(court_id_cache_path))
+    if refresh_court_ids or not template.session_initialized:
+        print("Discovering court IDs...")
+        discovery_parser = ParserAppealsAL(headless=True, rate_limiter=rate_limiter)
+        try:
+            template.discover_court_ids(discovery_parser, force=refresh_court_ids, courts=courts)
+        finally:
+            discovery_parser._close_driver()
+    for court in courts:
+        template.set_court(court)
+        if template.get_court_info()['id'] is None:
+            raise ValueError(f"Could not discover court ID for {template.get_court_info()['name']}.")
+    
+    def run_court(court):
+        try:
+            return extract_court_cases_with_params(
+                court=court,
+                date_period=date_period,
+                start_date=start_date,
+                end_date=end_date,
+                case_number=case_number,
+                case_title=case_title,
+                case_category=case_category,
+                exclude_closed=exclude_closed,
+                max_pages=max_pages,
+                page_size=page_size,
+                sync=sync,
+                recycle_after_pages=recycle_after_pages,
+                max_browser_rss_mb=max_browser_rss_mb,
+                search_builder=template,
+                rate_limiter=rate_limiter,
+                sync_store=sync_store,
+                save_output=False,
+                writer=TaggedWriter(stream, court_key=court) if stream else None
+            )
+        except Exception as e:
+            print(f"Error extracting {court} court: {e}")
+            return None
+    
+    with ThreadPoolExecutor(max_workers=len(courts)) as executor:
+        results = dict(zip(courts, executor.map(run_court, courts)))
+    
+    if sync_store:
+        sync_store.save()
+    
+    all_cases = []
+    court_summaries = {}
+    for court in courts:
+        result = results[court]
+        if not result:
+            court_summaries[court] = {"status": "error", "total_cases": 0}
+            continue
+        for case in result['cases']:
+            case['court_key'] = court
+        all_cases.extend(result['cases'])
+        court_summaries[court] = {
+            key: result.get(key)
+            for key in ("status", "total_cases", "expected_total", "page_size",
+                        "pages_processed", "sync", "driver")
+        }
+    
+    failed = [court for court in courts if not results[court]]
+    output_data = {
+        "status": "success" if not failed else "partial",
+        "search_parameters": {
+            "courts": list(courts),
+            "date_period": date_period,
+            "start_date": start_date,
+            "end_date": end_date,
+            "case_number_filter": case_number,
+            "case_title_filter": case_title,
+            "case_category": case_category,
+            "exclude_closed": exclude_closed
+        },
+        "total_cases": sum(summary['total_cases'] or 0 for summary in court_summaries.values()),
+        "courts": court_summaries,
+        "extraction_date": datetime.now().strftime("%Y-%m-%d"),
+        "extraction_time": datetime.now().strftime("%H:%M:%S"),
+        "output_format": output_format,
+        "cases": all_cases
+    }
+    
+    if stream:
+        stream.close({key: value for key, value in output_data.items() if key != 'cases'},
+                     status="complete" if not failed else "partial")
+        print(f"\n✓ Results streamed to {stream.path} (summary in {stream.manifest_path})")
+    else:
+        save_court_results(output_data, output_prefix, csv_compression)
+    for court in courts:
+        print(f"  {court}: {court_summaries[court]['total_cases']} cases")
+    if failed:
+        print(f"⚠️  No results for: {', '.join(failed)}")
+    print(f"\nEnd time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    return output_data
+
+
 def main():
     """Command line interface for the configurable court extractor"""
     parser = argparse.ArgumentParser(description='Extract Alabama Court cases with configurable search parameters OR custom URL')
@@ -595,8 +1371,9 @@ def main():
     parser.add_argument('--url', help='Pre-built search URL with embedded parameters (overrides all search options)')
     
     # Search parameter arguments (ignored if --url is provided)
-    parser.add_argument('--court', choices=['civil', 'criminal', 'supreme'], 
-                       default='civil', help='Court to search (default: civil)')
+    parser.add_argument('--court', default='civil',
+                       help='Court to search: civil, criminal, supreme, a comma-separated list, '
+                            'or all to search several courts concurrently (default: civil)')
     parser.add_argument('--date-period', choices=['7d', '1m', '3m', '6m', '1y', 'custom'], 
                        default='1y', help='Date period for case search (default: 1y)')
     parser.add_argument('--start-date', help='Start date for custom range (YYYY-MM-DD)')
@@ -614,8 +1391,57 @@ def main():
                        help='Maximum number of pages to process (default: all)')
     parser.add_argument('--output-prefix', default='court_cases',
                        help='Prefix for output files (default: court_cases)')
+    parser.add_argument('--page-size', type=int,
+                       help='Results per page (default: largest size the portal honors)')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='json',
+                       help='json writes JSON and CSV files at the end; jsonl, csv and parquet stream '
+                            'cases to the file as each page is parsed; sqlite upserts them into '
+                            'the --database file (default: json)')
+    parser.add_argument('--database', default=DEFAULT_DATABASE_PATH,
+                       help=f'SQLite database used with --format sqlite (default: {DEFAULT_DATABASE_PATH})')
+    parser.add_argument('--csv-compression', choices=list(COMPRESSION_SUFFIXES),
+                       help='Compress the CSV output; zstd needs the zstandard package (default: none)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continue an interrupted jsonl, csv or sqlite extraction from its checkpoint')
+    parser.add_argument('--checkpoint',
+                       help='Checkpoint file written after each page (default: <output-prefix>.checkpoint.json)')
+    add_instrumentation_arguments(parser, "configurable_court_extractor")
+    parser.add_argument('--sync', action='store_true',
+                       help='Only output cases that are new or changed since the last sync')
+    parser.add_argument('--sync-state', default=DEFAULT_SYNC_STATE_PATH,
+                       help=f'Sync state file (default: {DEFAULT_SYNC_STATE_PATH})')
+    parser.add_argument('--refresh-court-ids', action='store_true',
+                       help='Rediscover court IDs from the website instead of using the cache')
+    parser.add_argument('--court-id-cache', default=DEFAULT_COURT_ID_CACHE_PATH,
+                       help=f'Court ID cache file (default: {DEFAULT_COURT_ID_CACHE_PATH})')
+    parser.add_argument('--recycle-pages', type=int,
+                       help='Restart the browser after this many pages (default: never)')
+    parser.add_argument('--max-browser-mb', type=float,
+                       help='Restart the browser when its processes exceed this much resident memory')
+    parser.add_argument('--rate', type=float, default=0.5,
+                       help='Maximum page loads per second across all courts when several are searched '
+                            '(default: 0.5)')
     
+    add_logging_arguments(parser)
+    add_progress_argument(parser)
     args = parser.parse_args()
+    configure_logging(args.log_level, args.log_format, args.quiet)
+    configure_progress(args.progress)
+    start_instrumentation(parser, args, "configurable_court_extractor")
+    
+    if args.page_size is not None and args.page_size < 1:
+        parser.error("--page-size must be at least 1")
+    try:
+        check_output_format(args.format, args.csv_compression)
+    except ImportError as e:
+        parser.error(str(e))
+    if args.recycle_pages is not None and args.recycle_pages < 1:
+        parser.error("--recycle-pages must be at least 1")
+    if args.max_browser_mb is not None and args.max_browser_mb <= 0:
+        parser.error("--max-browser-mb must be greater than 0")
+    checkpoint_path = args.checkpoint or f"{args.output_prefix}.checkpoint.json"
+    if args.resume and (args.sync or not can_resume(args.format, args.csv_compression)):
+        parser.error("--resume needs --format jsonl, csv (uncompressed) or sqlite and cannot be used with --sync")
     
     # If URL is provided, skip all parameter validation
     if args.url:
@@ -624,37 +1450,57 @@ def main():
         print("   Your URL may stop working when the court website session expires.")
         print("   Consider using CLI search parameters for reliable, repeatable searches.")
         print()
-        extract_court_cases_with_params(
-            custom_url=args.url,
-            max_pages=args.max_pages,
-            output_prefix=args.output_prefix
-        )
+        try:
+            extract_court_cases_with_params(
+                custom_url=args.url,
+                max_pages=args.max_pages,
+                output_prefix=args.output_prefix,
+                page_size=args.page_size,
+                sync=args.sync,
+                sync_state_path=args.sync_state,
+                recycle_after_pages=args.recycle_pages,
+                max_browser_rss_mb=args.max_browser_mb,
+                output_format=args.format,
+                database_path=args.database,
+                csv_compression=args.csv_compression,
+                checkpoint_path=checkpoint_path,
+                resume=args.resume
+            )
+        except (FileNotFoundError, ValueError) as e:
+            parser.error(str(e))
         return
     
+    try:
+        courts = parse_court_list(args.court)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.rate <= 0:
+        parser.error("--rate must be greater than 0")
+    
     # Validate custom date range
     if args.date_period == 'custom':
         if not args.start_date or not args.end_date:
             parser.error("Custom date period requires both --start-date and --end-date")
     
-    # Validate case category for court
+    # Validate case category for each court
     if args.case_category:
         builder = CourtSearchBuilder()
-        builder.set_court(args.court)
-        try:
-            builder.validate_case_category(args.case_category)
-        except ValueError as e:
-            parser.error(str(e))
+        for court in courts:
+            builder.set_court(court)
+            try:
+                builder.validate_case_category(args.case_category)
+            except ValueError as e:
+                parser.error(str(e))
     
     # Show case number format suggestion
     if args.case_number:
         builder = CourtSearchBuilder()
-        builder.set_court(args.court)
-        suggested_format = builder.format_case_number_suggestion()
-        print(f"Case number format for {builder.get_court_info()['name']}: {suggested_format}")
+        for court in courts:
+            builder.set_court(court)
+            suggested_format = builder.format_case_number_suggestion()
+            print(f"Case number format for {builder.get_court_info()['name']}: {suggested_format}")
     
-    # Extract cases using search parameters
-    extract_court_cases_with_params(
-        court=args.court,
+    search_options = dict(
         date_period=args.date_period,
         start_date=args.start_date,
         end_date=args.end_date,
@@ -663,8 +1509,35 @@ def main():
         case_category=args.case_category,
         exclude_closed=args.exclude_closed,
         max_pages=args.max_pages,
-        output_prefix=args.output_prefix
+        output_prefix=args.output_prefix,
+        page_size=args.page_size,
+        sync=args.sync,
+        sync_state_path=args.sync_state,
+        refresh_court_ids=args.refresh_court_ids,
+        court_id_cache_path=args.court_id_cache,
+        recycle_after_pages=args.recycle_pages,
+        max_browser_rss_mb=args.max_browser_mb,
+        output_format=args.format,
+        database_path=args.database,
+        csv_compression=args.csv_compression
     )
+    
+    # Several courts run concurrently into one merged output
+    if len(courts) > 1:
+        if args.resume:
+            parser.error("--resume works with a single court")
+        try:
+            extract_multiple_courts(courts, requests_per_second=args.rate, **search_options)
+        except ValueError as e:
+            parser.error(str(e))
+        return
+    
+    # Extract cases using search parameters
+    try:
+        extract_court_cases_with_params(court=courts[0], checkpoint_path=checkpoint_path,
+                                        resume=args.resume, **search_options)
+    except (FileNotFoundError, ValueError) as e:
+        parser.error(str(e))
 
 
 if __name__ == "__main__":
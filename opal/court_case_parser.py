@@ -1,10 +1,13 @@
 """
 Court Case Parser for Alabama Appeals Court Public Portal
 """
+import hashlib
+import itertools
 import json
+import logging
 import time
-from datetime import datetime
-from typing import Dict, List, Optional
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -13,24 +16,147 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
+from . import metrics
+from .progress import ProgressTracker
 from .parser_module import BaseParser
+from .court_url_paginator import iter_court_urls, parse_court_page_info, total_pages_for
+from .process_memory import process_tree_rss
+
+
+# Origin of the court portal; case_number links are relative to it
+PORTAL_BASE_URL = "https://publicportal.alappeals.gov"
+
+logger = logging.getLogger(__name__)
+
+
+# JavaScript run inside the results page to collect the table rows without
+# transferring page_source. It mirrors what BeautifulSoup does in
+# parse_table_row: every text node is stripped and the pieces are joined
+# with no separator, which is how get_text(strip=True) behaves.
+TABLE_ROWS_SCRIPT = """
+var table = document.querySelector('table');
+if (!table) {
+    return null;
+}
+function strippedText(node) {
+    var walker = document.createTreeWalker(node, NodeFilter.SHOW_TEXT, null);
+    var parts = [];
+    var current;
+    while ((current = walker.nextNode())) {
+        var parent = current.parentNode;
+        if (parent && (parent.nodeName === 'SCRIPT' || parent.nodeName === 'STYLE')) {
+            continue;
+        }
+        var text = current.nodeValue.trim();
+        if (text) {
+            parts.push(text);
+        }
+    }
+    return parts.join('');
+}
+var rows = Array.prototype.slice.call(table.querySelectorAll('tr'), 1);
+return rows.map(function (row) {
+    var cells = Array.prototype.map.call(row.querySelectorAll('td'), strippedText);
+    var link = null;
+    var cell = row.querySelectorAll('td')[1];
+    var anchor = cell ? cell.querySelector('a') : null;
+    if (anchor) {
+        link = {text: strippedText(anchor), href: anchor.getAttribute('href') || ''};
+    }
+    return {cells: cells, link: link};
+});
+"""
+
+
+class PageLoadError(RuntimeError):
+    """A results page could not be loaded or parsed, even after retrying"""
+
+    def __init__(self, page_index: int, url: str, error: str):
+        super().__init__(f"Page {page_index + 1} failed: {error}")
+        self.page_index = page_index
+        self.url = url
+        self.error = error
+
+
+def case_fingerprint(case: Dict) -> str:
+    """
+    Stable hash of the fields shown for a case in the results table
+    
+    Two results rows with the same fingerprint describe an unchanged case,
+    so anything derived from the case (like its detail page) can be reused.
+    
+    Args:
+        case: Case dictionary as returned by parse_table_row
+        
+    Returns:
+        Hex digest of the case fields
+    """
+    fields = {
+        "court": case.get("court", ""),
+        "case_number": case.get("case_number", {}).get("text", ""),
+        "link": case.get("case_number", {}).get("link", ""),
+        "case_title": case.get("case_title", ""),
+        "classification": case.get("classification", ""),
+        "filed_date": case.get("filed_date", ""),
+        "status": case.get("status", "")
+    }
+    encoded = json.dumps(fields, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def parse_filed_date(text: str) -> Optional[date]:
+    """
+    Parse a filed date as shown in the results table
+    
+    Args:
+        text: Date text such as "06/11/2025"
+        
+    Returns:
+        Parsed date or None if the text is not a recognized date
+    """
+    for date_format in ("%m/%d/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text.strip(), date_format).date()
+        except (ValueError, AttributeError):
+            continue
+    return None
 
 
 class ParserAppealsAL(BaseParser):
     """Parser for Alabama Appeals Court Public Portal using Selenium for JavaScript rendering"""
     
-    def __init__(self, headless: bool = True, rate_limit_seconds: int = 3):
+    def __init__(self, headless: bool = True, rate_limit_seconds: int = 3,
+                 use_browser_extraction: bool = True, rate_limiter=None,
+                 recycle_after_pages: Optional[int] = None,
+                 max_browser_rss_mb: Optional[float] = None):
         """
         Initialize the Court Case Parser
         
         Args:
             headless: Run browser in headless mode (no GUI)
             rate_limit_seconds: Seconds to wait between requests
+            use_browser_extraction: Collect table rows with a single script run
+                inside the browser instead of parsing page_source with BeautifulSoup
+            rate_limiter: Optional RateLimiter shared with other parsers; when set it
+                spaces out page loads instead of rate_limit_seconds
+            recycle_after_pages: Restart the browser after this many page loads
+                (None to keep one browser for the whole session)
+            max_browser_rss_mb: Restart the browser before the next page load once
+                Chrome and its child processes use more resident memory than this
         """
         super().__init__()
         self.headless = headless
         self.rate_limit_seconds = rate_limit_seconds
+        self.use_browser_extraction = use_browser_extraction
+        self.rate_limiter = rate_limiter
+        self.recycle_after_pages = recycle_after_pages
+        self.max_browser_rss_mb = max_browser_rss_mb
         self.driver = None
+        self.pages_since_restart = 0
+        self.peak_browser_rss_mb = 0.0
+        self.recycle_events = []
+        # Pagination discovered by the latest iter_pages run
+        self.pagination = {"page_size": None, "total_elements": None, "total_pages": None}
         
     def _setup_driver(self):
         """Set up Chrome driver with appropriate options"""
@@ -42,8 +168,10 @@ class ParserAppealsAL(BaseParser):
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
         
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        with metrics.timer("browser_start"):
+            service = Service(ChromeDriverManager().install())
+            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        self.pages_since_restart = 0
         
     def _close_driver(self):
         """Close the browser driver"""
@@ -51,39 +179,129 @@ class ParserAppealsAL(BaseParser):
             self.driver.quit()
             self.driver = None
             
-    def make_request(self, url: str, timeout: int = 30) -> Optional[str]:
+    def browser_memory(self) -> Dict[int, int]:
         """
-        Override make_request to use Selenium instead of requests
+        Resident memory of the browser processes
+        
+        Returns:
+            Dictionary of pid to RSS in bytes for chromedriver and every Chrome
+            process it started; empty if no browser is running
+        """
+        process = getattr(getattr(self.driver, 'service', None), 'process', None)
+        return process_tree_rss(getattr(process, 'pid', None))
+        
+    def _recycle_reason(self) -> Optional[Tuple[str, Dict[int, int]]]:
+        """Why the browser should be restarted before the next page, if it should"""
+        memory = self.browser_memory() if self.max_browser_rss_mb else {}
+        rss_mb = sum(memory.values()) / (1024 * 1024)
+        self.peak_browser_rss_mb = max(self.peak_browser_rss_mb, rss_mb)
+        if self.recycle_after_pages and self.pages_since_restart >= self.recycle_after_pages:
+            return "pages", memory
+        if self.max_browser_rss_mb and rss_mb > self.max_browser_rss_mb:
+            return "memory", memory
+        return None
+        
+    def _recycle_driver_if_needed(self):
+        """Restart the browser when the page count or memory limit is reached"""
+        if not self.driver:
+            return
+        recycle = self._recycle_reason()
+        if recycle is None:
+            return
+        reason, memory = recycle
+        event = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "reason": reason,
+            "pages": self.pages_since_restart,
+            "browser_rss_mb": round(sum(memory.values()) / (1024 * 1024), 1),
+            "process_rss_mb": {str(pid): round(rss / (1024 * 1024), 1) for pid, rss in memory.items()},
+        }
+        self.recycle_events.append(event)
+        metrics.add("browser_start", "restarts")
+        logger.info("Restarting browser after %d pages (%s, %s MB resident)",
+                    event['pages'], reason, event['browser_rss_mb'], extra={"recycle": event})
+        self._close_driver()
+        
+    def driver_report(self) -> Dict:
+        """
+        Browser lifecycle summary for run reports
+        
+        Returns:
+            Dictionary with the recycle policy, restart events and memory peaks
+        """
+        memory = self.browser_memory()
+        return {
+            "recycle_after_pages": self.recycle_after_pages,
+            "max_browser_rss_mb": self.max_browser_rss_mb,
+            "restarts": len(self.recycle_events),
+            "recycle_events": self.recycle_events,
+            "peak_browser_rss_mb": round(self.peak_browser_rss_mb, 1),
+            "current_process_rss_mb": {str(pid): round(rss / (1024 * 1024), 1)
+                                       for pid, rss in memory.items()},
+        }
+            
+    def _load_page(self, url: str, timeout: int = 30, wait_selector: str = "table") -> bool:
+        """
+        Navigate the browser to a URL and wait for the results table
         
         Args:
             url: URL to load
             timeout: Maximum time to wait for page load
+            wait_selector: CSS selector that must be present before the page counts as loaded
             
         Returns:
-            Page source HTML or None if error
+            True if the page loaded, False if error
         """
         try:
+            self._recycle_driver_if_needed()
             if not self.driver:
                 self._setup_driver()
                 
-            self.driver.get(url)
+            if self.rate_limiter:
+                metrics.observe("wait", "seconds", self.rate_limiter.wait())
+                
+            metrics.add("page_load", "requests")
+            with metrics.timer("page_load"):
+                self.driver.get(url)
+                self.pages_since_restart += 1
+                
+                # Wait for table to be present
+                WebDriverWait(self.driver, timeout).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector))
+                )
             
-            # Wait for table to be present
-            WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "table"))
-            )
+            with metrics.timer("wait"):
+                # Additional wait for dynamic content to load
+                time.sleep(2)
+                
+                # Rate limiting
+                if not self.rate_limiter:
+                    time.sleep(self.rate_limit_seconds)
             
-            # Additional wait for dynamic content to load
-            time.sleep(2)
+            return True
             
-            # Rate limiting
-            time.sleep(self.rate_limit_seconds)
+        except Exception as e:
+            metrics.add("page_load", "errors")
+            logger.warning("Error loading page %s: %s", url, e, extra={"url": url})
+            return False
             
-            return self.driver.page_source
+    def make_request(self, url: str, timeout: int = 30, wait_selector: str = "table") -> Optional[str]:
+        """
+        Override make_request to use Selenium instead of requests
+        
+        Args:
+            url: URL to load
+            timeout: Maximum time to wait for page load
+            wait_selector: CSS selector that must be present before the page counts as loaded
             
-        except Exception as e:
-            print(f"Error loading page {url}: {str(e)}")
+        Returns:
+            Page source HTML or None if error
+        """
+        if not self._load_page(url, timeout, wait_selector):
             return None
+        html = self.driver.page_source
+        metrics.add("page_load", "bytes", len(html.encode("utf-8")))
+        return html
             
     def parse_table_row(self, row) -> Optional[Dict]:
         """
@@ -100,41 +318,95 @@ class ParserAppealsAL(BaseParser):
             if len(cells) < 6:
                 return None
                 
-            # Extract court name (column 1)
-            court = cells[0].get_text(strip=True)
-            
             # Extract case number and link (column 2)
             case_number_elem = cells[1].find('a')
             if case_number_elem:
-                case_number = {
+                link = {
                     "text": case_number_elem.get_text(strip=True),
-                    "link": case_number_elem.get('href', '')
+                    "href": case_number_elem.get('href', '')
                 }
             else:
-                case_number = {
-                    "text": cells[1].get_text(strip=True),
-                    "link": ""
-                }
+                link = None
                 
-            # Extract remaining fields
-            case_title = cells[2].get_text(strip=True)
-            classification = cells[3].get_text(strip=True)
-            filed_date = cells[4].get_text(strip=True)
-            status = cells[5].get_text(strip=True)
-            
-            return {
-                "court": court,
-                "case_number": case_number,
-                "case_title": case_title,
-                "classification": classification,
-                "filed_date": filed_date,
-                "status": status
-            }
+            return self.parse_row_data({
+                "cells": [cell.get_text(strip=True) for cell in cells],
+                "link": link
+            })
             
         except Exception as e:
-            print(f"Error parsing table row: {str(e)}")
+            logger.warning("Error parsing table row: %s", e)
             return None
             
+    def parse_row_data(self, row_data: Dict) -> Optional[Dict]:
+        """
+        Build case data from the cell texts of a single table row
+        
+        This is shared by parse_table_row and the in-browser extraction path
+        so both produce identical output.
+        
+        Args:
+            row_data: Dictionary with "cells" (stripped text of each td) and
+                "link" (text and href of the case number anchor, or None)
+            
+        Returns:
+            Dictionary with case data or None if the row is not a case row
+        """
+        cells = row_data.get("cells") or []
+        if len(cells) < 6:
+            return None
+            
+        link = row_data.get("link")
+        if link:
+            case_number = {
+                "text": link.get("text", ""),
+                "link": link.get("href") or ""
+            }
+        else:
+            case_number = {
+                "text": cells[1],
+                "link": ""
+            }
+            
+        return {
+            "court": cells[0],
+            "case_number": case_number,
+            "case_title": cells[2],
+            "classification": cells[3],
+            "filed_date": cells[4],
+            "status": cells[5]
+        }
+            
+    def extract_rows_in_browser(self) -> Optional[List[Dict]]:
+        """
+        Collect the results table rows from the loaded page with one script call
+        
+        Returns:
+            List of row data dictionaries (see parse_row_data), or None if the
+            page has no table
+        """
+        return self.driver.execute_script(TABLE_ROWS_SCRIPT)
+            
+    def _parse_cases_in_browser(self, url: str) -> Dict:
+        """Load a results page and parse its cases without fetching page_source"""
+        if not self._load_page(url):
+            return {"error": "Failed to load page", "cases": []}
+            
+        with metrics.timer("parse"):
+            rows = self.extract_rows_in_browser()
+            if rows is None:
+                return {"error": "No table found", "cases": []}
+            # The page source is never fetched here, so the rows passed back stand in for the download
+            metrics.add("page_load", "bytes", len(json.dumps(rows, ensure_ascii=False).encode("utf-8")))
+                
+            cases = []
+            for row_data in rows:
+                case_data = self.parse_row_data(row_data)
+                if case_data:
+                    cases.append(case_data)
+                    
+        metrics.observe("parse", "rows", len(cases))
+        return {"cases": cases}
+            
     def parse_article(self, url: str) -> Dict:
         """
         Override parse_article to parse court case table data
@@ -147,53 +419,188 @@ class ParserAppealsAL(BaseParser):
             Dictionary with parsed cases from this page
         """
         try:
+            if self.use_browser_extraction:
+                return self._parse_cases_in_browser(url)
+                
             html_content = self.make_request(url)
             if not html_content:
                 return {"error": "Failed to load page", "cases": []}
                 
-            soup = BeautifulSoup(html_content, 'html.parser')
+            with metrics.timer("parse"):
+                result = self.parse_results_html(html_content)
+            if "error" not in result:
+                metrics.observe("parse", "rows", len(result["cases"]))
+            return result
             
-            # Find the table
-            table = soup.find('table')
-            if not table:
-                return {"error": "No table found", "cases": []}
+        except Exception as e:
+            return {"error": str(e), "cases": []}
+            
+    def parse_results_html(self, html_content: str) -> Dict:
+        """
+        Parse the cases in the results table of a page's HTML
+        
+        Args:
+            html_content: HTML of a results page
+            
+        Returns:
+            Dictionary with the parsed cases, or an error if there is no table
+        """
+        soup = BeautifulSoup(html_content, 'html.parser')
+        
+        # Find the table
+        table = soup.find('table')
+        if not table:
+            return {"error": "No table found", "cases": []}
+            
+        # Find all data rows (skip header)
+        rows = table.find_all('tr')[1:]  # Skip header row
+        
+        cases = []
+        for row in rows:
+            case_data = self.parse_table_row(row)
+            if case_data:
+                cases.append(case_data)
+        return {"cases": cases}
+            
+    def _update_pagination(self, url: str, page_size: Optional[int]):
+        """Refresh self.pagination from the URL the browser ended up on"""
+        info = parse_court_page_info(self.driver.current_url) if self.driver else {}
+        size = info.get('size') or page_size or parse_court_page_info(url)['size']
+        total_elements = info.get('totalElements')
+        total_pages = info.get('totalPages')
+        if total_elements and size:
+            total_pages = total_pages_for(total_elements, size)
+        self.pagination = {
+            "page_size": size,
+            "total_elements": total_elements if total_elements else self.pagination["total_elements"],
+            "total_pages": total_pages if total_pages else self.pagination["total_pages"],
+        }
+            
+    def iter_pages(self, base_url: str, page_urls: Optional[Iterable[str]] = None,
+                   first_page_result: Optional[Dict] = None, page_size: Optional[int] = None,
+                   max_pages: Optional[int] = None, start_page: int = 0,
+                   page_retries: int = 2) -> Iterator[Tuple[int, Dict]]:
+        """
+        Parse result pages one at a time
+        
+        Without page_urls, page URLs are generated from base_url as needed and
+        the end of the results is discovered while paging: from the portal's
+        totalElements once a page has loaded, or from an empty or short page
+        when the portal reports no total. A page that fails to load is retried
+        with a fresh browser; it never counts as the end of the results. The
+        driver is left open.
+        
+        Args:
+            base_url: Court search URL (page 0)
+            page_urls: Optional URLs to parse instead of generating them
+            first_page_result: Already parsed result of the first page to parse
+                (start_page) so it is not loaded again
+            page_size: Rows per page to request (default: the size in base_url)
+            max_pages: Maximum number of pages to parse
+            start_page: Page to start from, for example when resuming; earlier
+                pages are skipped without loading them
+            page_retries: Further attempts for a page that fails to load
+            
+        Yields:
+            Tuple of (page_index, page_result) for each parsed page
+            
+        Raises:
+            PageLoadError: A page still failed after page_retries further attempts
+        """
+        self.pagination = {"page_size": page_size, "total_elements": None, "total_pages": None}
+        discover = page_urls is None
+        if discover:
+            page_urls = iter_court_urls(base_url, page_size=page_size, start_page=start_page)
+        else:
+            page_urls = itertools.islice(page_urls, start_page, None)
+            
+        for page_index, url in enumerate(page_urls, start=start_page):
+            if max_pages is not None and page_index >= max_pages:
+                break
+                
+            if page_index == start_page and first_page_result is not None:
+                result = first_page_result
+            else:
+                result = self.parse_article(url)
+            for _ in range(page_retries):
+                if not result.get("error"):
+                    break
+                logger.warning("Page %d failed (%s), retrying with a new browser", page_index + 1,
+                               result["error"], extra={"url": url, "page": page_index + 1})
+                metrics.add("page_load", "retries")
+                self._close_driver()
+                result = self.parse_article(url)
+            if result.get("error"):
+                raise PageLoadError(page_index, url, result["error"])
+            if discover:
+                self._update_pagination(url, page_size)
                 
-            # Find all data rows (skip header)
-            rows = table.find_all('tr')[1:]  # Skip header row
+            yield page_index, result
             
-            cases = []
-            for row in rows:
-                case_data = self.parse_table_row(row)
-                if case_data:
-                    cases.append(case_data)
-                    
-            return {"cases": cases}
+            if not discover:
+                continue
+            rows = len(result.get("cases", []))
+            total_pages = self.pagination["total_pages"]
+            if not rows:
+                break
+            if total_pages is not None and page_index + 1 >= total_pages:
+                break
+            if total_pages is None and self.pagination["page_size"] and rows < self.pagination["page_size"]:
+                break
+                
+    def iter_cases(self, base_url: str, page_size: Optional[int] = None,
+                   max_pages: Optional[int] = None, page_urls: Optional[List[str]] = None,
+                   first_page_result: Optional[Dict] = None) -> Iterator[Dict]:
+        """
+        Yield court cases page by page as they are parsed
+        
+        Only one page of cases is held in memory at a time, so callers can
+        write results incrementally. The driver is closed when iteration ends.
+        
+        Args:
+            base_url: Court search URL (page 0)
+            page_size: Rows per page to request (default: the size in base_url)
+            max_pages: Maximum number of pages to parse
+            page_urls: URLs of every page (default: generated from base_url and
+                the portal's totals while paging)
+            first_page_result: Already parsed result of the first page
             
-        except Exception as e:
-            return {"error": str(e), "cases": []}
+        Yields:
+            Case dictionaries in portal order
+        """
+        progress = ProgressTracker("Court pages", total=len(page_urls) if page_urls is not None else None,
+                                   byte_stages=("page_load",))
+        try:
+            for _, result in self.iter_pages(base_url, page_urls, first_page_result,
+                                             page_size=page_size, max_pages=max_pages):
+                if page_urls is None:
+                    progress.set_total(self.pagination["total_pages"])
+                cases = result.get("cases", [])
+                yield from cases
+                progress.update(records=len(cases))
+        finally:
+            progress.finish()
+            self._close_driver()
             
-    def parse_all_cases(self, base_url: str, page_urls: List[str]) -> Dict:
+    def parse_all_cases(self, base_url: str, page_urls: List[str],
+                        first_page_result: Optional[Dict] = None) -> Dict:
         """
         Parse all court cases from multiple pages
         
+        Callers that write cases as they go should use iter_cases instead.
+        
         Args:
             base_url: Base URL of the court portal
             page_urls: List of URLs for each page of results
+            first_page_result: Already parsed result of page_urls[0] (for example
+                from discover_court_pages) so the first page is not loaded twice
             
         Returns:
             Combined results from all pages
         """
         try:
-            all_cases = []
-            total_pages = len(page_urls)
-            
-            for i, url in enumerate(page_urls):
-                print(f"Processing page {i + 1} of {total_pages}...")
-                result = self.parse_article(url)
-                
-                if "cases" in result:
-                    all_cases.extend(result["cases"])
-                    
+            all_cases = list(self.iter_cases(base_url, page_urls=page_urls,
+                                             first_page_result=first_page_result))
             return {
                 "status": "success",
                 "total_cases": len(all_cases),
@@ -208,5 +615,3 @@ class ParserAppealsAL(BaseParser):
                 "total_cases": 0,
                 "cases": []
             }
-        finally:
-            self._close_driver()
\ No newline at end of file
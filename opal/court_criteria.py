@@ -0,0 +1,285 @@
+"""
+Codec for the tilde-encoded search criteria used by the Alabama Appeals Court Public Portal
+
+The portal stores its search state in the criteria query parameter using the
+JSURL format, for example ~(page~(size~25~number~0)~sort~(sortBy~'caseHeader.filedDate)).
+Objects are ~( ... ), strings start with ', numbers and true/false/null are bare,
+and characters outside [A-Za-z0-9_.-] in strings are escaped as *XX (or **XXXX).
+"""
+import copy
+import re
+from typing import Any, Dict, Optional
+from urllib.parse import unquote
+
+
+COURT_RESULTS_URL = "https://publicportal.alappeals.gov/portal/search/case/results"
+
+# Characters JSURL leaves unescaped in strings and keys
+_SAFE_STRING = re.compile(r'[^\w.-]', re.ASCII)
+
+# Only these characters of an encoded criteria string need escaping in a URL
+_URL_ESCAPES = str.maketrans({'(': '%28', ')': '%29', "'": '%27', '*': '%2a', '!': '%21'})
+
+_RESERVED = {'true': True, 'false': False, 'null': None}
+
+_CRITERIA_PARAM = re.compile(r'([?&]criteria=)([^&#]*)')
+
+
+def _escape_char(match) -> str:
+    """JSURL escape for a single character"""
+    char = match.group(0)
+    if char == '$':
+        return '!'
+    code = ord(char)
+    if code < 0x100:
+        return f"*{code:02x}"
+    return f"**{code:04x}"
+
+
+def _encode_string(text: str) -> str:
+    """Escape a string or key for JSURL"""
+    return _SAFE_STRING.sub(_escape_char, text)
+
+
+def encode_criteria(value: Any) -> str:
+    """
+    Serialize a value to the portal's tilde encoding
+
+    Args:
+        value: dict, list, str, int, float, bool or None
+
+    Returns:
+        Encoded criteria string (not yet percent-encoded for a URL)
+    """
+    if value is None:
+        return '~null'
+    if isinstance(value, bool):
+        return '~true' if value else '~false'
+    if isinstance(value, (int, float)):
+        return f"~{value}"
+    if isinstance(value, str):
+        return f"~'{_encode_string(value)}"
+    if isinstance(value, dict):
+        pairs = [f"{_encode_string(str(key))}{encode_criteria(item)}"
+                 for key, item in value.items()]
+        return f"~({'~'.join(pairs)})"
+    if isinstance(value, (list, tuple)):
+        return f"~({''.join(encode_criteria(item) for item in value) or '~'})"
+    raise ValueError(f"Cannot encode value of type {type(value).__name__} in criteria")
+
+
+class _Decoder:
+    """Single-pass tokenizer and parser for tilde-encoded criteria"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def _error(self, message: str) -> ValueError:
+        return ValueError(f"Invalid criteria at position {self.pos}: {message}")
+
+    def _eat(self, expected: str):
+        if self.text[self.pos:self.pos + 1] != expected:
+            raise self._error(f"expected '{expected}'")
+        self.pos += 1
+
+    def _string(self) -> str:
+        """Read an escaped string up to the next ~ or )"""
+        text = self.text
+        parts = []
+        start = self.pos
+        while self.pos < len(text) and text[self.pos] not in '~)':
+            char = text[self.pos]
+            if char == '*':
+                parts.append(text[start:self.pos])
+                if text[self.pos + 1:self.pos + 2] == '*':
+                    digits, width = text[self.pos + 2:self.pos + 6], 6
+                else:
+                    digits, width = text[self.pos + 1:self.pos + 3], 3
+                try:
+                    parts.append(chr(int(digits, 16)))
+                except ValueError:
+                    raise self._error(f"bad escape '*{digits}'")
+                self.pos += width
+                start = self.pos
+            elif char == '!':
+                parts.append(text[start:self.pos])
+                parts.append('$')
+                self.pos += 1
+                start = self.pos
+            else:
+                self.pos += 1
+        parts.append(text[start:self.pos])
+        return ''.join(parts)
+
+    def value(self) -> Any:
+        """Parse one value starting at a ~"""
+        self._eat('~')
+        text = self.text
+        char = text[self.pos:self.pos + 1]
+
+        if char == '(':
+            self.pos += 1
+            if text[self.pos:self.pos + 1] == '~':
+                result = []
+                if text[self.pos + 1:self.pos + 2] == ')':
+                    self.pos += 1
+                else:
+                    while text[self.pos:self.pos + 1] == '~':
+                        result.append(self.value())
+            else:
+                result = {}
+                if text[self.pos:self.pos + 1] != ')':
+                    while True:
+                        key = self._string()
+                        result[key] = self.value()
+                        if text[self.pos:self.pos + 1] != '~':
+                            break
+                        self.pos += 1
+            self._eat(')')
+            return result
+
+        if char == "'":
+            self.pos += 1
+            return self._string()
+
+        start = self.pos
+        while self.pos < len(text) and text[self.pos] not in '~)':
+            self.pos += 1
+        token = text[start:self.pos]
+        if token[:1].isdigit() or token[:1] == '-':
+            try:
+                return int(token)
+            except ValueError:
+                try:
+                    return float(token)
+                except ValueError:
+                    raise self._error(f"bad number '{token}'")
+        if token in _RESERVED:
+            return _RESERVED[token]
+        raise self._error(f"bad value keyword '{token}'")
+
+
+def decode_criteria(text: str) -> Any:
+    """
+    Parse a tilde-encoded criteria string
+
+    Args:
+        text: Encoded criteria (percent-encoding is removed first if present)
+
+    Returns:
+        The decoded value, usually a dict
+
+    Raises:
+        ValueError: If the text is not valid criteria
+    """
+    decoder = _Decoder(unquote(text))
+    result = decoder.value()
+    if decoder.pos != len(decoder.text):
+        raise decoder._error("unexpected trailing characters")
+    return result
+
+
+def quote_criteria(encoded: str) -> str:
+    """Percent-encode an encoded criteria string the way the portal does"""
+    return encoded.translate(_URL_ESCAPES)
+
+
+class CourtCriteria:
+    """Decoded search criteria of a court portal URL that can be changed and turned back into a URL"""
+
+    def __init__(self, values: Optional[Dict] = None, url_prefix: str = f"{COURT_RESULTS_URL}?criteria=",
+                 url_suffix: str = ""):
+        """
+        Initialize the criteria
+
+        Args:
+            values: Decoded criteria values
+            url_prefix: Everything in the URL before the criteria value
+            url_suffix: Everything in the URL after the criteria value
+        """
+        self.values = values if values is not None else {}
+        self.url_prefix = url_prefix
+        self.url_suffix = url_suffix
+
+    @classmethod
+    def from_url(cls, url: str) -> 'CourtCriteria':
+        """
+        Decode the criteria parameter of a portal URL
+
+        Args:
+            url: Court portal search URL
+
+        Returns:
+            CourtCriteria for the URL
+
+        Raises:
+            ValueError: If the URL has no criteria parameter or it cannot be decoded
+        """
+        match = _CRITERIA_PARAM.search(url)
+        if not match:
+            raise ValueError("URL has no criteria parameter")
+        values = decode_criteria(match.group(2))
+        if not isinstance(values, dict):
+            raise ValueError("Criteria is not an object")
+        return cls(values, url[:match.end(1)], url[match.end(2):])
+
+    @property
+    def page(self) -> Dict:
+        """The page block of the criteria, created if missing"""
+        return self.values.setdefault('page', {})
+
+    @property
+    def page_number(self) -> Optional[int]:
+        return self.values.get('page', {}).get('number')
+
+    @page_number.setter
+    def page_number(self, value: int):
+        self.page['number'] = value
+
+    @property
+    def page_size(self) -> Optional[int]:
+        return self.values.get('page', {}).get('size')
+
+    @page_size.setter
+    def page_size(self, value: int):
+        self.page['size'] = value
+
+    @property
+    def total_elements(self) -> Optional[int]:
+        return self.values.get('page', {}).get('totalElements')
+
+    @property
+    def total_pages(self) -> Optional[int]:
+        return self.values.get('page', {}).get('totalPages')
+
+    def copy(self) -> 'CourtCriteria':
+        """Independent copy that can be changed without affecting this one"""
+        return CourtCriteria(copy.deepcopy(self.values), self.url_prefix, self.url_suffix)
+
+    def encode(self) -> str:
+        """Criteria in tilde encoding, percent-encoded for use in a URL"""
+        return quote_criteria(encode_criteria(self.values))
+
+    def to_url(self) -> str:
+        """Full portal URL for these criteria"""
+        return f"{self.url_prefix}{self.encode()}{self.url_suffix}"
+
+    def page_url(self, page_number: int, page_size: Optional[int] = None) -> str:
+        """
+        URL for another page of the same search, leaving these criteria unchanged
+
+        Args:
+            page_number: Target page number (0-indexed)
+            page_size: Optional rows per page
+
+        Returns:
+            Portal URL for the page
+        """
+        page = dict(self.values.get('page', {}))
+        page['number'] = page_number
+        if page_size is not None:
+            page['size'] = page_size
+        values = dict(self.values)
+        values['page'] = page
+        return f"{self.url_prefix}{quote_criteria(encode_criteria(values))}{self.url_suffix}"
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Persisted cache of court and case category IDs discovered from the
+Alabama Appeals Court Public Portal
+"""
+import argparse
+import json
+import os
+import re
+import time
+from typing import Dict, Optional
+
+
+DEFAULT_COURT_ID_CACHE_PATH = "court_id_cache.json"
+
+# Discovered IDs are trusted for a week before discovery runs again
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+COURT_ID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+
+
+def is_valid_court_id(court_id) -> bool:
+    """
+    Cheap sanity check that a value looks like a portal court ID
+
+    Args:
+        court_id: Value to check
+
+    Returns:
+        True if the value is a UUID string
+    """
+    return isinstance(court_id, str) and bool(COURT_ID_PATTERN.match(court_id))
+
+
+class CourtIdCache:
+    """JSON file holding discovered court IDs and case category IDs with a TTL"""
+
+    def __init__(self, path: str = DEFAULT_COURT_ID_CACHE_PATH, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        """
+        Initialize the cache
+
+        Args:
+            path: Location of the cache file
+            ttl_seconds: Age after which cached IDs are considered stale
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.data = None
+
+    def load(self) -> Optional[Dict]:
+        """
+        Read the cache file
+
+        Returns:
+            Cached data with discovered_at, courts and categories, or None if missing or unreadable
+        """
+        if self.data is None and self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warning: Could not read court ID cache {self.path}: {e}")
+        return self.data
+
+    def is_fresh(self) -> bool:
+        """Check that the cache exists and is younger than the TTL"""
+        data = self.load()
+        if not data:
+            return False
+        return time.time() - data.get("discovered_at", 0) < self.ttl_seconds
+
+    def courts(self) -> Dict[str, str]:
+        """Cached court IDs that pass validation, keyed by court key"""
+        data = self.load() or {}
+        return {key: court_id for key, court_id in data.get("courts", {}).items()
+                if is_valid_court_id(court_id)}
+
+    def categories(self) -> Dict[str, int]:
+        """Cached case category IDs keyed by category name"""
+        data = self.load() or {}
+        return {name: category_id for name, category_id in data.get("categories", {}).items()
+                if isinstance(category_id, int)}
+
+    def save(self, courts: Dict[str, Optional[str]], categories: Dict[str, int]):
+        """
+        Store freshly discovered IDs
+
+        Args:
+            courts: Court IDs keyed by court key (None values are skipped)
+            categories: Case category IDs keyed by category name
+        """
+        self.data = {
+            "discovered_at": time.time(),
+            "courts": {key: court_id for key, court_id in courts.items() if court_id},
+            "categories": dict(categories)
+        }
+        if not self.path:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=4)
+        os.replace(temp_path, self.path)
+
+    def clear(self):
+        """Delete the cache file"""
+        self.data = None
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def main():
+    """Command line interface for inspecting and refreshing the court ID cache"""
+    parser = argparse.ArgumentParser(description='Show or refresh the cached Alabama Court IDs')
+    parser.add_argument('--cache', default=DEFAULT_COURT_ID_CACHE_PATH,
+                        help=f'Court ID cache file (default: {DEFAULT_COURT_ID_CACHE_PATH})')
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument('--refresh', action='store_true',
+                        help='Discover court IDs from the website and rewrite the cache')
+    action.add_argument('--clear', action='store_true',
+                        help='Delete the cache file')
+    args = parser.parse_args()
+
+    cache = CourtIdCache(args.cache)
+
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {args.cache}")
+        return
+
+    if args.refresh:
+        from opal.configurable_court_extractor import CourtSearchBuilder
+        from opal.court_case_parser import ParserAppealsAL
+
+        court_parser = ParserAppealsAL(headless=True)
+        try:
+            CourtSearchBuilder(id_cache=cache).discover_court_ids(court_parser, force=True)
+        finally:
+            court_parser._close_driver()
+
+    data = cache.load()
+    if not data:
+        print(f"No cached court IDs in {args.cache}")
+        return
+
+    age_hours = (time.time() - data.get("discovered_at", 0)) / 3600
+    print(f"Court IDs in {args.cache} ({age_hours:.1f} hours old, {'fresh' if cache.is_fresh() else 'stale'}):")
+    for key, court_id in data.get("courts", {}).items():
+        print(f"  {key}: {court_id}")
+    for name, category_id in data.get("categories", {}).items():
+        print(f"  category {name}: {category_id}")
+
+
+if __name__ == "__main__":
+    main()
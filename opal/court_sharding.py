@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+Date-window sharding for Alabama Appeals Court searches
+Splits a long filed-date range into disjoint windows, sized from the
+portal's totalElements, and extracts the windows concurrently
+"""
+import argparse
+import copy
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from opal.configurable_court_extractor import CourtSearchBuilder
+from opal.court_case_parser import ParserAppealsAL
+from opal.court_id_cache import CourtIdCache, DEFAULT_COURT_ID_CACHE_PATH
+from opal.court_url_paginator import build_court_url, parse_court_page_info
+from opal.log_config import add_logging_arguments, configure_logging
+from opal.rate_limiter import RateLimiter
+
+
+logger = logging.getLogger(__name__)
+
+
+# Windows are split until they hold no more than this many cases
+DEFAULT_TARGET_CASES_PER_WINDOW = 500
+
+
+def split_date_range(start: date, end: date, pieces: int) -> List[Tuple[date, date]]:
+    """
+    Split an inclusive date range into disjoint, contiguous windows of near-equal length
+
+    Args:
+        start: First day of the range
+        end: Last day of the range
+        pieces: Number of windows wanted (capped at the number of days)
+
+    Returns:
+        List of (window_start, window_end) tuples in date order
+    """
+    days = (end - start).days + 1
+    pieces = max(1, min(pieces, days))
+    windows = []
+    offset = 0
+    for i in range(pieces):
+        length = days // pieces + (1 if i < days % pieces else 0)
+        window_start = start + timedelta(days=offset)
+        window_end = window_start + timedelta(days=length - 1)
+        windows.append((window_start, window_end))
+        offset += length
+    return windows
+
+
+def window_builder(template: CourtSearchBuilder, start: date, end: date) -> CourtSearchBuilder:
+    """
+    Copy a configured search builder and restrict it to one filed-date window
+
+    Args:
+        template: Builder with court, filters and page size already set
+        start: First filed date of the window
+        end: Last filed date of the window
+
+    Returns:
+        New CourtSearchBuilder for the window
+    """
+    builder = copy.deepcopy(template)
+    builder.set_date_range(start.isoformat(), end.isoformat(), period='custom')
+    return builder
+
+
+def count_window_cases(template: CourtSearchBuilder, parser, start: date, end: date) -> Optional[int]:
+    """
+    Ask the portal how many cases were filed in a window
+
+    Loads page 0 of the window with a page size of 1 and reads totalElements.
+
+    Args:
+        template: Configured search builder
+        parser: ParserAppealsAL instance used for the probe
+        start: First filed date of the window
+        end: Last filed date of the window
+
+    Returns:
+        Number of cases, or None if the portal did not report a total
+    """
+    url = build_court_url(window_builder(template, start, end).build_url(0), 0, page_size=1)
+    result = parser.parse_article(url)
+    if getattr(parser, 'driver', None):
+        total = parse_court_page_info(parser.driver.current_url)['totalElements']
+        if total is not None:
+            return total
+    if not result.get('cases') and not result.get('error'):
+        return 0
+    return None
+
+
+def plan_date_windows(template: CourtSearchBuilder, parser, start: date, end: date,
+                      target_cases: int = DEFAULT_TARGET_CASES_PER_WINDOW,
+                      total_cases: Optional[int] = None) -> List[Dict]:
+    """
+    Plan disjoint filed-date windows holding about target_cases cases each
+
+    The range is first split evenly using the overall total. Each window is
+    then probed and split again while it holds more than target_cases and
+    spans more than one day, so dense periods get narrower windows.
+
+    Args:
+        template: Configured search builder
+        parser: ParserAppealsAL instance used for the probes
+        start: First filed date of the range
+        end: Last filed date of the range
+        target_cases: Maximum cases wanted per window
+        total_cases: Total for the whole range if already known
+
+    Returns:
+        List of window dictionaries with start, end and expected_cases, in date order
+    """
+    if total_cases is None:
+        total_cases = count_window_cases(template, parser, start, end)
+    if total_cases is None:
+        # Without a total, fall back to roughly monthly windows
+        pieces = math.ceil(((end - start).days + 1) / 30)
+        return [{"start": s.isoformat(), "end": e.isoformat(), "expected_cases": None}
+                for s, e in split_date_range(start, end, pieces)]
+
+    pending = [(start, end, total_cases)]
+    planned = []
+    while pending:
+        window_start, window_end, cases = pending.pop()
+        if cases is None or cases <= target_cases or window_start == window_end:
+            planned.append({"start": window_start.isoformat(), "end": window_end.isoformat(),
+                            "expected_cases": cases})
+            continue
+        for piece_start, piece_end in split_date_range(window_start, window_end,
+                                                       math.ceil(cases / target_cases)):
+            pending.append((piece_start, piece_end,
+                            count_window_cases(template, parser, piece_start, piece_end)))
+
+    planned.sort(key=lambda window: window["start"])
+    logger.info("Planned %d windows for %s cases", len(planned), total_cases,
+                extra={"windows": len(planned), "cases": total_cases})
+    return planned
+
+
+def extract_window(builder: CourtSearchBuilder, parser, page_size: int) -> Dict:
+    """
+    Extract every case of one window
+
+    Args:
+        builder: Search builder restricted to the window
+        parser: ParserAppealsAL instance owned by the calling worker
+        page_size: Rows per results page
+
+    Returns:
+        Dictionary with the window's cases and the portal's totalElements
+
+    Raises:
+        PageLoadError: A page of the window could not be loaded
+        ValueError: The window has fewer cases than the portal reported, so it
+            must not be saved as done
+    """
+    builder.set_page_size(page_size)
+    cases = []
+    pages_processed = 0
+    for _, result in parser.iter_pages(builder.build_url(0), page_size=page_size):
+        pages_processed += 1
+        cases.extend(result.get('cases', []))
+    total_elements = getattr(parser, 'pagination', {}).get('total_elements')
+    if total_elements and len(cases) < total_elements:
+        raise ValueError(f"Window has {len(cases)} of {total_elements} cases")
+    return {"total_elements": total_elements, "pages_processed": pages_processed, "cases": cases}
+
+
+def merge_window_cases(window_results: List[Dict]) -> List[Dict]:
+    """
+    Merge the cases of several windows, dropping duplicates by case number
+
+    Args:
+        window_results: Window results in plan order
+
+    Returns:
+        List of unique cases
+    """
+    seen = set()
+    merged = []
+    for window in window_results:
+        for case in window.get('cases', []):
+            case_number = case.get('case_number', {}).get('text', '')
+            if case_number and case_number in seen:
+                continue
+            seen.add(case_number)
+            merged.append(case)
+    return merged
+
+
+def search_parameters(court, start_date, end_date, case_number=None, case_title=None,
+                      case_category=None, exclude_closed=False) -> Dict:
+    """
+    The search a sharded run extracts, as stored in its plan and output
+
+    Returns:
+        Dictionary with the court, date range and filters
+    """
+    return {
+        "court": court,
+        "start_date": start_date,
+        "end_date": end_date,
+        "case_number_filter": case_number,
+        "case_title_filter": case_title,
+        "case_category": case_category,
+        "exclude_closed": exclude_closed
+    }
+
+
+def search_digest(search: Dict) -> str:
+    """Short hash of search_parameters, used in the default shard directory name"""
+    return hashlib.sha1(json.dumps(search, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+
+
+def extract_sharded_court_cases(
+    start_date,
+    end_date,
+    court='civil',
+    case_number=None,
+    case_title=None,
+    case_category=None,
+    exclude_closed=False,
+    workers=3,
+    requests_per_second=0.5,
+    target_cases_per_window=DEFAULT_TARGET_CASES_PER_WINDOW,
+    page_size=None,
+    shard_dir=None,
+    output_prefix="court_cases",
+    refresh_court_ids=False,
+    court_id_cache_path=DEFAULT_COURT_ID_CACHE_PATH
+):
+    """
+    Extract court cases over a long date range by running date windows concurrently
+
+    Every finished window is written to shard_dir, so rerunning with the same
+    shard_dir only extracts the windows that are missing. The plan records the
+    court, dates and filters, and a shard_dir planned for another search is
+    refused rather than merged.
+
+    Args:
+        start_date: First filed date (YYYY-MM-DD)
+        end_date: Last filed date (YYYY-MM-DD)
+        court: Court to search ('civil', 'criminal', 'supreme')
+        case_number: Filter by case number (partial match)
+        case_title: Filter by case title (partial match)
+        case_category: Filter by category ('Appeal', 'Certiorari', etc.)
+        exclude_closed: Whether to exclude closed cases
+        workers: Number of windows extracted in parallel
+        requests_per_second: Page load rate across all workers
+        target_cases_per_window: Maximum cases wanted per window
+        page_size: Rows per results page (None to probe for the largest size)
+        shard_dir: Directory holding the plan and per-window results (default:
+            named after the prefix, court, dates and a hash of the filters)
+        output_prefix: Prefix for output files
+        refresh_court_ids: Rediscover court IDs from the website instead of using the cache
+        court_id_cache_path: File caching discovered court and category IDs
+
+    Returns:
+        Dictionary with the merged results, or None on error
+
+    Raises:
+        ValueError: The dates are invalid, or shard_dir holds the plan of a different search
+    """
+    start = datetime.strptime(start_date, '%Y-%m-%d').date()
+    end = datetime.strptime(end_date, '%Y-%m-%d').date()
+    if start > end:
+        raise ValueError(f"Start date {start_date} is after end date {end_date}")
+
+    search = search_parameters(court, start_date, end_date, case_number, case_title,
+                               case_category, exclude_closed)
+    shard_dir = shard_dir or f"{output_prefix}_{court}_{start_date}_{end_date}_{search_digest(search)}_shards"
+    plan_path = os.path.join(shard_dir, "plan.json")
+    plan = None
+    if os.path.exists(plan_path):
+        with open(plan_path, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+        if plan.get("search") != search:
+            raise ValueError(f"{shard_dir} holds windows of a different search; "
+                             "use another --shard-dir or remove it")
+    os.makedirs(shard_dir, exist_ok=True)
+
+    rate_limiter = RateLimiter(requests_per_second)
+    parser = ParserAppealsAL(headless=True, rate_limiter=rate_limiter)
+
+    print("Alabama Appeals Court - Sharded Data Extraction")
+    print("=" * 55)
+    print(f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Date range: {start_date} to {end_date}")
+    print(f"Shard directory: {shard_dir}")
+
+    worker_parsers = []
+    worker_lock = threading.Lock()
+    local = threading.local()
+
+    try:
+        template = CourtSearchBuilder(id_cache=CourtIdCache(court_id_cache_path))
+        logger.info("Discovering court IDs...")
+        template.discover_court_ids(parser, force=refresh_court_ids, courts=[court])
+        template.set_court(court)
+        court_info = template.get_court_info()
+        if court_info['id'] is None:
+            raise ValueError(f"Could not discover court ID for {court_info['name']}.")
+        if case_number:
+            template.set_case_number_filter(case_number)
+        if case_title:
+            template.set_case_title_filter(case_title)
+        if case_category:
+            template.set_case_category(case_category)
+        template.set_exclude_closed(exclude_closed)
+
+        if plan is not None:
+            windows = plan["windows"]
+            page_size = page_size or plan["page_size"]
+            logger.info("Resuming plan with %d windows", len(windows), extra={"windows": len(windows)})
+        else:
+            total_cases = None
+            if page_size is None:
+                whole_range = window_builder(template, start, end)
+                whole_range.negotiate_page_size(parser)
+                page_size = whole_range.page_size
+                if parser.driver:
+                    total_cases = parse_court_page_info(parser.driver.current_url)['totalElements']
+            windows = plan_date_windows(template, parser, start, end,
+                                        target_cases_per_window, total_cases)
+            with open(plan_path, "w", encoding="utf-8") as f:
+                json.dump({"search": search, "page_size": page_size, "windows": windows}, f, indent=4)
+        parser._close_driver()
+
+        def window_path(window):
+            return os.path.join(shard_dir, f"window_{window['start']}_{window['end']}.json")
+
+        def run_window(window):
+            worker = getattr(local, "parser", None)
+            if worker is None:
+                worker = ParserAppealsAL(headless=True, rate_limiter=rate_limiter)
+                local.parser = worker
+                with worker_lock:
+                    worker_parsers.append(worker)
+            builder = window_builder(template,
+                                     datetime.strptime(window['start'], '%Y-%m-%d').date(),
+                                     datetime.strptime(window['end'], '%Y-%m-%d').date())
+            window_result = extract_window(builder, worker, page_size)
+            window_result.update({"start": window['start'], "end": window['end']})
+            temp_path = f"{window_path(window)}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(window_result, f, ensure_ascii=False)
+            os.replace(temp_path, window_path(window))
+            return window_result
+
+        pending = [w for w in windows if w.get('expected_cases') != 0 and not os.path.exists(window_path(w))]
+        logger.info("%d windows already done, %d to extract with %d workers", len(windows) - len(pending),
+                    len(pending), workers,
+                    extra={"done": len(windows) - len(pending), "pending": len(pending), "workers": workers})
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run_window, window): window for window in pending}
+            for future in as_completed(futures):
+                window = futures[future]
+                try:
+                    window_result = future.result()
+                    logger.info("Window %s to %s: %d cases", window['start'], window['end'],
+                                len(window_result['cases']),
+                                extra={"window_start": window['start'], "window_end": window['end'],
+                                       "cases": len(window_result['cases'])})
+                except Exception as e:
+                    logger.warning("Error in window %s to %s: %s", window['start'], window['end'], e,
+                                   extra={"window_start": window['start'], "window_end": window['end']})
+                    failed.append(window)
+
+        window_results = []
+        for window in windows:
+            if os.path.exists(window_path(window)):
+                with open(window_path(window), "r", encoding="utf-8") as f:
+                    window_results.append(json.load(f))
+        all_cases = merge_window_cases(window_results)
+
+        output_data = {
+            "status": "success" if not failed else "partial",
+            "search_parameters": search,
+            "total_cases": len(all_cases),
+            "page_size": page_size,
+            "windows": len(windows),
+            "failed_windows": [f"{w['start']} to {w['end']}" for w in failed],
+            "extraction_date": datetime.now().strftime("%Y-%m-%d"),
+            "extraction_time": datetime.now().strftime("%H:%M:%S"),
+            "cases": all_cases
+        }
+
+        json_filename = f"{output_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(json_filename, "w", encoding="utf-8") as f:
+            json.dump(output_data, f, indent=4, ensure_ascii=False)
+
+        print(f"\n✓ Successfully extracted {len(all_cases)} unique court cases")
+        print(f"✓ Results saved to {json_filename}")
+        if failed:
+            print(f"⚠️  {len(failed)} windows failed; rerun with --shard-dir {shard_dir} to retry them")
+
+        return output_data
+
+    except Exception as e:
+        print(f"\nError occurred: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return None
+    finally:
+        parser._close_driver()
+        for worker in worker_parsers:
+            worker._close_driver()
+        print(f"\nEnd time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+
+def main():
+    """Command line interface for sharded court extraction"""
+    parser = argparse.ArgumentParser(description='Extract Alabama Court cases over a long date range '
+                                                 'using concurrent date windows')
+    parser.add_argument('--start-date', required=True, help='First filed date (YYYY-MM-DD)')
+    parser.add_argument('--end-date', required=True, help='Last filed date (YYYY-MM-DD)')
+    parser.add_argument('--court', choices=['civil', 'criminal', 'supreme'],
+                        default='civil', help='Court to search (default: civil)')
+    parser.add_argument('--case-number', help='Filter by case number (e.g., CL-2024-, CR-2024-, SC-2024-)')
+    parser.add_argument('--case-title', help='Filter by case title (partial match)')
+    parser.add_argument('--case-category',
+                        choices=['Appeal', 'Certiorari', 'Original Proceeding', 'Petition', 'Certified Question'],
+                        help='Filter by case category')
+    parser.add_argument('--exclude-closed', action='store_true',
+                        help='Exclude closed cases from results')
+    parser.add_argument('--workers', type=int, default=3,
+                        help='Number of windows extracted in parallel (default: 3)')
+    parser.add_argument('--rate', type=float, default=0.5,
+                        help='Maximum page loads per second across all workers (default: 0.5)')
+    parser.add_argument('--target-per-window', type=int, default=DEFAULT_TARGET_CASES_PER_WINDOW,
+                        help=f'Maximum cases per window (default: {DEFAULT_TARGET_CASES_PER_WINDOW})')
+    parser.add_argument('--page-size', type=int,
+                        help='Results per page (default: largest size the portal honors)')
+    parser.add_argument('--shard-dir',
+                        help='Directory for the window plan and results; reuse it to resume')
+    parser.add_argument('--output-prefix', default='court_cases',
+                        help='Prefix for output files (default: court_cases)')
+    parser.add_argument('--refresh-court-ids', action='store_true',
+                        help='Rediscover court IDs from the website instead of using the cache')
+    parser.add_argument('--court-id-cache', default=DEFAULT_COURT_ID_CACHE_PATH,
+                        help=f'Court ID cache file (default: {DEFAULT_COURT_ID_CACHE_PATH})')
+    add_logging_arguments(parser)
+
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_format, args.quiet)
+
+    try:
+        extract_sharded_court_cases(
+            start_date=args.start_date,
+            end_date=args.end_date,
+            court=args.court,
+            case_number=args.case_number,
+            case_title=args.case_title,
+            case_category=args.case_category,
+            exclude_closed=args.exclude_closed,
+            workers=args.workers,
+            requests_per_second=args.rate,
+            target_cases_per_window=args.target_per_window,
+            page_size=args.page_size,
+            shard_dir=args.shard_dir,
+            output_prefix=args.output_prefix,
+            refresh_court_ids=args.refresh_court_ids,
+            court_id_cache_path=args.court_id_cache
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Incremental sync state for Alabama Appeals Court extractions
+Remembers which cases have been seen per court so a sync run can stop
+paging once it reaches cases it already knows
+"""
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+from opal.court_case_parser import case_fingerprint, parse_filed_date
+from opal.court_criteria import CourtCriteria
+
+
+DEFAULT_SYNC_STATE_PATH = "court_sync_state.json"
+
+
+def sync_key_for_url(url: str) -> str:
+    """
+    Sync state key for a custom search URL
+
+    Two URLs share a key only when they search the same court with the same
+    filters and sort order. The page block is ignored, and so are the dates a
+    relative date period (such as the last year) was expanded to, because they
+    move from day to day.
+
+    Args:
+        url: Court search URL passed with --url
+
+    Returns:
+        'custom:<courtID>:<hash of the filters>', or 'custom' if the URL has no
+        decodable criteria
+    """
+    try:
+        values = CourtCriteria.from_url(url).values
+    except ValueError:
+        return "custom"
+    search = {key: value for key, value in values.items() if key != "page"}
+    case = dict(search.get("case") or {})
+    if str(case.get("filedDateChoice", "")).startswith("-"):
+        case.pop("filedDateStart", None)
+        case.pop("filedDateEnd", None)
+    search["case"] = case
+    digest = hashlib.sha1(json.dumps(search, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:12]
+    return f"custom:{values.get('courtID', 'unknown')}:{digest}"
+
+
+class CourtSyncStore:
+    """Persistent store of known case numbers and a filed-date watermark per court"""
+
+    def __init__(self, path: str = DEFAULT_SYNC_STATE_PATH):
+        """
+        Initialize the store, loading any existing state
+
+        Args:
+            path: Location of the sync state file
+        """
+        self.path = path
+        self.state = {"courts": {}}
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.state = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warning: Could not read sync state {path}: {e}")
+
+    def _court(self, court_key: str) -> Dict:
+        """State for one court, created on first use"""
+        return self.state["courts"].setdefault(court_key, {"watermark": None, "cases": {}})
+
+    def watermark(self, court_key: str) -> Optional[str]:
+        """Latest filed date (YYYY-MM-DD) seen for a court, or None before the first sync"""
+        return self._court(court_key)["watermark"]
+
+    def classify(self, court_key: str, case: Dict) -> str:
+        """
+        Compare a results row against the stored state
+
+        Args:
+            court_key: Court the case was found in
+            case: Case dictionary as returned by parse_table_row
+
+        Returns:
+            'new', 'changed' or 'unchanged'
+        """
+        known = self._court(court_key)["cases"].get(case.get("case_number", {}).get("text", ""))
+        if known is None:
+            return "new"
+        return "unchanged" if known == case_fingerprint(case) else "changed"
+
+    def filter_page(self, court_key: str, cases: List[Dict]) -> Tuple[List[Dict], bool]:
+        """
+        Pick out the new and changed cases on a results page
+
+        Args:
+            court_key: Court the page belongs to
+            cases: Cases parsed from the page
+
+        Returns:
+            Tuple of (delta, reached_known). reached_known is True when every case
+            on the page is known, unchanged and not newer than the watermark, which
+            means the rest of the date-descending results are already synced
+        """
+        delta = [case for case in cases if self.classify(court_key, case) != "unchanged"]
+        watermark = self.watermark(court_key)
+        if not cases or delta or watermark is None:
+            return delta, False
+
+        limit = parse_filed_date(watermark)
+        reached_known = all(
+            (parse_filed_date(case.get("filed_date", "")) or limit) <= limit for case in cases
+        )
+        return delta, reached_known
+
+    def record(self, court_key: str, cases: List[Dict]):
+        """
+        Remember cases and advance the court's watermark
+
+        Args:
+            court_key: Court the cases belong to
+            cases: Cases seen during the run
+        """
+        court_state = self._court(court_key)
+        latest = parse_filed_date(court_state["watermark"]) if court_state["watermark"] else None
+        for case in cases:
+            case_number = case.get("case_number", {}).get("text", "")
+            if not case_number:
+                continue
+            court_state["cases"][case_number] = case_fingerprint(case)
+            filed = parse_filed_date(case.get("filed_date", ""))
+            if filed and (latest is None or filed > latest):
+                latest = filed
+        if latest:
+            court_state["watermark"] = latest.isoformat()
+
+    def save(self):
+        """Write the state to disk, replacing the file atomically"""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
@@ -1,9 +1,45 @@
 """
 URL Pagination handler for Alabama Appeals Court Public Portal
 """
-import re
-from typing import List, Tuple, Optional
-from urllib.parse import unquote
+import logging
+import math
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
+from urllib.parse import urlparse
+from opal.court_criteria import CourtCriteria
+
+logger = logging.getLogger(__name__)
+
+
+# Page size the portal uses when it builds search URLs itself
+DEFAULT_PAGE_SIZE = 25
+
+# Page sizes tried by negotiate_page_size, largest first
+PAGE_SIZE_CANDIDATES = (500, 200, 100, 50, 25)
+
+# Host of the Alabama Appeals Court public portal
+PORTAL_HOST = "publicportal.alappeals.gov"
+
+# Hosts the local mock portal (opal.mock_server) is reached on; is_court_url accepts them too
+MOCK_PORTAL_HOSTS = ("127.0.0.1", "localhost")
+
+
+@lru_cache(maxsize=64)
+def _decode_url(url: str) -> Optional[CourtCriteria]:
+    """
+    Decode the criteria of a court URL once and reuse it for repeated calls
+    
+    The returned object is shared between callers and must not be modified.
+    
+    Returns:
+        CourtCriteria or None if the URL has no decodable criteria
+    """
+    try:
+        return CourtCriteria.from_url(url)
+    except ValueError as e:
+        if 'criteria=' in url:
+            logger.warning("Error parsing URL: %s", e)
+        return None
 
 
 def parse_court_url(url: str) -> Tuple[Optional[int], Optional[int]]:
@@ -16,50 +52,82 @@ def parse_court_url(url: str) -> Tuple[Optional[int], Optional[int]]:
     Returns:
         Tuple of (current_page, total_pages) or (None, None) if not found
     """
-    try:
-        # Decode URL to make parsing easier
-        decoded_url = unquote(url)
-        
-        # Extract page number using regex
-        page_match = re.search(r'page~\(.*?number~(\d+)', decoded_url)
-        current_page = int(page_match.group(1)) if page_match else None
-        
-        # Extract total pages
-        total_match = re.search(r'totalPages~(\d+)', decoded_url)
-        total_pages = int(total_match.group(1)) if total_match else None
+    criteria = _decode_url(url)
+    if criteria is None:
+        return None, None
+    return criteria.page_number, criteria.total_pages
+
+
+def parse_court_page_info(url: str) -> Dict[str, Optional[int]]:
+    """
+    Parse the full pagination block of a court URL
+    
+    Args:
+        url: Court portal URL with encoded parameters
         
-        return current_page, total_pages
+    Returns:
+        Dictionary with size, number, totalElements and totalPages
+        (each None if not present in the URL)
+    """
+    criteria = _decode_url(url)
+    page = criteria.values.get('page', {}) if criteria else {}
+    return {key: page.get(key) for key in ('size', 'number', 'totalElements', 'totalPages')}
+
+
+def total_pages_for(total_elements: int, page_size: int) -> int:
+    """
+    Number of result pages needed to hold total_elements rows
+    
+    Args:
+        total_elements: Total number of results reported by the portal
+        page_size: Rows per page
         
-    except Exception as e:
-        print(f"Error parsing URL: {str(e)}")
-        return None, None
+    Returns:
+        Page count (at least 1)
+    """
+    if not total_elements or not page_size:
+        return 1
+    return max(1, math.ceil(total_elements / page_size))
 
 
-def build_court_url(base_url: str, page_number: int) -> str:
+def build_court_url(base_url: str, page_number: int, page_size: Optional[int] = None) -> str:
     """
     Build court URL with updated page number
     
     Args:
         base_url: Original URL with page 0
         page_number: Target page number
+        page_size: Optional rows per page to set in the URL
         
     Returns:
         Updated URL with new page number
     """
-    try:
-        # The URL is already properly formatted, just replace the page number
-        # Pattern: page~(size~25~number~X~totalElements~Y~totalPages~Z)
-        new_url = re.sub(
-            r'(page~\%28.*?number~)\d+',
-            f'\\g<1>{page_number}',
-            base_url
-        )
-        
-        return new_url
-        
-    except Exception as e:
-        print(f"Error building URL: {str(e)}")
+    criteria = _decode_url(base_url)
+    if criteria is None:
+        logger.error("Error building URL: no criteria in %s", base_url)
         return base_url
+    return criteria.page_url(page_number, page_size)
+
+
+def iter_court_urls(base_url: str, page_size: Optional[int] = None, start_page: int = 0,
+                    total_pages: Optional[int] = None) -> Iterator[str]:
+    """
+    Lazily generate URLs for consecutive pages of court results
+    
+    Args:
+        base_url: Court search URL (any page)
+        page_size: Optional rows per page to set in every URL
+        start_page: First page number to generate (0-indexed)
+        total_pages: Number of pages in the search; None generates URLs until
+            the caller stops, for when the end is discovered while paging
+        
+    Yields:
+        URL for each page, in order
+    """
+    page_num = start_page
+    while total_pages is None or page_num < total_pages:
+        yield build_court_url(base_url, page_num, page_size=page_size)
+        page_num += 1
 
 
 def extract_total_pages_from_first_load(url: str, parser) -> int:
@@ -88,33 +156,117 @@ def extract_total_pages_from_first_load(url: str, parser) -> int:
             
             current_url = parser.driver.current_url
             _, total_pages = parse_court_url(current_url)
+            info = parse_court_page_info(current_url)
+            if info['totalElements'] and info['size']:
+                total_pages = total_pages_for(info['totalElements'], info['size'])
             if total_pages and total_pages > 0:
-                print(f"Detected {total_pages} total pages from URL")
+                logger.info("Detected %d total pages from URL", total_pages)
                 return total_pages
                 
         # Default to 1 if we can't determine
         return 1
         
     except Exception as e:
-        print(f"Error extracting total pages: {str(e)}")
+        logger.warning("Error extracting total pages: %s", e)
         return 1
 
 
-def paginate_court_urls(base_url: str, parser=None) -> List[str]:
+def _current_page_info(parser) -> Dict[str, Optional[int]]:
+    """Pagination info from the URL the browser ended up on, if available"""
+    if getattr(parser, 'driver', None):
+        return parse_court_page_info(parser.driver.current_url)
+    return {'size': None, 'number': None, 'totalElements': None, 'totalPages': None}
+
+
+def negotiate_page_size(base_url: str, parser,
+                        candidates: Tuple[int, ...] = PAGE_SIZE_CANDIDATES) -> Tuple[int, Optional[Dict]]:
+    """
+    Find the largest page size the portal honors for a search
+    
+    Each candidate is tried from largest to smallest by loading page 0 with
+    that size. If the portal returns fewer rows than both the requested size
+    and totalElements, it capped the page; the number of rows it actually
+    returned is used as the page size so later page offsets stay aligned.
+    
+    Args:
+        base_url: Court search URL (page 0)
+        parser: ParserAppealsAL instance used to load the probe page
+        candidates: Page sizes to try
+        
+    Returns:
+        Tuple of (page_size, first_page_result). first_page_result holds the
+        parsed cases of page 0 at the returned size, or None if every probe failed
+    """
+    for size in sorted(candidates, reverse=True):
+        result = parser.parse_article(build_court_url(base_url, 0, page_size=size))
+        rows = len(result.get('cases', []))
+        if result.get('error') and not rows:
+            logger.info("Page size %d probe failed: %s", size, result['error'])
+            continue
+            
+        info = _current_page_info(parser)
+        honored = size
+        if info['size'] and info['size'] < honored:
+            honored = info['size']
+            
+        # A page shorter than both the size and the total means the portal capped it
+        expected = min(honored, info['totalElements']) if info['totalElements'] else honored
+        if 0 < rows < expected:
+            honored = rows
+            
+        logger.info("Using page size %d (requested %d, %s total results)", honored, size,
+                    info['totalElements'] if info['totalElements'] is not None else 'unknown')
+        return honored, result
+        
+    return DEFAULT_PAGE_SIZE, None
+
+
+def verify_case_count(found: int, total_elements: Optional[int]) -> bool:
+    """
+    Check the number of extracted rows against the portal's totalElements
+    
+    Args:
+        found: Number of cases extracted
+        total_elements: totalElements reported by the portal (None if unknown)
+        
+    Returns:
+        True if the counts match or the total is unknown
+    """
+    if total_elements is None:
+        return True
+    if found < total_elements:
+        logger.warning("Expected %d cases but only found %d", total_elements, found)
+        return False
+    if found > total_elements:
+        logger.warning("Found more cases (%d) than expected (%d)", found, total_elements)
+        return False
+    return True
+
+
+def paginate_court_urls(base_url: str, parser=None, page_size: Optional[int] = None) -> List[str]:
     """
     Generate list of URLs for all pages of court results
     
+    When a parser is given and the URL carries no page count, page 0 is
+    loaded just to count pages; use discover_court_pages to keep that load.
+    
     Args:
         base_url: Initial court search URL (page 0)
         parser: Optional ParserAppealsAL instance to determine total pages dynamically
+        page_size: Optional rows per page; page count is recomputed from
+            totalElements when it is known
         
     Returns:
         List of URLs for all pages
     """
-    urls = []
+    if page_size is not None:
+        base_url = build_court_url(base_url, 0, page_size=page_size)
     
     # Check if the URL already has pagination info
     current_page, total_pages = parse_court_url(base_url)
+    info = parse_court_page_info(base_url)
+    if page_size is not None and info['totalElements']:
+        total_pages = total_pages_for(info['totalElements'], page_size)
     
     # If we can't determine total pages from URL and have a parser, load first page
     if (total_pages is None or total_pages == 0) and parser:
@@ -126,21 +278,58 @@ def paginate_court_urls(base_url: str, parser=None) -> List[str]:
         return [base_url]
     
     # Generate URLs for all pages (0-indexed)
-    for page_num in range(total_pages):
-        page_url = build_court_url(base_url, page_num)
-        urls.append(page_url)
+    return list(iter_court_urls(base_url, page_size=page_size, total_pages=total_pages))
+
+
+def discover_court_pages(base_url: str, parser,
+                         page_size: Optional[int] = None) -> Tuple[List[str], Optional[Dict]]:
+    """
+    Load the first results page once and derive every page URL from it
+    
+    Unlike paginate_court_urls, the first page is parsed as part of the
+    discovery, so callers can pass the result on instead of loading page 0 again.
+    
+    Args:
+        base_url: Initial court search URL (page 0)
+        parser: ParserAppealsAL instance used to load the first page
+        page_size: Optional rows per page to request
         
-    return urls
+    Returns:
+        Tuple of (page_urls, first_page_result)
+    """
+    if page_size is not None:
+        base_url = build_court_url(base_url, 0, page_size=page_size)
+    
+    first_result = parser.parse_article(base_url)
+    
+    info = _current_page_info(parser)
+    size = info['size'] or page_size or parse_court_page_info(base_url)['size']
+    if info['totalElements'] and size:
+        total_pages = total_pages_for(info['totalElements'], size)
+    else:
+        total_pages = info['totalPages'] or parse_court_url(base_url)[1] or 1
+    logger.info("Detected %d total pages", total_pages)
+    
+    urls = list(iter_court_urls(base_url, page_size=page_size, total_pages=total_pages))
+    return urls, first_result
 
 
-def is_court_url(url: str) -> bool:
+def is_court_url(url: str, allowed_hosts: Optional[Iterable[str]] = None) -> bool:
     """
     Check if a URL is for the Alabama Appeals Court portal
     
+    Search URLs on the local mock server (opal.mock_server) count as court URLs
+    too; a mock server listening on another address is passed in allowed_hosts.
+    
     Args:
         url: URL to check
+        allowed_hosts: Hosts accepted besides the portal (default: MOCK_PORTAL_HOSTS)
         
     Returns:
         True if this is a court portal URL
     """
-    return "publicportal.alappeals.gov" in url and "/portal/search/case/results" in url
\ No newline at end of file
+    parsed = urlparse(url)
+    if "/portal/search/case/results" not in parsed.path:
+        return False
+    hosts = MOCK_PORTAL_HOSTS if allowed_hosts is None else tuple(allowed_hosts)
+    return parsed.hostname == PORTAL_HOST or parsed.hostname in hosts
@@ -0,0 +1,151 @@
+"""
+CSV export of court cases and news articles
+
+Rows are written with the csv module, so commas, quotes and line breaks in
+titles are quoted instead of being replaced. The file can be gzip compressed,
+or zstd compressed when the optional zstandard package is installed
+(pip install zstandard), and rows are appended page by page as they arrive.
+"""
+import csv
+import gzip
+import io
+from typing import Dict, List, Optional
+from opal.court_case_parser import PORTAL_BASE_URL
+from opal.output_writers import StreamingWriter, manifest_path_for
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# File name suffix added by each compression
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+CASE_COLUMNS = ["Court", "Case Number", "Case Title", "Classification", "Filed Date", "Status", "Case Link"]
+
+ARTICLE_COLUMNS = ["URL", "Title", "Author", "Date", "Line Count", "Text"]
+
+
+def check_compression(compression: Optional[str]):
+    """
+    Fail early if a compression is unknown or needs a missing package
+
+    Raises:
+        ValueError: If the compression is not known
+        ImportError: With installation instructions
+    """
+    if compression is not None and compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression: {compression}")
+    if compression == "zstd" and zstandard is None:
+        raise ImportError("zstd compression requires zstandard. Install it with: pip install zstandard")
+
+
+def case_to_csv_row(case: Dict) -> List:
+    """Values of one court case in CASE_COLUMNS order"""
+    case_number = case.get("case_number") or {}
+    link = case_number.get("link") or ""
+    return [
+        case.get("court", ""),
+        case_number.get("text", ""),
+        case.get("case_title", ""),
+        case.get("classification", ""),
+        case.get("filed_date", ""),
+        case.get("status", ""),
+        f"{PORTAL_BASE_URL}{link}" if link.startswith("/") else link,
+    ]
+
+
+def article_to_csv_row(article: Dict) -> List:
+    """Values of one article in ARTICLE_COLUMNS order, with its paragraphs joined by newlines"""
+    line_content = article.get("line_content") or {}
+    lines = [line_content[key] for key in sorted(line_content, key=lambda key: int(key.split()[-1]))]
+    return [
+        article.get("url", ""),
+        article.get("title", ""),
+        article.get("author", ""),
+        article.get("date", ""),
+        article.get("line_count", ""),
+        "\n".join(lines),
+    ]
+
+
+def open_text(path: str, compression: Optional[str] = None):
+    """Open a text file for CSV writing, compressed if requested"""
+    check_compression(compression)
+    if compression == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    if compression == "zstd":
+        compressed = zstandard.ZstdCompressor().stream_writer(open(path, "wb"))
+        return io.TextIOWrapper(compressed, encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+class CsvWriter(StreamingWriter):
+    """Writes court cases or articles as CSV rows as pages arrive"""
+
+    format = "csv"
+
+    def __init__(self, path: str, record_type: str = "cases", compression: Optional[str] = None,
+                 manifest_path: Optional[str] = None, manifest: bool = True,
+                 resume: Optional[Dict] = None):
+        """
+        Open the CSV file and write the header row
+
+        Args:
+            path: CSV file to write, including any compression suffix
+            record_type: 'cases' or 'articles'
+            compression: None, 'gzip' or 'zstd'
+            manifest_path: Summary file (default: <path without extensions>.manifest.json)
+            manifest: False when the CSV file accompanies another output that
+                already holds the run summary
+            resume: Position from a checkpoint; the file is cut back to it and
+                appended to (uncompressed files only)
+
+        Raises:
+            ValueError: If record_type or compression is not known, or a
+                compressed file is resumed
+            ImportError: If zstd is requested and zstandard is not installed
+        """
+        if record_type not in ("cases", "articles"):
+            raise ValueError(f"Unknown record type: {record_type}")
+        if resume and compression:
+            raise ValueError("Compressed CSV output cannot be resumed")
+        suffix = COMPRESSION_SUFFIXES.get(compression, "")
+        if manifest_path is None and suffix and path.endswith(suffix):
+            manifest_path = manifest_path_for(path[:-len(suffix)])
+        super().__init__(path, manifest_path)
+        self.record_type = record_type
+        self.compression = compression
+        self.manifest = manifest
+        self._to_row = case_to_csv_row if record_type == "cases" else article_to_csv_row
+        if resume:
+            self._resume(resume)
+            self._file = open(path, "r+", encoding="utf-8", newline="")
+            self._file.truncate(resume["offset"])
+            self._file.seek(resume["offset"])
+            self._csv = csv.writer(self._file)
+        else:
+            self._file = open_text(path, compression)
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(CASE_COLUMNS if record_type == "cases" else ARTICLE_COLUMNS)
+        self._write_manifest("running")
+
+    def _write_manifest(self, status: str, summary: Optional[Dict] = None):
+        if self.manifest:
+            super()._write_manifest(status, summary)
+
+    def _write_records(self, records: List[Dict]):
+        self._csv.writerows(self._to_row(record) for record in records)
+        # Each page reaches the file (or compressor) before the next one is requested
+        self._file.flush()
+
+    def _finish(self):
+        self._file.close()
+
+    def position(self) -> Dict:
+        position = super().position()
+        if not self.compression:
+            with self._lock:
+                position["offset"] = self._file.tell()
+        return position
@@ -3,13 +3,43 @@
 Extract ALL court cases from Alabama Appeals Court
 This script will process all available pages
 """
+import argparse
 import json
+import logging
 from datetime import datetime
 from opal.court_case_parser import ParserAppealsAL
-from opal.court_url_paginator import parse_court_url
+from opal.court_sync import CourtSyncStore, DEFAULT_SYNC_STATE_PATH
+from opal.log_config import add_logging_arguments, configure_logging
+from opal.csv_output import COMPRESSION_SUFFIXES, CsvWriter
+from opal.output_writers import OUTPUT_FORMATS, check_output_format, open_writer
+from opal.profiling import add_instrumentation_arguments, start_instrumentation
+from opal.progress import ProgressTracker, add_progress_argument, configure_progress
+from opal.sqlite_output import DEFAULT_DATABASE_PATH
+from opal.court_url_paginator import (
+    build_court_url, negotiate_page_size, parse_court_page_info, total_pages_for,
+    verify_case_count
+)
 
-def extract_all_court_cases():
-    """Extract all court cases from all available pages"""
+logger = logging.getLogger(__name__)
+
+def extract_all_court_cases(sync=False, sync_state_path=DEFAULT_SYNC_STATE_PATH,
+                            recycle_after_pages=None, max_browser_rss_mb=None, output_format='json',
+                            database_path=DEFAULT_DATABASE_PATH, csv_compression=None):
+    """
+    Extract all court cases from all available pages
+    
+    Args:
+        sync: Only output cases that are new or changed since the last sync, and
+            stop paging at the first page of already known cases
+        sync_state_path: File holding the known cases and per-court watermark
+        recycle_after_pages: Restart the browser after this many page loads
+        max_browser_rss_mb: Restart the browser once its processes use more memory than this
+        output_format: 'json' to write JSON and CSV files at the end, 'jsonl' /
+            'csv' / 'parquet' to stream cases to the file as each page is parsed, or
+            'sqlite' to upsert them into database_path
+        database_path: SQLite database used when output_format is 'sqlite'
+        csv_compression: None, 'gzip' or 'zstd' to compress CSV output
+    """
 
     # Base URL for Alabama Appeals Court
     base_url = "https://publicportal.alappeals.gov/portal/search/case/results?criteria=~%28advanced~false~courtID~%2768f021c4-6a44-4735-9a76-5360b2e8af13~page~%28size~25~number~0~totalElements~0~totalPages~0%29~sort~%28sortBy~%27caseHeader.filedDate~sortDesc~true%29~case~%28caseCategoryID~1000000~caseNumberQueryTypeID~10463~caseTitleQueryTypeID~300054~filedDateChoice~%27-1y~filedDateStart~%2706%2a2f11%2a2f2024~filedDateEnd~%2706%2a2f11%2a2f2025~excludeClosed~false%29%29"
@@ -17,106 +47,191 @@ def extract_all_court_cases():
     # URL from the last page that shows the real total
     last_page_url = "https://publicportal.alappeals.gov/portal/search/case/results?criteria=~%28advanced~false~courtID~%2768f021c4-6a44-4735-9a76-5360b2e8af13~page~%28size~25~number~12~totalElements~318~totalPages~13%29~sort~%28sortBy~%27caseHeader.filedDate~sortDesc~true%29~case~%28caseCategoryID~1000000~caseNumberQueryTypeID~10463~caseTitleQueryTypeID~300054~filedDateChoice~%27-1y~filedDateStart~%2706%2a2f11%2a2f2024~filedDateEnd~%2706%2a2f11%2a2f2025~excludeClosed~false%29%29"
 
-    # Extract the total pages from the last page URL
-    _, total_pages = parse_court_url(last_page_url)
-    total_pages = total_pages or 13  # Fallback to 13 if parsing fails
+    # Expected total from the last page URL, refreshed from the portal once page 0 loads
+    expected_total = parse_court_page_info(last_page_url)['totalElements'] or 318
     
     print("Alabama Appeals Court - Complete Data Extraction")
     print("==============================================")
     print(f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Total pages to process: {total_pages}")
     print()
     
     # Create parser instance
-    parser = ParserAppealsAL(headless=True, rate_limit_seconds=2)
+    parser = ParserAppealsAL(headless=True, rate_limit_seconds=2,
+                             recycle_after_pages=recycle_after_pages,
+                             max_browser_rss_mb=max_browser_rss_mb)
+    
+    stream = None
+    progress = None
     
     try:
         all_cases = []
+        cases_found = 0
+        if output_format != 'json':
+            stream = open_writer(
+                output_format, f"alabama_appeals_court_complete_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                database_path=database_path, compression=csv_compression)
+            print(f"Streaming cases to {stream.path}")
+        sync_store = CourtSyncStore(sync_state_path) if sync else None
+        seen_cases = []
+        pages_processed = 0
         
-        # Process ALL pages (0-indexed, so 0 to 12 for 13 pages)
-        for page_num in range(total_pages):
-            print(f"Processing page {page_num + 1} of {total_pages}...", end='', flush=True)
+        # Probe for the largest page size; the probe doubles as page 0
+        page_size, first_result = negotiate_page_size(base_url, parser)
+        if parser.driver:
+            reported_total = parse_court_page_info(parser.driver.current_url)['totalElements']
+            if reported_total:
+                expected_total = reported_total
+        total_pages = total_pages_for(expected_total, page_size)
+        print(f"Total pages to process: {total_pages}")
+        progress = ProgressTracker("Civil appeals", total=total_pages, byte_stages=("page_load",))
+        
+        # Process ALL pages (0-indexed); the end is confirmed by the portal while paging
+        for page_num, result in parser.iter_pages(build_court_url(base_url, 0, page_size),
+                                                  first_page_result=first_result, page_size=page_size):
+            pages_processed += 1
+            progress.set_total(parser.pagination['total_pages'])
+            progress.update(records=len(result.get('cases') or []))
             
-            # Build URL for current page
-            if page_num == 0:
-                page_url = base_url
+            page_cases = []
+            reached_known = False
+            found = len(result.get('cases') or [])
+            if "cases" in result and result['cases'] and sync_store:
+                delta, reached_known = sync_store.filter_page('civil', result['cases'])
+                seen_cases.extend(result['cases'])
+                page_cases = delta
+                logger.debug("Page %d of %d: found %d cases, %d new or changed", page_num + 1, total_pages,
+                             found, len(delta), extra={"page": page_num + 1, "total_pages": total_pages,
+                                                       "cases": found, "new_or_changed": len(delta)})
             else:
-                # Update the page number in the URL
-                page_url = base_url.replace('number~0', f'number~{page_num}')
-                page_url = page_url.replace('totalElements~0~totalPages~0', 'totalElements~318~totalPages~13')
-            
-            # Parse the page
-            result = parser.parse_article(page_url)
+                if found:
+                    page_cases = result['cases']
+                logger.debug("Page %d of %d: found %d cases", page_num + 1, total_pages, found,
+                             extra={"page": page_num + 1, "total_pages": total_pages, "cases": found})
             
-            if "cases" in result and result['cases']:
-                all_cases.extend(result['cases'])
-                print(f" Found {len(result['cases'])} cases")
+            if stream:
+                stream.write_many(page_cases)
             else:
-                print(f" No cases found")
+                all_cases.extend(page_cases)
+            cases_found += len(page_cases)
+            if reached_known:
+                logger.info("Reached already synced cases, stopping")
+                break
+        progress.finish()
+        
+        # The watermark only moves once the whole run has succeeded
+        if sync_store:
+            sync_store.record('civil', seen_cases)
+            sync_store.save()
                 
         # Create the final output
         output_data = {
             "status": "success",
-            "total_cases": len(all_cases),
-            "expected_total": 318,  # From the URL
+            "total_cases": cases_found,
+            "expected_total": expected_total,
+            "page_size": page_size,
             "extraction_date": datetime.now().strftime("%Y-%m-%d"),
             "extraction_time": datetime.now().strftime("%H:%M:%S"),
-            "pages_processed": total_pages,
+            "pages_processed": pages_processed,
+            "driver": parser.driver_report(),
+            "output_format": output_format,
             "cases": all_cases
         }
         
-        # Save to JSON file
-        filename = f"alabama_appeals_court_complete_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(output_data, f, indent=4, ensure_ascii=False)
-        
-        print(f"\n✓ Successfully extracted {len(all_cases)} court cases")
-        print(f"✓ Expected total: 318 cases")
-        print(f"✓ Results saved to {filename}")
-        
-        # Create CSV table
-        csv_filename = f"alabama_appeals_court_complete_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        with open(csv_filename, "w", encoding="utf-8") as f:
-            # Write CSV header
-            f.write("Court,Case Number,Case Title,Classification,Filed Date,Status,Case Link\n")
-            
-            # Write each case as a CSV row
-            for case in all_cases:
-                court = case.get('court', '').replace(',', ';')
-                case_num = case.get('case_number', {}).get('text', '').replace(',', ';')
-                title = case.get('case_title', '').replace(',', ';').replace('"', "'")
-                classification = case.get('classification', '').replace(',', ';')
-                filed = case.get('filed_date', '')
-                status = case.get('status', '')
-                link = f"https://publicportal.alappeals.gov{case.get('case_number', {}).get('link', '')}"
-                
-                f.write(f'"{court}","{case_num}","{title}","{classification}","{filed}","{status}","{link}"\n')
-        
-        print(f"✓ CSV table saved to {csv_filename}")
+        if stream:
+            stream.close({key: value for key, value in output_data.items() if key != 'cases'})
+            print(f"\n✓ Successfully extracted {cases_found} court cases")
+            print(f"✓ Results streamed to {stream.path} (summary in {stream.manifest_path})")
+        else:
+            save_complete_results(output_data, expected_total, csv_compression)
         
         # Display summary
         print("\nSummary:")
-        print(f"- Total cases extracted: {len(all_cases)}")
-        print(f"- Pages processed: {total_pages}")
+        print(f"- Total cases extracted: {cases_found}")
+        print(f"- Pages processed: {pages_processed}")
         
         # Verify we got all cases
-        if len(all_cases) < 318:
-            print(f"\n⚠️  Warning: Expected 318 cases but only found {len(all_cases)}")
-            print("   Some pages may have had fewer than 25 cases")
-        elif len(all_cases) > 318:
-            print(f"\n⚠️  Warning: Found more cases ({len(all_cases)}) than expected (318)")
-            print("   There may be duplicates or the total has changed")
-        else:
-            print("\n✓ Successfully extracted all expected cases!")
+        print()
+        if sync_store:
+            print(f"✓ Sync complete, watermark is {sync_store.watermark('civil')}")
+        elif verify_case_count(cases_found, expected_total):
+            print("✓ Successfully extracted all expected cases!")
             
     except Exception as e:
         print(f"\nError occurred: {str(e)}")
         import traceback
         traceback.print_exc()
+        if stream:
+            stream.close({"error": str(e)}, status="failed")
+            print(f"Cases found before the error are in {stream.path}")
     finally:
+        if progress:
+            progress.finish()
         # Ensure driver is closed
         parser._close_driver()
         print(f"\nEnd time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
+def save_complete_results(output_data, expected_total, csv_compression=None):
+    """Write the collected results to timestamped JSON and CSV files"""
+    all_cases = output_data['cases']
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    # Save to JSON file
+    filename = f"alabama_appeals_court_complete_{timestamp}.json"
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(output_data, f, indent=4, ensure_ascii=False)
+    
+    print(f"\n✓ Successfully extracted {len(all_cases)} court cases")
+    print(f"✓ Expected total: {expected_total} cases")
+    print(f"✓ Results saved to {filename}")
+    
+    # Create CSV table
+    csv_filename = f"alabama_appeals_court_complete_{timestamp}.csv{COMPRESSION_SUFFIXES.get(csv_compression, '')}"
+    with CsvWriter(csv_filename, compression=csv_compression, manifest=False) as csv_writer:
+        csv_writer.write_many(all_cases)
+    
+    print(f"✓ CSV table saved to {csv_filename}")
+
+def main():
+    """Command line interface for the complete court extraction"""
+    parser = argparse.ArgumentParser(description='Extract all Alabama Civil Court of Appeals cases from the last year')
+    parser.add_argument('--sync', action='store_true',
+                        help='Only output cases that are new or changed since the last sync')
+    parser.add_argument('--sync-state', default=DEFAULT_SYNC_STATE_PATH,
+                        help=f'Sync state file (default: {DEFAULT_SYNC_STATE_PATH})')
+    parser.add_argument('--recycle-pages', type=int,
+                        help='Restart the browser after this many pages (default: never)')
+    parser.add_argument('--max-browser-mb', type=float,
+                        help='Restart the browser when its processes exceed this much resident memory')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='json',
+                        help='json writes JSON and CSV files at the end; jsonl, csv and parquet stream '
+                             'cases to the file as each page is parsed; sqlite upserts them into '
+                             'the --database file (default: json)')
+    parser.add_argument('--database', default=DEFAULT_DATABASE_PATH,
+                        help=f'SQLite database used with --format sqlite (default: {DEFAULT_DATABASE_PATH})')
+    parser.add_argument('--csv-compression', choices=list(COMPRESSION_SUFFIXES),
+                        help='Compress the CSV output; zstd needs the zstandard package (default: none)')
+    add_instrumentation_arguments(parser, "extract_all_court_cases")
+    add_logging_arguments(parser)
+    add_progress_argument(parser)
+    args = parser.parse_args()
+    configure_logging(args.log_level, args.log_format, args.quiet)
+    configure_progress(args.progress)
+    start_instrumentation(parser, args, "extract_all_court_cases")
+    
+    if args.recycle_pages is not None and args.recycle_pages < 1:
+        parser.error("--recycle-pages must be at least 1")
+    if args.max_browser_mb is not None and args.max_browser_mb <= 0:
+        parser.error("--max-browser-mb must be greater than 0")
+    try:
+        check_output_format(args.format, args.csv_compression)
+    except ImportError as e:
+        parser.error(str(e))
+    
+    extract_all_court_cases(sync=args.sync, sync_state_path=args.sync_state,
+                            recycle_after_pages=args.recycle_pages,
+                            max_browser_rss_mb=args.max_browser_mb,
+                            output_format=args.format,
+                            database_path=args.database,
+                            csv_compression=args.csv_compression)
+
 if __name__ == "__main__":
-    extract_all_court_cases()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -2,12 +2,17 @@
 integrated_parser.py - Combines URL collection and article parsing functionality
 """
 
-from typing import Type
+from typing import Any, Dict, Iterator, Optional, Type
 import json
+import logging
+from opal.checkpoint import ExtractionCheckpoint
 from opal.parser_module import BaseParser
 from opal.url_catcher_module import get_all_news_urls
-from opal.court_url_paginator import paginate_court_urls, is_court_url
+from opal.court_url_paginator import discover_court_pages, is_court_url
 from opal.court_case_parser import ParserAppealsAL
+from opal.progress import ProgressTracker
+
+logger = logging.getLogger(__name__)
 
 class IntegratedParser:
     """Class to handle both URL collection and parsing for news articles and court records"""
@@ -21,7 +26,7 @@ class IntegratedParser:
         """
         self.parser = parser_class()
 
-    def process_site(self, base_url: str, suffix: str ="", max_pages: int = None) -> str:
+    def process_site_objects(self, base_url: str, suffix: str = "", max_pages: int = None) -> Dict[str, Any]:
         """
         Process an entire news site by collecting URLs and parsing articles
         
@@ -31,37 +36,108 @@ class IntegratedParser:
             max_pages: Maximum number of pages to process
             
         Returns:
-            JSON string containing all parsed articles
+            Dictionary with all parsed articles or court cases; serialize it once
+            where it is written out
         """
         # Check if this is a court URL
         if is_court_url(base_url) and isinstance(self.parser, ParserAppealsAL):
             # Handle court case processing
-            print("Processing court case data...")
+            logger.info("Processing court case data...")
 
-            # Get paginated URLs for court portal
-            urls = paginate_court_urls(base_url, self.parser)
-            print(f"Found {len(urls)} pages to process")
+            # Get paginated URLs for court portal, keeping the first page's cases
+            urls, first_page_result = discover_court_pages(base_url, self.parser)
+            logger.info("Found %d pages to process", len(urls))
 
             # Parse all court cases
-            result = self.parser.parse_all_cases(base_url, urls)
-            return json.dumps(result, indent=4, ensure_ascii=False)
+            return self.parser.parse_all_cases(base_url, urls, first_page_result)
         else:
             # Handle regular news site processing
             # Get all article URLs
             urls = get_all_news_urls(base_url, suffix, max_pages)
-            print(f"Found {len(urls)} articles to process")
+            logger.info("Found %d articles to process", len(urls))
 
             # Parse all articles using the specified parser
             try:
-                parsed_articles = json.loads(self.parser.parse_articles(urls))
-                return json.dumps({
+                parsed_articles = self.parser.parse_articles_objects(urls)
+                return {
                     'success': True,
                     'total_articles': len(parsed_articles),
                     'articles': parsed_articles
-                }, indent=4, ensure_ascii=False)
-            except json.JSONDecodeError as e:
-                return json.dumps({
+                }
+            except ValueError as e:
+                return {
                     'success': False,
                     'error': str(e),
                     'urls_found': len(urls)
-                }, indent=4, ensure_ascii=False)
+                }
+
+    def process_site(self, base_url: str, suffix: str ="", max_pages: int = None) -> str:
+        """
+        Process an entire news site by collecting URLs and parsing articles
+        
+        Args:
+            base_url: Base URL of the news site
+            suffix: URL suffix to identify article pages
+            max_pages: Maximum number of pages to process
+            
+        Returns:
+            JSON string containing all parsed articles
+        """
+        return json.dumps(self.process_site_objects(base_url, suffix, max_pages), indent=4, ensure_ascii=False)
+
+    def iter_records(self, base_url: str, suffix: str = "", max_pages: int = None,
+                     checkpoint: Optional[ExtractionCheckpoint] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield articles or court cases one at a time as they are parsed
+        
+        Args:
+            base_url: Base URL of the news site or court search URL
+            suffix: URL suffix to identify article pages
+            max_pages: Maximum number of pages to process
+            checkpoint: Checkpoint to resume from and update. Completed court pages
+                and article URLs are skipped, and a page or article is marked done
+                when the next record is requested, after the caller has written it
+            
+        Yields:
+            Article or court case dictionaries
+        """
+        if is_court_url(base_url) and isinstance(self.parser, ParserAppealsAL):
+            logger.info("Processing court case data...")
+            start_page = checkpoint.next_page() if checkpoint else 0
+            progress = ProgressTracker("Court pages", done=start_page, byte_stages=("page_load",))
+            try:
+                for page_index, result in self.parser.iter_pages(base_url, max_pages=max_pages,
+                                                                 start_page=start_page):
+                    # The portal's page count is known once the first page has loaded
+                    total_pages = self.parser.pagination["total_pages"]
+                    progress.set_total(min(total_pages, max_pages) if total_pages and max_pages else total_pages)
+                    cases = result.get("cases", [])
+                    yield from cases
+                    if checkpoint:
+                        checkpoint.mark_done(page_index)
+                    progress.update(records=len(cases))
+            finally:
+                progress.finish()
+                self.parser._close_driver()
+        else:
+            # A resumed run works through the article list it started with
+            urls = checkpoint.get("urls") if checkpoint else None
+            if urls is None:
+                urls = get_all_news_urls(base_url, suffix, max_pages)
+                if checkpoint:
+                    checkpoint.set("urls", urls)
+            logger.info("Found %d articles to process", len(urls))
+            if checkpoint:
+                urls_left = [url for url in urls if not checkpoint.is_done(url)]
+            else:
+                urls_left = urls
+            with ProgressTracker("Articles", total=len(urls), unit="articles", done=len(urls) - len(urls_left),
+                                 byte_stages=("fetch",)) as progress:
+                for url in urls_left:
+                    found = 0
+                    for article in self.parser.iter_articles([url]):
+                        yield article
+                        found += 1
+                        if checkpoint:
+                            checkpoint.mark_done(url)
+                    progress.update(records=found)
@@ -0,0 +1,132 @@
+"""
+Logging setup shared by the command line tools
+
+Modules log through logging.getLogger(__name__), so every record belongs to
+the 'opal' logger hierarchy. configure_logging attaches one handler to it,
+writing to stderr either readable text or one JSON object per line for log
+collectors. Messages use %-style arguments, so records below the level are
+dropped before any formatting happens. ThrottledLog limits repeating progress
+messages to one per interval.
+"""
+import json
+import logging
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+LOG_FORMATS = ["text", "json"]
+
+# Attributes every LogRecord has; anything else was passed with extra= and goes into JSON records
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record with time, level, logger, message and any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain messages for INFO and below, prefixed with the level above that"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        if record.levelno > logging.INFO:
+            return f"{record.levelname}: {message}"
+        return message
+
+
+def configure_logging(level: str = "INFO", log_format: str = "text", quiet: bool = False,
+                      stream=None) -> logging.Logger:
+    """
+    Send OPAL's log records to stderr (or another stream)
+
+    Calling it again replaces the previous configuration.
+
+    Args:
+        level: Lowest level written, one of LOG_LEVELS
+        log_format: 'text' or 'json'
+        quiet: Only write warnings and errors, whatever the level
+        stream: Stream to write to (default: sys.stderr)
+
+    Returns:
+        The 'opal' logger
+    """
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format: {log_format}")
+    logger = logging.getLogger("opal")
+    for handler in list(logger.handlers):
+        if getattr(handler, "_opal_handler", False):
+            logger.removeHandler(handler)
+    handler = logging.StreamHandler(stream if stream is not None else sys.stderr)
+    handler._opal_handler = True
+    handler.setFormatter(JsonFormatter() if log_format == "json" else TextFormatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(max(logging.getLevelName(level.upper()), logging.WARNING) if quiet
+                    else logging.getLevelName(level.upper()))
+    logger.propagate = False
+    return logger
+
+
+def add_logging_arguments(parser):
+    """Add --log-level, --log-format and --quiet to a command line parser"""
+    parser.add_argument('--log-level', type=str.upper, choices=LOG_LEVELS, default='INFO',
+                        help='Lowest level of log messages written to stderr (default: INFO)')
+    parser.add_argument('--log-format', choices=LOG_FORMATS, default='text',
+                        help='text for people, json for one JSON object per line (default: text)')
+    parser.add_argument('--quiet', action='store_true',
+                        help='Only log warnings and errors')
+
+
+class ThrottledLog:
+    """Writes a repeating message at most once per interval, counting the ones skipped"""
+
+    def __init__(self, logger: logging.Logger, interval_seconds: float = 5.0, level: int = logging.INFO):
+        """
+        Args:
+            logger: Logger to write to
+            interval_seconds: Minimum time between two records
+            level: Level of the records
+        """
+        self.logger = logger
+        self.interval_seconds = interval_seconds
+        self.level = level
+        self.suppressed = 0
+        self._last = None
+        self._lock = threading.Lock()
+
+    def __call__(self, message: str, *args, force: bool = False, **fields):
+        """
+        Log a message unless one was logged less than the interval ago
+
+        Args:
+            message: %-style message
+            args: Message arguments, only formatted when the record is written
+            force: Write even within the interval, for example the last item
+            fields: Extra fields for JSON records
+        """
+        if not self.logger.isEnabledFor(self.level):
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._last is not None and now - self._last < self.interval_seconds:
+                self.suppressed += 1
+                return
+            self._last = now
+            suppressed, self.suppressed = self.suppressed, 0
+        self.logger.log(self.level, message, *args, extra=dict(fields, suppressed=suppressed))
@@ -7,6 +7,16 @@ from datetime import datetime
 from opal.integrated_parser import IntegratedParser
 from opal.parser_module import Parser1819, ParserDailyNews
 from opal.court_case_parser import ParserAppealsAL
+from opal.checkpoint import ExtractionCheckpoint, can_resume
+from opal.log_config import add_logging_arguments, configure_logging
+from opal.csv_output import COMPRESSION_SUFFIXES
+from opal.output_writers import OUTPUT_FORMATS, check_output_format, open_writer
+from opal.profiling import add_instrumentation_arguments, start_instrumentation
+from opal.progress import add_progress_argument, configure_progress
+from opal.sqlite_output import DEFAULT_DATABASE_PATH
+
+# Records written per batch (one SQLite transaction, one checkpoint save)
+STREAM_BATCH_SIZE = 100
 
 def main():
     """
@@ -28,9 +38,51 @@ def main():
     console_arguments.add_argument('--parser', type=str, required=True, default=None,
                                 choices=['Parser1819', 'ParserDailyNews', 'ParserAppealsAL'],
                                 help='Pick an available parser')
+    console_arguments.add_argument('--format', type=str, default='json', choices=OUTPUT_FORMATS,
+                                   help='json writes one file at the end; jsonl, csv and parquet stream '
+                                        'each record to the file as it is parsed; sqlite upserts each '
+                                        'record into the --database file (default: json)')
+    console_arguments.add_argument('--csv-compression', type=str, default=None,
+                                   choices=list(COMPRESSION_SUFFIXES),
+                                   help='Compress --format csv output; zstd needs the zstandard package')
+    console_arguments.add_argument('--database', type=str, default=DEFAULT_DATABASE_PATH,
+                                   help=f'SQLite database used with --format sqlite (default: {DEFAULT_DATABASE_PATH})')
+    console_arguments.add_argument('--resume', action='store_true',
+                                   help='Continue an interrupted jsonl, csv or sqlite run from its checkpoint')
+    console_arguments.add_argument('--checkpoint', type=str, default=None,
+                                   help='Checkpoint file updated after each article or court page '
+                                        '(default: <parser>.checkpoint.json)')
+
+    add_instrumentation_arguments(console_arguments, "opal")
+    add_logging_arguments(console_arguments)
+    add_progress_argument(console_arguments)
 
     # Pass command-line arguments
     args = console_arguments.parse_args()
+    configure_logging(args.log_level, args.log_format, args.quiet)
+    configure_progress(args.progress)
+    start_instrumentation(console_arguments, args, "opal")
+    try:
+        check_output_format(args.format, args.csv_compression)
+    except ImportError as e:
+        console_arguments.error(str(e))
+    if args.resume and not can_resume(args.format, args.csv_compression):
+        console_arguments.error("--resume needs --format jsonl, csv (uncompressed) or sqlite")
+
+    # Streamed output is checkpointed so an interrupted run can be resumed
+    checkpoint = None
+    if can_resume(args.format, args.csv_compression):
+        job = {"parser": args.parser, "url": args.url, "suffix": args.suffix,
+               "max_pages": args.max_pages, "output_format": args.format}
+        checkpoint_path = args.checkpoint or f"{args.parser}.checkpoint.json"
+        if args.resume:
+            try:
+                checkpoint = ExtractionCheckpoint.load(checkpoint_path, job)
+            except (FileNotFoundError, ValueError) as e:
+                console_arguments.error(str(e))
+            print(f"Resuming from {checkpoint_path}: {len(checkpoint.completed)} done")
+        else:
+            checkpoint = ExtractionCheckpoint(checkpoint_path, job)
 
     parsers = {
         'Parser1819': Parser1819,
@@ -52,16 +104,16 @@ def main():
     # Create parser instance
     news_parser = IntegratedParser(news_parser_class)
 
-    #Save the arguments to the news_items variable
-    news_urls = news_parser.process_site(
+    if args.format != 'json':
+        stream_records(news_parser, args, today, checkpoint)
+        return
+
+    #Save the arguments to the parsed_data variable
+    parsed_data = news_parser.process_site_objects(
         base_url = args.url,
         suffix=args.suffix,
         max_pages=args.max_pages
     )
-
-
-   # Print results
-    parsed_data = json.loads(news_urls)
     
     # Check if this is court data or news data
     if args.parser == 'ParserAppealsAL':
@@ -108,5 +160,45 @@ def main():
         else:
             print(f"\nError occurred: {parsed_data['error']}")
 
+def stream_records(news_parser, args, today, checkpoint=None):
+    """
+    Write parsed records to the output file in batches of STREAM_BATCH_SIZE
+    
+    Pages and URLs marked done by the parser are only checkpointed once the
+    batch holding their records has been written.
+    """
+    record_type = 'cases' if args.parser == 'ParserAppealsAL' else 'articles'
+    with open_writer(args.format, f"{today}_{args.parser}", record_type,
+                     database_path=args.database, compression=args.csv_compression,
+                     resume=checkpoint.output if checkpoint else None) as writer:
+        if checkpoint:
+            checkpoint.writer = writer
+            checkpoint.hold_marks()
+        batch = []
+
+        def write_batch():
+            writer.write_many(batch)
+            batch.clear()
+            if checkpoint:
+                checkpoint.release_marks()
+
+        for record in news_parser.iter_records(args.url, suffix=args.suffix, max_pages=args.max_pages,
+                                               checkpoint=checkpoint):
+            # Written when the next record arrives, once the parser has marked the batch's pages or URLs
+            if len(batch) >= STREAM_BATCH_SIZE:
+                write_batch()
+            batch.append(record)
+        write_batch()
+        writer.close({
+            "parser": args.parser,
+            "base_url": args.url,
+            f"total_{record_type}": writer.records_written,
+            "extraction_date": today
+        })
+    if checkpoint:
+        checkpoint.remove()
+    print(f"\nSuccessfully processed {writer.records_written} {record_type}")
+    print(f"Results saved to '{writer.path}' (summary in '{writer.manifest_path}')")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,257 @@
+"""
+Opt-in memory instrumentation (--memory-profile)
+
+Large runs can be killed for running out of memory, and the cause may be the
+cases or articles collected in lists, parsed pages that are kept alive, or
+Chrome. With --memory-profile Python allocations are traced with tracemalloc:
+the traced size is read at every stage boundary (the metrics timers), and a
+snapshot is taken whenever it reaches a new high. A background thread samples
+the resident memory of the Python process and, separately, of its children
+(chromedriver and Chrome). The run report gets a 'memory' section with the
+peaks, the growth per stage and the source lines that hold the most memory.
+
+Tracing slows allocation-heavy code down, so leave it off for production runs.
+"""
+import atexit
+import os
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+from opal import metrics
+from opal import process_memory
+from opal.process_memory import process_tree_rss
+
+MB = 1024 * 1024
+
+# Smallest growth of the traced size worth a new peak snapshot
+MIN_SNAPSHOT_GROWTH = MB
+
+# Allocations made by the instrumentation itself or by the import system
+_IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, process_memory.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _mb(size: float) -> float:
+    return round(size / MB, 2)
+
+
+def _location(frame) -> str:
+    """'package/module.py:line' for a traceback frame"""
+    parts = frame.filename.replace("\\", "/").split("/")
+    return f"{'/'.join(parts[-2:])}:{frame.lineno}"
+
+
+def top_allocations(snapshot: tracemalloc.Snapshot, baseline: Optional[tracemalloc.Snapshot] = None,
+                    limit: int = 15) -> List[Dict]:
+    """
+    Source lines holding the most traced memory in a snapshot
+
+    Args:
+        snapshot: Snapshot to rank
+        baseline: Earlier snapshot; when given, lines are ranked by how much
+            they grew since then
+        limit: Number of lines to return
+
+    Returns:
+        List of dictionaries with location, size_mb, count and, with a
+        baseline, growth_mb
+    """
+    snapshot = snapshot.filter_traces(_IGNORED_TRACES)
+    if baseline is None:
+        return [{"location": _location(stat.traceback[0]), "size_mb": _mb(stat.size), "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:limit]]
+    differences = snapshot.compare_to(baseline.filter_traces(_IGNORED_TRACES), "lineno")
+    return [{"location": _location(stat.traceback[0]), "size_mb": _mb(stat.size), "count": stat.count,
+             "growth_mb": _mb(stat.size_diff)}
+            for stat in differences[:limit] if stat.size_diff > 0]
+
+
+class MemoryMonitor:
+    """Traces Python allocations and samples process and browser memory during a run"""
+
+    def __init__(self, sample_interval_seconds: float = 1.0, frames: int = 1, top: int = 15,
+                 snapshot_growth: float = 0.25, run_metrics: Optional[metrics.RunMetrics] = None):
+        """
+        Args:
+            sample_interval_seconds: Time between two resident memory samples
+            frames: Stack frames kept per allocation (more frames cost more memory)
+            top: Number of source lines listed in the report
+            snapshot_growth: Take a new peak snapshot when the traced size has
+                grown by this fraction since the last one
+            run_metrics: Metrics whose stage timers and run report are used
+                (default: the process-wide instance)
+        """
+        self.sample_interval_seconds = sample_interval_seconds
+        self.frames = frames
+        self.top = top
+        self.snapshot_growth = snapshot_growth
+        self.run_metrics = run_metrics or metrics.get_metrics()
+        self.samples = 0
+        self.python_rss = {"peak": 0, "last": 0}
+        self.browser_rss = {"peak": 0, "last": 0}
+        self.stages = {}
+        self.snapshots = []
+        self._baseline = None
+        self._peak_snapshot = None
+        self._end_snapshot = None
+        self._traced_at_end = (0, 0)
+        self._started_tracing = False
+        self._entered = threading.local()
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._start = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="opal-memory-sampler", daemon=True)
+        self.stopped = False
+
+    def start(self):
+        """Start tracing and sampling, and add the 'memory' section to the run report"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._start = time.monotonic()
+        self._baseline = self._snapshot("start")
+        self.sample()
+        self.run_metrics.add_stage_listener(self.stage_boundary)
+        self.run_metrics.add_report_section("memory", self.report)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and take the final snapshot; the report stays available"""
+        if self.stopped:
+            return
+        self.stopped = True
+        self.run_metrics.remove_stage_listener(self.stage_boundary)
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+        self._end_snapshot = self._snapshot("end")
+        self._traced_at_end = tracemalloc.get_traced_memory()
+        if self._started_tracing:
+            tracemalloc.stop()
+
+    def _snapshot(self, label: str) -> tracemalloc.Snapshot:
+        snapshot = tracemalloc.take_snapshot()
+        traced = tracemalloc.get_traced_memory()[0]
+        self.snapshots.append({"label": label, "seconds": round(time.monotonic() - self._start, 3),
+                               "traced_mb": _mb(traced)})
+        return snapshot
+
+    def sample(self):
+        """Record the resident memory of this process and of its child processes"""
+        pid = os.getpid()
+        usage = process_tree_rss(pid)
+        python_rss = usage.get(pid, 0)
+        browser_rss = sum(rss for child, rss in usage.items() if child != pid)
+        with self._lock:
+            self.samples += 1
+            self.python_rss["last"] = python_rss
+            self.python_rss["peak"] = max(self.python_rss["peak"], python_rss)
+            self.browser_rss["last"] = browser_rss
+            self.browser_rss["peak"] = max(self.browser_rss["peak"], browser_rss)
+
+    def _run(self):
+        while not self._stop.wait(self.sample_interval_seconds):
+            self.sample()
+
+    def stage_boundary(self, stage: str, finished: bool):
+        """
+        Metrics stage listener: record the traced size when a stage starts and
+        ends, and snapshot new highs at the end of a stage
+        """
+        if not tracemalloc.is_tracing():
+            return
+        traced = tracemalloc.get_traced_memory()[0]
+        entered = self._entered.__dict__.setdefault("stack", [])
+        if not finished:
+            entered.append(traced)
+            return
+        growth = traced - entered.pop() if entered else 0
+        with self._lock:
+            stats = self.stages.setdefault(stage, {"boundaries": 0, "peak_traced": 0, "net_growth": 0})
+            stats["boundaries"] += 1
+            stats["peak_traced"] = max(stats["peak_traced"], traced)
+            stats["net_growth"] += growth
+            last = self.snapshots[-1]["traced_mb"] * MB if self.snapshots else 0
+        if (traced > last * (1 + self.snapshot_growth) and traced - last >= MIN_SNAPSHOT_GROWTH
+                and self._snapshot_lock.acquire(blocking=False)):
+            try:
+                self._peak_snapshot = self._snapshot(f"after {stage}")
+            finally:
+                self._snapshot_lock.release()
+
+    def report(self) -> Dict:
+        """
+        'memory' section of the run report
+
+        Returns:
+            Dictionary with resident memory peaks, traced Python memory, growth
+            per stage, the snapshots taken and the top allocating source lines
+            at the highest snapshot and at the end (both against the start)
+        """
+        if self.stopped:
+            traced, traced_peak = self._traced_at_end
+        elif tracemalloc.is_tracing():
+            traced, traced_peak = tracemalloc.get_traced_memory()
+        else:
+            traced, traced_peak = 0, 0
+        with self._lock:
+            report = {
+                "sample_interval_seconds": self.sample_interval_seconds,
+                "samples": self.samples,
+                "python_rss_mb": {"peak": _mb(self.python_rss["peak"]), "last": _mb(self.python_rss["last"])},
+                "browser_rss_mb": {"peak": _mb(self.browser_rss["peak"]), "last": _mb(self.browser_rss["last"])},
+                "traced_mb": {"peak": _mb(traced_peak), "current": _mb(traced)},
+                "stages": {stage: {"boundaries": stats["boundaries"], "peak_traced_mb": _mb(stats["peak_traced"]),
+                                   "net_growth_mb": _mb(stats["net_growth"])}
+                           for stage, stats in sorted(self.stages.items())},
+                "snapshots": list(self.snapshots),
+            }
+        peak = self._peak_snapshot
+        if peak is not None:
+            report["top_allocations_at_peak"] = top_allocations(peak, self._baseline, self.top)
+        if self._end_snapshot is not None:
+            report["top_allocations_at_end"] = top_allocations(self._end_snapshot, self._baseline, self.top)
+        return report
+
+    def summary(self, top: int = 5) -> str:
+        """Short text summary for the end of a run"""
+        report = self.report()
+        lines = [
+            f"Memory: Python peak {report['python_rss_mb']['peak']} MB resident, "
+            f"{report['traced_mb']['peak']} MB traced; browser peak {report['browser_rss_mb']['peak']} MB",
+        ]
+        allocations = report.get("top_allocations_at_peak") or report.get("top_allocations_at_end") or []
+        for allocation in allocations[:top]:
+            lines.append(f"  {allocation['location']}: {allocation['size_mb']} MB "
+                         f"(+{allocation['growth_mb']} MB, {allocation['count']} blocks)")
+        return "\n".join(lines)
+
+
+def monitor_memory_until_exit(sample_interval_seconds: float = 1.0) -> MemoryMonitor:
+    """
+    Start memory instrumentation now, and stop it and print a summary when the
+    process exits, also after an error or Ctrl-C
+
+    Call it after metrics.write_run_outputs_at_exit so the monitor has stopped
+    before the run report is written.
+
+    Args:
+        sample_interval_seconds: Time between two resident memory samples
+    """
+    monitor = MemoryMonitor(sample_interval_seconds)
+    monitor.start()
+
+    def stop_and_print():
+        monitor.stop()
+        print(f"\n{monitor.summary()}")
+
+    atexit.register(stop_and_print)
+    return monitor
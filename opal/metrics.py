@@ -0,0 +1,308 @@
+"""
+Per-stage timing and throughput metrics for extraction runs
+
+Parsers, the URL catcher and the output writers record into one process-wide
+RunMetrics instance: durations and per-page row counts go into histograms,
+bytes, requests, errors, retries and similar totals into counters, each keyed
+by pipeline stage (fetch, listing, page_load, parse, wait, write, ...). At the
+end of a run the command line tools can write the metrics as a JSON run report
+and as a Prometheus textfile for the node exporter's textfile collector.
+"""
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional, Sequence
+
+
+# Upper bounds of the histogram buckets for each kind of observation
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+ROW_BUCKETS = (0, 1, 10, 25, 50, 100, 250, 500, 1000)
+BUCKETS = {"seconds": LATENCY_BUCKETS, "rows": ROW_BUCKETS}
+
+
+def _write_atomic(path: str, text: str):
+    """Replace a file in one step, so readers and collectors never see half of it"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+class Histogram:
+    """Bucketed distribution of observed values with count, sum, min and max"""
+
+    def __init__(self, buckets: Sequence[float]):
+        """
+        Args:
+            buckets: Increasing upper bounds; larger values fall into an overflow bucket
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        """Add one value"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile as the upper bound of the bucket that holds it
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Estimated value (the maximum for the overflow bucket), or None if empty
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self) -> Iterator:
+        """Pairs of (upper bound, observations at or below it), ending with +Inf"""
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            yield bound, seen
+        yield "+Inf", self.count
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "min": self.min,
+            "max": self.max,
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": {str(bound): seen for bound, seen in self.cumulative()},
+        }
+
+
+class RunMetrics:
+    """Thread-safe counters and histograms keyed by pipeline stage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Stages being timed in each thread, innermost last (read by the profiler)
+        self._active = {}
+        # Called with (stage, finished) when a timed block starts and ends
+        self._stage_listeners = []
+        # Report fields built when the report is written, by name
+        self._sections = {}
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far and restart the run clock"""
+        with self._lock:
+            self.started = datetime.now().isoformat(timespec="seconds")
+            self._start = time.monotonic()
+            self._histograms = {}
+            self._counters = {}
+
+    def observe(self, stage: str, name: str, value: float):
+        """
+        Record one observation, for example a fetch duration or a page's row count
+
+        Args:
+            stage: Pipeline stage such as 'fetch' or 'parse'
+            name: 'seconds', 'rows' or another kind of value
+            value: Observed value
+        """
+        with self._lock:
+            histogram = self._histograms.get((stage, name))
+            if histogram is None:
+                histogram = self._histograms[(stage, name)] = Histogram(BUCKETS.get(name, LATENCY_BUCKETS))
+            histogram.observe(value)
+
+    def add(self, stage: str, name: str, value: float = 1):
+        """
+        Increase a counter, for example bytes transferred or retries
+
+        Args:
+            stage: Pipeline stage
+            name: Counter name such as 'bytes', 'requests', 'errors' or 'retries'
+            value: Amount to add
+        """
+        with self._lock:
+            self._counters[(stage, name)] = self._counters.get((stage, name), 0) + value
+
+    @contextmanager
+    def timer(self, stage: str):
+        """Time the enclosed block as one 'seconds' observation of a stage"""
+        active = self._active.setdefault(threading.get_ident(), [])
+        active.append(stage)
+        for listener in self._stage_listeners:
+            listener(stage, False)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, "seconds", time.perf_counter() - start)
+            active.pop()
+            for listener in self._stage_listeners:
+                listener(stage, True)
+
+    def add_stage_listener(self, listener: Callable[[str, bool], None]):
+        """
+        Call a function at every stage boundary, for example to measure memory
+
+        Args:
+            listener: Called as listener(stage, finished) in the timed thread when
+                a timed block starts (finished=False) and ends (finished=True)
+        """
+        self._stage_listeners = self._stage_listeners + [listener]
+
+    def remove_stage_listener(self, listener: Callable[[str, bool], None]):
+        """Stop calling a listener added with add_stage_listener"""
+        self._stage_listeners = [other for other in self._stage_listeners if other != listener]
+
+    def add_report_section(self, name: str, build: Callable[[], Dict]):
+        """
+        Add a top-level field to the run report, built when the report is written
+
+        Args:
+            name: Field name
+            build: Returns the field's value
+        """
+        self._sections[name] = build
+
+    def active_stages(self) -> Dict[int, str]:
+        """Innermost stage being timed in each thread, by thread id"""
+        return {thread_id: stages[-1] for thread_id, stages in list(self._active.items()) if stages}
+
+    def counter(self, stage: str, name: str) -> float:
+        """Current value of a counter (0 if it was never increased)"""
+        with self._lock:
+            return self._counters.get((stage, name), 0)
+
+    def report(self, **extra) -> Dict:
+        """
+        Machine-readable summary of the run
+
+        Args:
+            extra: Additional top-level fields, for example the run summary
+
+        Returns:
+            Dictionary with the start time, duration and per-stage counters and histograms
+        """
+        with self._lock:
+            stages = {}
+            for (stage, name), value in sorted(self._counters.items()):
+                stages.setdefault(stage, {}).setdefault("counters", {})[name] = value
+            for (stage, name), histogram in sorted(self._histograms.items()):
+                stages.setdefault(stage, {})[name] = histogram.to_dict()
+            report = {
+                "started": self.started,
+                "finished": datetime.now().isoformat(timespec="seconds"),
+                "duration_seconds": round(time.monotonic() - self._start, 3),
+                "stages": stages,
+            }
+        for name, build in list(self._sections.items()):
+            report[name] = build()
+        report.update(extra)
+        return report
+
+    def prometheus_text(self, prefix: str = "opal") -> str:
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name in sorted({name for _, name in self._histograms}):
+                metric = f"{prefix}_stage_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for (stage, kind), histogram in sorted(self._histograms.items()):
+                    if kind != name:
+                        continue
+                    for bound, seen in histogram.cumulative():
+                        lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {seen}')
+                    lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram.sum}')
+                    lines.append(f'{metric}_count{{stage="{stage}"}} {histogram.count}')
+            for name in sorted({name for _, name in self._counters}):
+                metric = f"{prefix}_stage_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for (stage, kind), value in sorted(self._counters.items()):
+                    if kind == name:
+                        lines.append(f'{metric}{{stage="{stage}"}} {value}')
+            lines.append(f"# TYPE {prefix}_run_duration_seconds gauge")
+            lines.append(f"{prefix}_run_duration_seconds {round(time.monotonic() - self._start, 3)}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, path: str, **extra):
+        """Write the JSON run report"""
+        _write_atomic(path, json.dumps(self.report(**extra), indent=4, ensure_ascii=False))
+
+    def write_prometheus(self, path: str):
+        """Write a Prometheus textfile for the node exporter's textfile collector"""
+        _write_atomic(path, self.prometheus_text())
+
+
+# Metrics of the current process, shared by every parser and writer
+_run_metrics = RunMetrics()
+
+
+def get_metrics() -> RunMetrics:
+    """The process-wide RunMetrics instance"""
+    return _run_metrics
+
+
+def observe(stage: str, name: str, value: float):
+    """Record an observation in the process-wide metrics (see RunMetrics.observe)"""
+    _run_metrics.observe(stage, name, value)
+
+
+def add(stage: str, name: str, value: float = 1):
+    """Increase a process-wide counter (see RunMetrics.add)"""
+    _run_metrics.add(stage, name, value)
+
+
+def timer(stage: str):
+    """Time a block into the process-wide metrics (see RunMetrics.timer)"""
+    return _run_metrics.timer(stage)
+
+
+def write_run_outputs_at_exit(report_path: Optional[str] = None, prometheus_path: Optional[str] = None,
+                              **extra):
+    """
+    Arrange for the run report and Prometheus textfile to be written when the
+    process exits, including after an error or Ctrl-C
+
+    Args are as for write_run_outputs
+    """
+    if report_path or prometheus_path:
+        atexit.register(write_run_outputs, report_path, prometheus_path, **extra)
+
+
+def write_run_outputs(report_path: Optional[str] = None, prometheus_path: Optional[str] = None, **extra):
+    """
+    Write the run report and Prometheus textfile that were asked for
+
+    Args:
+        report_path: JSON run report to write (None to skip)
+        prometheus_path: Prometheus textfile to write (None to skip)
+        extra: Additional top-level fields for the JSON report
+    """
+    if report_path:
+        _run_metrics.write_report(report_path, **extra)
+        print(f"Run report saved to {report_path}")
+    if prometheus_path:
+        _run_metrics.write_prometheus(prometheus_path)
+        print(f"Prometheus metrics saved to {prometheus_path}")
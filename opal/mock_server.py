@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Local HTTP server that stands in for the news sites and the court portal
+
+It serves synthetic listing pages and articles (opal.synthetic_corpus), court
+results pages that build their table with JavaScript the way the portal does,
+and recorded files such as tests/fixtures, with configurable latency, error
+rate and result counts. Point any fetch path at it to test throughput without
+network access:
+
+    python -m opal.mock_server --port 8000 --latency-ms 50 --error-rate 0.01
+
+    python -m opal.main --url http://127.0.0.1:8000/sites/1819 --suffix /news/item --parser Parser1819
+    python -m opal.configurable_court_extractor --url "<court URL printed at startup>"
+
+Routes:
+    /sites/<site>                  listing page 1 ('1819' or 'daily')
+    /sites/<site>/page/<n>         listing page n (404 past the last page)
+    /sites/<site>/<article path>   synthetic article
+    /portal/search/case/results    court results for the page in the criteria parameter
+    /recorded/<file>               file from the recorded directory
+    /stats                         JSON request and error counts
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from opal.court_criteria import CourtCriteria, quote_criteria, encode_criteria
+from opal.synthetic_corpus import (
+    ARTICLE_SUFFIXES, article_html, article_index, court_case, court_results_html, listing_html
+)
+
+
+DEFAULT_RECORDED_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "tests", "fixtures")
+
+RESULTS_PATH = "/portal/search/case/results"
+
+# Search criteria of the court URL printed at startup (one year of civil appeals)
+DEFAULT_CRITERIA = {
+    "advanced": False,
+    "courtID": "68f021c4-6a44-4735-9a76-5360b2e8af13",
+    "page": {"size": 25, "number": 0, "totalElements": 0, "totalPages": 0},
+    "sort": {"sortBy": "caseHeader.filedDate", "sortDesc": True},
+    "case": {"caseCategoryID": 1000000, "caseNumberQueryTypeID": 10463, "caseTitleQueryTypeID": 300054,
+             "filedDateChoice": "-1y", "filedDateStart": "06/11/2024", "filedDateEnd": "06/11/2025",
+             "excludeClosed": False},
+}
+
+
+class MockSiteConfig:
+    """What the mock server serves and how it misbehaves"""
+
+    def __init__(self, articles: int = 1000, links_per_page: int = 20, court_cases: int = 1000,
+                 latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0,
+                 render_delay_ms: float = 0, javascript: bool = True, seed: int = 0,
+                 recorded_dir: Optional[str] = DEFAULT_RECORDED_DIR):
+        """
+        Args:
+            articles: Articles on each news site
+            links_per_page: Article links per listing page
+            court_cases: Cases found by every court search
+            latency_ms: Delay before every response
+            jitter_ms: Random extra delay of up to this much
+            error_rate: Fraction of requests answered with 503 (0 to 1)
+            render_delay_ms: Time the court page's script waits before building the table
+            javascript: Build court tables in the browser like the portal; False
+                sends the table in the HTML for clients without a browser
+            seed: Corpus seed
+            recorded_dir: Directory served under /recorded/ (None to disable)
+        """
+        if not 0 <= error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.articles = articles
+        self.links_per_page = links_per_page
+        self.court_cases = court_cases
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.render_delay_ms = render_delay_ms
+        self.javascript = javascript
+        self.seed = seed
+        self.recorded_dir = recorded_dir
+
+    @property
+    def listing_pages(self) -> int:
+        return max(1, -(-self.articles // self.links_per_page))
+
+
+def court_results_script_html(criteria: CourtCriteria, cases: list, total_elements: int,
+                              render_delay_ms: float = 0) -> str:
+    """
+    Results page whose table is built by JavaScript after a delay, like the
+    portal's, which also rewrites the URL with the search totals
+
+    Args:
+        criteria: Criteria of the requested page
+        cases: Cases on the page
+        total_elements: Cases found by the search
+        render_delay_ms: Delay before the table appears
+
+    Returns:
+        HTML of the page
+    """
+    page_size = criteria.page_size or 25
+    rendered = criteria.copy()
+    rendered.page.update({"totalElements": total_elements,
+                          "totalPages": max(1, -(-total_elements // page_size))})
+    data = json.dumps({"cases": cases, "url": rendered.to_url()}).replace("</", "<\\/")
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>Public Portal - Case Search Results</title>
+</head>
+<body>
+  <app-root><div class="search-results" id="results">Loading...</div></app-root>
+  <script>
+  var data = {data};
+  function cell(text) {{
+    var td = document.createElement('td');
+    td.textContent = text;
+    return td;
+  }}
+  setTimeout(function () {{
+    var table = document.createElement('table');
+    var header = table.insertRow();
+    ['Court', 'Case Number', 'Case Title', 'Classification', 'Filed Date', 'Status'].forEach(function (name) {{
+      var th = document.createElement('th');
+      th.textContent = name;
+      header.appendChild(th);
+    }});
+    data.cases.forEach(function (c) {{
+      var row = table.insertRow();
+      row.appendChild(cell(c.court));
+      var number = document.createElement('td');
+      var link = document.createElement('a');
+      link.href = c.case_number.link;
+      link.textContent = c.case_number.text;
+      number.appendChild(link);
+      row.appendChild(number);
+      [c.case_title, c.classification, c.filed_date, c.status].forEach(function (text) {{
+        row.appendChild(cell(text));
+      }});
+    }});
+    var results = document.getElementById('results');
+    results.textContent = '';
+    results.appendChild(table);
+    history.replaceState(null, '', data.url);
+  }}, {render_delay_ms:g});
+  </script>
+</body>
+</html>
+"""
+
+
+class MockSiteHandler(BaseHTTPRequestHandler):
+    """Answers one request from the server's configuration"""
+
+    server_version = "OpalMock/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        config = self.server.config
+        path = urlsplit(self.path).path.rstrip("/") or "/"
+
+        if path != "/stats":
+            delay = config.latency_ms + self.server.random() * config.jitter_ms
+            if delay:
+                time.sleep(delay / 1000)
+            if config.error_rate and self.server.random() < config.error_rate:
+                self.server.count("errors")
+                self._send(503, "<html><body>Service Unavailable</body></html>")
+                return
+
+        parts = path.strip("/").split("/")
+        if path == "/stats":
+            self._send(200, json.dumps(self.server.stats_snapshot()), "application/json")
+        elif path == RESULTS_PATH:
+            self._court_page()
+        elif parts[0] == "sites" and len(parts) >= 2 and parts[1] in ARTICLE_SUFFIXES:
+            self._news_page(parts[1], parts[2:])
+        elif parts[0] == "recorded" and len(parts) == 2 and config.recorded_dir:
+            self._recorded(parts[1])
+        else:
+            self._not_found()
+
+    def _news_page(self, site: str, rest: list):
+        config = self.server.config
+        base_url = f"{self.server.url}/sites/{site}"
+        if not rest or (len(rest) == 2 and rest[0] == "page" and rest[1].isdigit()):
+            page = int(rest[1]) if rest else 1
+            if not 1 <= page <= config.listing_pages:
+                self._not_found()
+                return
+            links = min(config.links_per_page, config.articles - (page - 1) * config.links_per_page)
+            self.server.count("listing")
+            self._send(200, listing_html(site, page, config.links_per_page, config.listing_pages, config.seed,
+                                         base_url, links))
+            return
+
+        index = article_index(rest[-1])
+        if index is None or index >= config.articles:
+            self._not_found()
+            return
+        self.server.count("article")
+        self._send(200, article_html(site, index, config.seed, base_url=base_url))
+
+    def _court_page(self):
+        config = self.server.config
+        try:
+            criteria = CourtCriteria.from_url(self.path)
+        except ValueError:
+            self._send(400, "<html><body>Bad criteria</body></html>")
+            return
+        page_size = criteria.page_size or 25
+        start = (criteria.page_number or 0) * page_size
+        rows = max(0, min(page_size, config.court_cases - start))
+        self.server.count("court")
+        if config.javascript:
+            cases = [court_case(index, config.seed) for index in range(start, start + rows)]
+            self._send(200, court_results_script_html(criteria, cases, config.court_cases,
+                                                      config.render_delay_ms))
+        else:
+            self._send(200, court_results_html(start, rows, config.court_cases, config.seed))
+
+    def _recorded(self, name: str):
+        path = os.path.join(self.server.config.recorded_dir, os.path.basename(name))
+        if not os.path.isfile(path):
+            self._not_found()
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            body = f.read()
+        self.server.count("recorded")
+        self._send(200, body, "application/json" if path.endswith(".json") else "text/html")
+
+    def _not_found(self):
+        self.server.count("not_found")
+        self._send(404, "<html><body>Not Found</body></html>")
+
+    def _send(self, status: int, body: str, content_type: str = "text/html"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.count("bytes", len(data))
+
+
+class MockSiteServer(ThreadingHTTPServer):
+    """Threaded HTTP server for the mock sites, with request counts"""
+
+    daemon_threads = True
+
+    def __init__(self, config: Optional[MockSiteConfig] = None, host: str = "127.0.0.1", port: int = 0,
+                 verbose: bool = False):
+        """
+        Args:
+            config: What to serve (default: MockSiteConfig())
+            host: Address to listen on
+            port: Port to listen on (0 picks a free port)
+            verbose: Log every request to stderr
+        """
+        super().__init__((host, port), MockSiteHandler)
+        self.config = config or MockSiteConfig()
+        self.verbose = verbose
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server, for example http://127.0.0.1:8000"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def court_search_url(self, page_size: int = 25) -> str:
+        """Court search URL on this server, page 0 of the default criteria"""
+        values = json.loads(json.dumps(DEFAULT_CRITERIA))
+        values["page"]["size"] = page_size
+        return f"{self.url}{RESULTS_PATH}?criteria={quote_criteria(encode_criteria(values))}"
+
+    def random(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + value
+
+    def stats_snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def start(self) -> "MockSiteServer":
+        """Serve in a background thread and return self"""
+        self._thread = threading.Thread(target=self.serve_forever, name="opal-mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket"""
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve mock news sites and a mock court portal locally')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on (default: 8000)')
+    parser.add_argument('--articles', type=int, default=1000, help='Articles per news site (default: 1000)')
+    parser.add_argument('--links-per-page', type=int, default=20,
+                        help='Article links per listing page (default: 20)')
+    parser.add_argument('--court-cases', type=int, default=1000,
+                        help='Cases found by every court search (default: 1000)')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Delay before every response')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Random extra delay of up to this much')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='Fraction of requests answered with 503, between 0 and 1')
+    parser.add_argument('--render-delay-ms', type=float, default=0,
+                        help='Time court pages take to build their table in the browser')
+    parser.add_argument('--no-javascript', action='store_true',
+                        help='Send court tables in the HTML instead of building them with JavaScript')
+    parser.add_argument('--recorded', default=DEFAULT_RECORDED_DIR,
+                        help='Directory served under /recorded/ (default: tests/fixtures)')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus seed (default: 0)')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    if not 0 <= args.error_rate <= 1:
+        parser.error("--error-rate must be between 0 and 1")
+    if args.articles < 0 or args.court_cases < 0 or args.links_per_page < 1:
+        parser.error("--articles and --court-cases must not be negative, --links-per-page at least 1")
+
+    config = MockSiteConfig(articles=args.articles, links_per_page=args.links_per_page,
+                            court_cases=args.court_cases, latency_ms=args.latency_ms,
+                            jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                            render_delay_ms=args.render_delay_ms, javascript=not args.no_javascript,
+                            seed=args.seed, recorded_dir=args.recorded)
+    server = MockSiteServer(config, args.host, args.port, args.verbose)
+    print(f"Mock server listening on {server.url}")
+    print(f"  1819 News:   {server.url}/sites/1819 (suffix /news/item)")
+    print(f"  Daily News:  {server.url}/sites/daily (suffix /news/)")
+    print(f"  Court URL:   {server.court_search_url()}")
+    print(f"  Stats:       {server.url}/stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nStopped. Requests: {server.stats_snapshot()}")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
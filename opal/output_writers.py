@@ -0,0 +1,271 @@
+"""
+Streaming output writers for parsed articles and court cases
+
+Records are written as they are produced instead of being collected and
+dumped at the end, so memory use stays flat and a crash only loses the
+records that were not yet flushed. Every writer has the same small
+interface: write(record), write_many(records) and close(summary).
+"""
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from opal import metrics
+
+
+def manifest_path_for(path: str) -> str:
+    """Manifest file that belongs next to an output file"""
+    root, _ = os.path.splitext(path)
+    return f"{root}.manifest.json"
+
+
+def write_json_atomic(path: str, data: Dict):
+    """Write a JSON file by replacing it, so readers never see a half-written file"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+class StreamingWriter:
+    """
+    Base class for writers that stream records to one output file
+
+    Subclasses implement _write_records and _finish. The manifest is written
+    when the writer opens (status 'running') and again when it closes.
+    """
+
+    format = None
+
+    def __init__(self, path: str, manifest_path: Optional[str] = None):
+        """
+        Args:
+            path: Output file to write
+            manifest_path: Summary file (default: <path without extension>.manifest.json)
+        """
+        self.path = path
+        self.manifest_path = manifest_path or manifest_path_for(path)
+        self.records_written = 0
+        self.started = datetime.now().isoformat(timespec="seconds")
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def _write_manifest(self, status: str, summary: Optional[Dict] = None):
+        manifest = {
+            "status": status,
+            "output": os.path.basename(self.path),
+            "format": self.format,
+            "records": self.records_written,
+            "started": self.started,
+        }
+        if status != "running":
+            manifest["finished"] = datetime.now().isoformat(timespec="seconds")
+        if summary:
+            manifest["summary"] = summary
+        write_json_atomic(self.manifest_path, manifest)
+
+    def _write_records(self, records: List[Dict]):
+        raise NotImplementedError
+
+    def _finish(self):
+        raise NotImplementedError
+
+    def _resume(self, position: Dict):
+        """Continue the counts of the run a position was taken from"""
+        self.records_written = position["records"]
+        self.started = position["started"]
+
+    def position(self) -> Dict:
+        """
+        Where the output stands after the records written so far
+
+        Everything up to this position is on disk, so a checkpoint can store it
+        and a resumed writer can continue from it.
+        """
+        with self._lock:
+            return {"path": self.path, "records": self.records_written, "started": self.started}
+
+    def write(self, record: Dict):
+        """
+        Append one record
+
+        Args:
+            record: JSON-serializable dictionary
+        """
+        self.write_many([record])
+
+    def write_many(self, records: Iterable[Dict]):
+        """Append several records, for example one results page"""
+        records = list(records)
+        if not records:
+            return
+        with self._lock, metrics.timer("write"):
+            self._write_records(records)
+            self.records_written += len(records)
+        metrics.add("write", "records", len(records))
+
+    def close(self, summary: Optional[Dict] = None, status: str = "complete"):
+        """
+        Flush the output and record the run summary in the manifest
+
+        Args:
+            summary: Run summary to store in the manifest
+            status: 'complete', or 'failed' when the run stopped early
+        """
+        with self._lock:
+            if self.closed:
+                return
+            self._finish()
+            self.closed = True
+        self._write_manifest(status, summary)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.close({"error": str(exc)}, status="failed")
+        return False
+
+
+class JsonLinesWriter(StreamingWriter):
+    """Appends one JSON object per line and keeps a manifest with the run summary"""
+
+    format = "jsonl"
+
+    def __init__(self, path: str, fsync_every: int = 50, manifest_path: Optional[str] = None,
+                 resume: Optional[Dict] = None):
+        """
+        Open the output file and write a manifest marking the run as running
+
+        Args:
+            path: JSON Lines file to write
+            fsync_every: Flush to disk after this many records (0 to only flush on close)
+            manifest_path: Summary file (default: <path without extension>.manifest.json)
+            resume: Position from a checkpoint; the file is cut back to it and appended to
+        """
+        super().__init__(path, manifest_path)
+        self.fsync_every = fsync_every
+        self._unsynced = 0
+        if resume:
+            self._resume(resume)
+            self._file = open(path, "r+", encoding="utf-8")
+            self._file.truncate(resume["offset"])
+            self._file.seek(resume["offset"])
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+        self._write_manifest("running")
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def _write_records(self, records: List[Dict]):
+        for record in records:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._unsynced += 1
+            if self.fsync_every and self._unsynced >= self.fsync_every:
+                self._sync()
+
+    def _finish(self):
+        self._sync()
+        self._file.close()
+
+    def position(self) -> Dict:
+        with self._lock:
+            self._sync()
+            offset = self._file.tell()
+        return {**super().position(), "offset": offset}
+
+
+class TaggedWriter:
+    """Adds fixed fields to every record before passing it on to another writer"""
+
+    def __init__(self, writer, **fields):
+        """
+        Args:
+            writer: Writer that receives the tagged records
+            fields: Fields added to every record, for example court_key='civil'
+        """
+        self.writer = writer
+        self.fields = fields
+
+    def write(self, record: Dict):
+        self.writer.write({**record, **self.fields})
+
+    def write_many(self, records: Iterable[Dict]):
+        self.writer.write_many([{**record, **self.fields} for record in records])
+
+    def close(self, summary: Optional[Dict] = None, status: str = "complete"):
+        """Tagged writers share their target, which is closed by its owner"""
+
+
+# File extension of each streaming output format
+OUTPUT_EXTENSIONS = {"jsonl": "jsonl", "csv": "csv", "parquet": "parquet", "sqlite": "db"}
+
+# Choices for the --format option of the command line tools
+OUTPUT_FORMATS = ["json"] + list(OUTPUT_EXTENSIONS)
+
+
+def check_output_format(output_format: str, compression: Optional[str] = None):
+    """
+    Fail early if an output format needs an optional package that is missing
+
+    Args:
+        output_format: Value of the --format option
+        compression: CSV compression (None, 'gzip' or 'zstd')
+
+    Raises:
+        ImportError: With installation instructions
+    """
+    if compression is not None:
+        from opal.csv_output import check_compression
+        check_compression(compression)
+    if output_format == "parquet":
+        from opal.parquet_output import _require_pyarrow
+        _require_pyarrow()
+
+
+def open_writer(output_format: str, path_prefix: str, record_type: str = "cases",
+                database_path: Optional[str] = None, compression: Optional[str] = None,
+                resume: Optional[Dict] = None):
+    """
+    Open a streaming writer for an output format
+
+    Args:
+        output_format: 'jsonl', 'csv', 'parquet' or 'sqlite'
+        path_prefix: Output path without extension
+        record_type: 'cases' or 'articles' (decides the columns of typed formats)
+        database_path: Database for 'sqlite', shared by all runs instead of one
+            file per run (default: opal.db)
+        compression: None, 'gzip' or 'zstd' for 'csv'
+        resume: Writer position from a checkpoint; the output it names is reopened
+            and continued instead of starting a new one
+
+    Returns:
+        Writer with write, write_many and close
+
+    Raises:
+        ValueError: If the format is not a streaming format, or cannot be resumed
+        ImportError: If the format needs an optional package that is not installed
+    """
+    if output_format not in OUTPUT_EXTENSIONS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    path = f"{path_prefix}.{OUTPUT_EXTENSIONS[output_format]}"
+    if output_format == "sqlite":
+        from opal.sqlite_output import DEFAULT_DATABASE_PATH, SQLiteWriter
+        return SQLiteWriter(database_path or DEFAULT_DATABASE_PATH, record_type=record_type, resume=resume)
+    if output_format == "csv":
+        from opal.csv_output import COMPRESSION_SUFFIXES, CsvWriter
+        path = resume["path"] if resume else path + COMPRESSION_SUFFIXES.get(compression, "")
+        return CsvWriter(path, record_type=record_type, compression=compression, resume=resume)
+    if output_format == "parquet":
+        if resume:
+            raise ValueError("Parquet output cannot be resumed")
+        from opal.parquet_output import ParquetWriter
+        return ParquetWriter(path, record_type=record_type)
+    return JsonLinesWriter(resume["path"] if resume else path, resume=resume)
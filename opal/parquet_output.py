@@ -0,0 +1,149 @@
+"""
+Columnar Parquet export of court cases and news articles
+
+Requires the optional pyarrow package (pip install pyarrow). Rows are
+converted to typed columns: filed and publication dates become date
+columns, low-cardinality fields such as court and status are dictionary
+encoded, and the case number text and link are split into their own columns.
+"""
+from typing import Dict, List, Optional
+from opal.court_case_parser import PORTAL_BASE_URL, parse_filed_date
+from opal.output_writers import StreamingWriter
+from opal.parser_module import parse_article_date
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet output requires pyarrow. Install it with: pip install pyarrow")
+
+
+def case_schema():
+    """Arrow schema of exported court cases"""
+    _require_pyarrow()
+    category = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("court", category),
+        ("court_key", category),
+        ("case_number", pa.string()),
+        ("case_link", pa.string()),
+        ("case_title", pa.string()),
+        ("classification", category),
+        ("filed_date", pa.date32()),
+        ("status", category),
+    ])
+
+
+def article_schema():
+    """Arrow schema of exported news articles"""
+    _require_pyarrow()
+    return pa.schema([
+        ("url", pa.string()),
+        ("title", pa.string()),
+        ("author", pa.dictionary(pa.int32(), pa.string())),
+        ("date", pa.date32()),
+        ("date_text", pa.string()),
+        ("line_count", pa.int32()),
+        ("lines", pa.list_(pa.string())),
+    ])
+
+
+def case_to_row(case: Dict) -> Dict:
+    """Flatten a case dictionary into the columns of case_schema"""
+    case_number = case.get("case_number") or {}
+    link = case_number.get("link") or ""
+    return {
+        "court": case.get("court") or None,
+        "court_key": case.get("court_key"),
+        "case_number": case_number.get("text") or None,
+        "case_link": f"{PORTAL_BASE_URL}{link}" if link.startswith("/") else (link or None),
+        "case_title": case.get("case_title"),
+        "classification": case.get("classification") or None,
+        "filed_date": parse_filed_date(case.get("filed_date", "")),
+        "status": case.get("status") or None,
+    }
+
+
+def article_to_row(article: Dict) -> Dict:
+    """Flatten an article dictionary into the columns of article_schema"""
+    line_content = article.get("line_content") or {}
+    lines = [line_content[key] for key in sorted(line_content, key=lambda key: int(key.split()[-1]))]
+    return {
+        "url": article.get("url") or None,
+        "title": article.get("title"),
+        "author": article.get("author") or None,
+        "date": parse_article_date(article.get("date", "")),
+        "date_text": article.get("date") or None,
+        "line_count": article.get("line_count"),
+        "lines": lines,
+    }
+
+
+def rows_to_table(rows: List[Dict], schema) -> "pa.Table":
+    """Build an Arrow table from flattened rows, dictionary-encoding category columns"""
+    columns = []
+    for field in schema:
+        values = [row[field.name] for row in rows]
+        if pa.types.is_dictionary(field.type):
+            columns.append(pa.array(values, type=field.type.value_type).dictionary_encode())
+        else:
+            columns.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+class ParquetWriter(StreamingWriter):
+    """Writes court cases or articles to a Parquet file in row groups as pages arrive"""
+
+    format = "parquet"
+
+    def __init__(self, path: str, record_type: str = "cases", row_group_size: int = 1000,
+                 compression: str = "zstd", manifest_path: Optional[str] = None):
+        """
+        Open the Parquet file
+
+        Args:
+            path: Parquet file to write
+            record_type: 'cases' or 'articles'
+            row_group_size: Buffered rows are written as a row group once at least
+                this many are waiting (a results page is never split)
+            compression: Parquet compression codec
+            manifest_path: Summary file (default: <path without extension>.manifest.json)
+
+        Raises:
+            ImportError: If pyarrow is not installed
+            ValueError: If record_type is not known
+        """
+        _require_pyarrow()
+        if record_type not in ("cases", "articles"):
+            raise ValueError(f"Unknown record type: {record_type}")
+        super().__init__(path, manifest_path)
+        self.record_type = record_type
+        self.row_group_size = row_group_size
+        self.schema = case_schema() if record_type == "cases" else article_schema()
+        self._to_row = case_to_row if record_type == "cases" else article_to_row
+        self._pending = []
+        self.row_groups = 0
+        self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+        self._write_manifest("running")
+
+    def _flush(self):
+        if not self._pending:
+            return
+        self._writer.write_table(rows_to_table(self._pending, self.schema))
+        self._pending = []
+        self.row_groups += 1
+
+    def _write_records(self, records: List[Dict]):
+        self._pending.extend(self._to_row(record) for record in records)
+        if len(self._pending) >= self.row_group_size:
+            self._flush()
+
+    def _finish(self):
+        self._flush()
+        self._writer.close()
@@ -3,37 +3,70 @@ opal_module.py - Oppositional Positions in Alabama
 Base module for parsing different news sources
 """
 
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Iterator, Optional, Tuple, Any
+from datetime import date, datetime
 import json
+import logging
 from abc import ABC, abstractmethod
 from bs4 import BeautifulSoup
 import requests
+from opal import metrics
+from opal.progress import ProgressTracker
+
+logger = logging.getLogger(__name__)
+
+# Date formats used in the news sites' bylines
+ARTICLE_DATE_FORMATS = ('%B %d, %Y', '%b %d, %Y', '%m/%d/%Y', '%Y-%m-%d')
+
+
+def parse_article_date(text: str) -> Optional[date]:
+    """Publication date of an article byline, or None if it is not a known format"""
+    for date_format in ARTICLE_DATE_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), date_format).date()
+        except (ValueError, AttributeError):
+            continue
+    return None
+
 
 class BaseParser(ABC):
     """Base class defining the interface for all parsers (news, court cases, etc.)"""
 
+    def _request(self, url: str) -> Optional[str]:
+        """Fetch one URL, returning its HTML or None if the request failed"""
+        try:
+            logger.debug("Requesting: %s", url)
+            metrics.add("fetch", "requests")
+            with metrics.timer("fetch"):
+                response = requests.get(url, timeout=5)
+            response.raise_for_status()
+            metrics.add("fetch", "bytes", len(response.content))
+            return response.text
+        except requests.exceptions.RequestException:
+            metrics.add("fetch", "errors")
+            logger.warning("Skipping URL due to error: %s", url, extra={"url": url})
+            return None
+
     def make_request(self, urls: List[str]) -> Tuple[List[str], List[str]]:
         """Shared request functionality for all parsers"""
         responses = []
         successful_urls = []
 
-        for url in urls:
-            try:
-                print(f"Requesting: {url}")
-                response = requests.get(url, timeout=5)
-                response.raise_for_status()
-                responses.append(response.text)
+        with ProgressTracker("Articles", total=len(urls), unit="articles", byte_stages=("fetch",)) as progress:
+            for url in urls:
+                html = self._request(url)
+                progress.update(records=1 if html is not None else 0)
+                if html is None:
+                    # Skip this URL and continue with others
+                    continue
+                responses.append(html)
                 successful_urls.append(url)
-            except requests.exceptions.RequestException:
-                print(f"Skipping URL due to error: {url}")
-                # Skip this URL and continue with others
-                continue
 
         # If all URLs failed, raise an exception
         if not responses:
             raise ValueError("All URLs failed to process")
 
-        print(f"Successfully processed {len(responses)} out of {len(urls)} URLs")
+        logger.info("Successfully processed %d out of %d URLs", len(responses), len(urls))
         return responses, successful_urls
     #This becomes a required element for all subclasses.
     #This is done to ensure that class extensions have required functionality
@@ -42,18 +75,34 @@ class BaseParser(ABC):
         """Each parser must implement this method"""
 
     #This parent function saves all the URLs extracted into a list for later
-    def parse_articles(self, urls: List[str]) -> str:
-        """Parse multiple articles and return JSON string"""
+    def parse_articles_objects(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """Parse multiple articles and return them as dictionaries"""
         responses, successful_urls = self.make_request(urls)
         all_articles = []
 
         # Make sure we have the same number of responses and URLs
         for i, response in enumerate(responses):
             # Pass both the HTML content and the URL to parse_article
-            article = self.parse_article(response, successful_urls[i])
+            with metrics.timer("parse"):
+                article = self.parse_article(response, successful_urls[i])
+            article['url'] = article.get('url') or successful_urls[i]
             all_articles.append(article)
 
-        return json.dumps(all_articles, indent=4, ensure_ascii=False)
+        return all_articles
+
+    def parse_articles(self, urls: List[str]) -> str:
+        """Parse multiple articles and return JSON string"""
+        return json.dumps(self.parse_articles_objects(urls), indent=4, ensure_ascii=False)
+
+    def iter_articles(self, urls: List[str]) -> Iterator[Dict[str, Any]]:
+        """Fetch and parse articles one at a time, yielding each as soon as it is parsed"""
+        for url in urls:
+            html = self._request(url)
+            if html is not None:
+                with metrics.timer("parse"):
+                    article = self.parse_article(html, url)
+                article['url'] = article.get('url') or url
+                yield article
 
 # Specific parser for 1819 News
 class Parser1819(BaseParser):
@@ -0,0 +1,85 @@
+"""
+Resident memory of a process and its children
+
+Used to watch the Chrome processes started by Selenium. psutil is used when it
+is installed; otherwise /proc is read directly, which works on Linux only.
+Elsewhere without psutil the functions report no processes.
+"""
+import os
+from typing import Dict, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def _proc_rss(pid: int) -> Optional[int]:
+    """RSS in bytes of one process from /proc, or None if it cannot be read"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return 0
+
+
+def _proc_children(pid: int) -> Dict[int, list]:
+    """Map of parent pid to child pids for every process in /proc"""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as f:
+                # The command name may contain spaces, so split after its closing paren
+                fields = f.read().rsplit(")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+    return children
+
+
+def process_tree_rss(pid: Optional[int]) -> Dict[int, int]:
+    """
+    RSS of a process and all of its descendants
+
+    Args:
+        pid: Root process ID (for example the chromedriver service process)
+
+    Returns:
+        Dictionary of pid to resident memory in bytes; empty if the process is
+        gone or memory cannot be read on this platform
+    """
+    if not pid:
+        return {}
+
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return {}
+        usage = {}
+        for process in processes:
+            try:
+                usage[process.pid] = process.memory_info().rss
+            except psutil.Error:
+                continue
+        return usage
+
+    if not os.path.isdir("/proc"):
+        return {}
+    usage = {}
+    children = _proc_children(pid)
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        rss = _proc_rss(current)
+        if rss is None:
+            continue
+        usage[current] = rss
+        pending.extend(children.get(current, []))
+    return usage
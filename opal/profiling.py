@@ -0,0 +1,195 @@
+"""
+Profiling hooks for the command line tools (--profile)
+
+The run is wrapped in cProfile and the statistics are written as a .pstats
+file (open it with python -m pstats or snakeviz). Optionally a sampling
+profiler records the stack of every thread at a fixed interval, including the
+court worker threads cProfile does not see, and writes them as collapsed
+stacks for flamegraph.pl or speedscope. Each sampled stack starts with the
+pipeline stage its thread was in (fetch, listing, page_load, parse, wait,
+write, ...), taken from the metrics timers.
+
+add_instrumentation_arguments and start_instrumentation give every command
+line tool the same --report, --prometheus, --profile, --profile-sample-ms and
+--memory-profile options.
+"""
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+from opal import metrics
+from opal.memory_monitor import monitor_memory_until_exit
+
+
+def default_profile_prefix(command: str) -> str:
+    """Output prefix used when --profile is given without one"""
+    return f"{command}_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class StackSampler:
+    """Background thread that counts the stacks of all other threads"""
+
+    def __init__(self, interval_seconds: float = 0.005):
+        """
+        Args:
+            interval_seconds: Time between samples
+        """
+        self.interval_seconds = interval_seconds
+        self.samples = 0
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="opal-stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def sample(self):
+        """Record the current stack of every thread except the sampler"""
+        stages = metrics.get_metrics().active_stages()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self._thread.ident:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(f"stage:{stages.get(thread_id, 'other')}")
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.sample()
+
+    def write_collapsed(self, path: str):
+        """Write 'frame;frame;frame count' lines, the input format of flamegraph.pl"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class ProfileSession:
+    """cProfile, and optionally a stack sampler, around a whole run"""
+
+    def __init__(self, prefix: str, sample_interval_ms: Optional[float] = None):
+        """
+        Args:
+            prefix: Output path without extension (<prefix>.pstats, <prefix>.collapsed)
+            sample_interval_ms: Also sample all thread stacks at this interval (None to skip)
+        """
+        self.prefix = prefix
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler(sample_interval_ms / 1000) if sample_interval_ms else None
+        self.stopped = False
+
+    def start(self):
+        if self.sampler:
+            self.sampler.start()
+        self.profiler.enable()
+
+    def stop(self, top: int = 15):
+        """
+        Stop profiling and write the output files
+
+        Args:
+            top: Number of functions to list by cumulative time (0 for none)
+        """
+        if self.stopped:
+            return
+        self.stopped = True
+        self.profiler.disable()
+        if self.sampler:
+            self.sampler.stop()
+
+        self.profiler.dump_stats(f"{self.prefix}.pstats")
+        print(f"\nProfile saved to {self.prefix}.pstats")
+        if self.sampler:
+            self.sampler.write_collapsed(f"{self.prefix}.collapsed")
+            print(f"Collapsed stacks ({self.sampler.samples} samples) saved to {self.prefix}.collapsed")
+        if top:
+            output = io.StringIO()
+            pstats.Stats(self.profiler, stream=output).sort_stats("cumulative").print_stats(top)
+            print(output.getvalue())
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def profile_until_exit(prefix: str, sample_interval_ms: Optional[float] = None) -> ProfileSession:
+    """
+    Start profiling now and write the results when the process exits, also
+    after an error or Ctrl-C
+
+    Args are as for ProfileSession
+    """
+    session = ProfileSession(prefix, sample_interval_ms)
+    session.start()
+    atexit.register(session.stop)
+    return session
+
+
+def add_instrumentation_arguments(parser, command: str):
+    """
+    Add --report, --prometheus, --profile, --profile-sample-ms and
+    --memory-profile to a command line parser
+
+    Args:
+        parser: Command line parser
+        command: Command name used in the default --profile prefix
+    """
+    parser.add_argument('--report',
+                        help='Write a JSON run report with per-stage timings and counters to this file')
+    parser.add_argument('--prometheus',
+                        help='Write the run metrics as a Prometheus textfile to this file')
+    parser.add_argument('--profile', nargs='?', const='', metavar='PREFIX',
+                        help='Profile the run with cProfile into PREFIX.pstats '
+                             f'(default prefix: {command}_profile_<timestamp>)')
+    parser.add_argument('--profile-sample-ms', type=float,
+                        help='With --profile, also sample every thread\'s stack at this interval '
+                             'and write stage-tagged collapsed stacks to PREFIX.collapsed')
+    parser.add_argument('--memory-profile', action='store_true',
+                        help='Trace Python allocations and sample process and browser memory; '
+                             'the results go into the --report run report and a summary is printed at exit')
+
+
+def start_instrumentation(parser, args, command: str):
+    """
+    Check the options added by add_instrumentation_arguments and start what
+    they ask for; the outputs are written when the process exits
+
+    Args:
+        parser: Command line parser, used to report invalid options
+        args: Parsed arguments
+        command: Command name recorded in the run report and used in the
+            default --profile prefix
+    """
+    if args.profile_sample_ms is not None and args.profile_sample_ms <= 0:
+        parser.error("--profile-sample-ms must be greater than 0")
+    metrics.write_run_outputs_at_exit(args.report, args.prometheus, command=command, arguments=vars(args))
+    if args.profile is not None:
+        profile_until_exit(args.profile or default_profile_prefix(command), args.profile_sample_ms)
+    # Registered after the report writer so the monitor stops before the report is written
+    if args.memory_profile:
+        monitor_memory_until_exit()
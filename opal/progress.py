@@ -0,0 +1,215 @@
+"""
+Progress, throughput and ETA reporting for long extractions
+
+A ProgressTracker counts finished pages or articles against a total (the
+portal's page count or the size of the article list) and works out items per
+second, bytes per second from the metrics byte counters, how many items are
+left and when the run should finish. On a terminal all active trackers share
+one status line on stderr that is redrawn in place; otherwise, or with
+--progress log, a record is logged through the 'opal' logger every few
+seconds, with the figures as extra fields for JSON logs.
+"""
+import logging
+import sys
+import threading
+import time
+from typing import Dict, Optional, Sequence
+from opal import metrics
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_MODES = ["auto", "tty", "log", "off"]
+
+_mode = "auto"
+_stream = None
+_active = []
+_line_lock = threading.Lock()
+_line_width = 0
+
+
+def configure_progress(mode: str = "auto", stream=None):
+    """
+    Choose how progress is shown
+
+    Args:
+        mode: 'tty' for a status line, 'log' for periodic log records, 'off'
+            for neither, or 'auto' for a status line when stream is a terminal
+        stream: Stream for the status line (default: sys.stderr)
+    """
+    global _mode, _stream
+    if mode not in PROGRESS_MODES:
+        raise ValueError(f"Unknown progress mode: {mode}")
+    _mode = mode
+    _stream = stream
+
+
+def add_progress_argument(parser):
+    """Add --progress to a command line parser"""
+    parser.add_argument('--progress', choices=PROGRESS_MODES, default='auto',
+                        help='Show progress as a status line (tty), as periodic log records (log) '
+                             'or not at all (off); auto picks tty on a terminal (default: auto)')
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Short duration such as 45s, 3m08s or 2h05m ('?' when unknown)"""
+    if seconds is None:
+        return "?"
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+
+
+def format_bytes(count: float) -> str:
+    """Byte count with a binary unit, such as 512 B or 1.4 MB"""
+    for unit in ("B", "KB", "MB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+
+def _resolved_mode() -> str:
+    if _mode != "auto":
+        return _mode
+    if not logger.isEnabledFor(logging.INFO):
+        return "off"
+    stream = _stream if _stream is not None else sys.stderr
+    return "tty" if getattr(stream, "isatty", lambda: False)() else "log"
+
+
+def _draw_line(final_text: Optional[str] = None):
+    """
+    Redraw the shared status line from all active trackers, or end it with
+    the final figures of one tracker
+    """
+    global _line_width
+    stream = _stream if _stream is not None else sys.stderr
+    with _line_lock:
+        text = final_text if final_text is not None else "  |  ".join(tracker.status_line() for tracker in _active)
+        stream.write("\r" + text.ljust(_line_width))
+        _line_width = len(text)
+        if final_text is not None:
+            stream.write("\n")
+            _line_width = 0
+        stream.flush()
+
+
+class ProgressTracker:
+    """Counts finished items of one extraction and reports rate and ETA"""
+
+    def __init__(self, label: str, total: Optional[int] = None, unit: str = "pages", done: int = 0,
+                 byte_stages: Sequence[str] = ("fetch", "page_load"), interval_seconds: Optional[float] = None):
+        """
+        Args:
+            label: Name shown in front of the figures, for example the court
+            total: Number of items expected, if known (see set_total)
+            unit: What an item is, for example 'pages' or 'articles'
+            done: Items already finished before this run, for example when resuming
+            byte_stages: Metrics stages whose 'bytes' counters measure the download rate
+            interval_seconds: Minimum time between two updates (default: 0.5 on a
+                terminal, 5 for log records)
+        """
+        self.label = label
+        self.total = total
+        self.unit = unit
+        self.done = done
+        self.records = 0
+        self.mode = _resolved_mode()
+        self.interval_seconds = interval_seconds if interval_seconds is not None else (
+            0.5 if self.mode == "tty" else 5.0)
+        self._byte_stages = tuple(byte_stages)
+        self._start_done = done
+        self._start_bytes = self._bytes()
+        self._start = time.monotonic()
+        self._last = None
+        self._finished = False
+        self._lock = threading.Lock()
+        if self.mode == "tty":
+            with _line_lock:
+                _active.append(self)
+
+    def _bytes(self) -> float:
+        run_metrics = metrics.get_metrics()
+        return sum(run_metrics.counter(stage, "bytes") for stage in self._byte_stages)
+
+    def set_total(self, total: Optional[int]):
+        """Set or correct the expected number of items once it is known"""
+        if total:
+            self.total = total
+
+    def update(self, items: int = 1, records: int = 0, force: bool = False):
+        """
+        Count finished items and report if the interval has passed
+
+        Args:
+            items: Pages or articles finished
+            records: Cases or articles they produced
+            force: Report even within the interval
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.done += items
+            self.records += records
+            if not force and self._last is not None and now - self._last < self.interval_seconds:
+                return
+            self._last = now
+        self._emit()
+
+    def snapshot(self) -> Dict:
+        """
+        Current figures
+
+        Returns:
+            Dictionary with done, total, remaining, records, elapsed_seconds,
+            items_per_second, bytes_per_second and eta_seconds (None when unknown)
+        """
+        elapsed = time.monotonic() - self._start
+        finished_now = self.done - self._start_done
+        rate = finished_now / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - self.done, 0) if self.total is not None else None
+        eta = remaining / rate if remaining is not None and rate > 0 else None
+        return {
+            "done": self.done,
+            "total": self.total,
+            "remaining": remaining,
+            "records": self.records,
+            "elapsed_seconds": round(elapsed, 3),
+            "items_per_second": round(rate, 3),
+            "bytes_per_second": round((self._bytes() - self._start_bytes) / elapsed, 1) if elapsed > 0 else 0.0,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+        }
+
+    def status_line(self) -> str:
+        """Compact one-line summary, such as 'civil 12/40 pages 30% 0.4 pages/s 1.2 MB/s ETA 1m08s'"""
+        figures = self.snapshot()
+        done = f"{figures['done']}/{figures['total']}" if figures["total"] else str(figures["done"])
+        percent = f" {100 * figures['done'] // figures['total']}%" if figures["total"] else ""
+        return (f"{self.label} {done} {self.unit}{percent} {figures['items_per_second']:.2f} {self.unit}/s "
+                f"{format_bytes(figures['bytes_per_second'])}/s {figures['records']} records "
+                f"ETA {format_duration(figures['eta_seconds'])}")
+
+    def _emit(self, final: bool = False):
+        if self.mode == "tty":
+            _draw_line(self.status_line() if final else None)
+        elif self.mode == "log":
+            logger.info("%s", self.status_line(), extra=dict(self.snapshot(), label=self.label, unit=self.unit))
+
+    def finish(self):
+        """Report the final figures and stop tracking; safe to call more than once"""
+        if self._finished:
+            return
+        self._finished = True
+        self._emit(final=True)
+        if self.mode == "tty":
+            with _line_lock:
+                _active.remove(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish()
+        return False
@@ -0,0 +1,39 @@
+"""
+Thread-safe rate limiter shared by concurrent court portal workers
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """Spaces out requests so that no more than one starts every min_interval seconds"""
+
+    def __init__(self, requests_per_second: float = 0.5):
+        """
+        Initialize the rate limiter
+
+        Args:
+            requests_per_second: Maximum request rate across all threads sharing this limiter
+        """
+        if requests_per_second <= 0:
+            raise ValueError(f"Invalid request rate: {requests_per_second}. Must be greater than 0")
+        self.min_interval = 1.0 / requests_per_second
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> float:
+        """
+        Block until the caller may start its next request
+
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
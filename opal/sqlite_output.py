@@ -0,0 +1,228 @@
+"""
+SQLite storage for court cases and news articles
+
+One database accumulates every run: cases are upserted by case number and
+articles by canonical URL, so the latest state of each record is kept in a
+single row, and every run is recorded in the runs table. Queries over all
+history no longer need to scan dated JSON files.
+"""
+import json
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from opal.court_case_parser import PORTAL_BASE_URL, parse_filed_date
+from opal.output_writers import StreamingWriter
+from opal.parser_module import parse_article_date
+
+
+DEFAULT_DATABASE_PATH = "opal.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    record_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started TEXT NOT NULL,
+    finished TEXT,
+    records INTEGER NOT NULL DEFAULT 0,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS cases (
+    case_number TEXT PRIMARY KEY,
+    court TEXT,
+    court_key TEXT,
+    case_link TEXT,
+    case_title TEXT,
+    classification TEXT,
+    filed_date TEXT,
+    status TEXT,
+    data TEXT NOT NULL,
+    first_run_id INTEGER REFERENCES runs(id),
+    last_run_id INTEGER REFERENCES runs(id),
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cases_filed_date ON cases(filed_date);
+CREATE INDEX IF NOT EXISTS idx_cases_court ON cases(court);
+CREATE INDEX IF NOT EXISTS idx_cases_status ON cases(status);
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    author TEXT,
+    published_date TEXT,
+    date_text TEXT,
+    line_count INTEGER,
+    data TEXT NOT NULL,
+    first_run_id INTEGER REFERENCES runs(id),
+    last_run_id INTEGER REFERENCES runs(id),
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_published_date ON articles(published_date);
+"""
+
+UPSERT_CASE = """
+INSERT INTO cases (case_number, court, court_key, case_link, case_title, classification,
+                   filed_date, status, data, first_run_id, last_run_id, updated_at)
+VALUES (:case_number, :court, :court_key, :case_link, :case_title, :classification,
+        :filed_date, :status, :data, :run_id, :run_id, :updated_at)
+ON CONFLICT(case_number) DO UPDATE SET
+    court = excluded.court,
+    court_key = COALESCE(excluded.court_key, cases.court_key),
+    case_link = excluded.case_link,
+    case_title = excluded.case_title,
+    classification = excluded.classification,
+    filed_date = excluded.filed_date,
+    status = excluded.status,
+    data = excluded.data,
+    last_run_id = excluded.last_run_id,
+    updated_at = excluded.updated_at
+"""
+
+UPSERT_ARTICLE = """
+INSERT INTO articles (url, title, author, published_date, date_text, line_count, data,
+                      first_run_id, last_run_id, updated_at)
+VALUES (:url, :title, :author, :published_date, :date_text, :line_count, :data,
+        :run_id, :run_id, :updated_at)
+ON CONFLICT(url) DO UPDATE SET
+    title = excluded.title,
+    author = excluded.author,
+    published_date = excluded.published_date,
+    date_text = excluded.date_text,
+    line_count = excluded.line_count,
+    data = excluded.data,
+    last_run_id = excluded.last_run_id,
+    updated_at = excluded.updated_at
+"""
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize an article URL so the same article always gets the same key
+
+    The scheme and host are lowercased, the fragment, tracking parameters
+    (utm_*, fbclid, gclid) and a trailing slash are dropped.
+    """
+    parts = urlsplit(url.strip())
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not key.lower().startswith("utm_") and key.lower() not in ("fbclid", "gclid")]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+class SQLiteWriter(StreamingWriter):
+    """Upserts court cases or articles into a SQLite database and records the run"""
+
+    format = "sqlite"
+
+    def __init__(self, path: str = DEFAULT_DATABASE_PATH, record_type: str = "cases",
+                 resume: Optional[Dict] = None):
+        """
+        Open (and if needed create) the database and start a run
+
+        Args:
+            path: SQLite database file
+            record_type: 'cases' or 'articles'
+            resume: Position from a checkpoint; its run is continued instead of
+                starting a new one (upserts make replayed records harmless)
+
+        Raises:
+            ValueError: If record_type is not known
+        """
+        if record_type not in ("cases", "articles"):
+            raise ValueError(f"Unknown record type: {record_type}")
+        super().__init__(path, manifest_path=path)
+        self.record_type = record_type
+        self.skipped = 0
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        if resume:
+            self._resume(resume)
+            self.run_id = resume["run_id"]
+            self.skipped = resume.get("skipped", 0)
+            self._write_manifest("running")
+            return
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (record_type, status, started) VALUES (?, 'running', ?)",
+                (record_type, self.started))
+        self.run_id = cursor.lastrowid
+
+    def _write_manifest(self, status: str, summary: Optional[Dict] = None):
+        """Runs are tracked in the runs table instead of a manifest file"""
+        summary = dict(summary or {})
+        if self.skipped:
+            summary["skipped_without_key"] = self.skipped
+        with self.connection:
+            self.connection.execute(
+                "UPDATE runs SET status = ?, finished = ?, records = ?, summary = ? WHERE id = ?",
+                (status, datetime.now().isoformat(timespec="seconds"), self.records_written,
+                 json.dumps(summary, ensure_ascii=False) if summary else None, self.run_id))
+
+    def _case_row(self, case: Dict, updated_at: str) -> Optional[Dict]:
+        case_number = case.get("case_number") or {}
+        if not case_number.get("text"):
+            return None
+        link = case_number.get("link") or ""
+        return {
+            "case_number": case_number["text"],
+            "court": case.get("court"),
+            "court_key": case.get("court_key"),
+            "case_link": f"{PORTAL_BASE_URL}{link}" if link.startswith("/") else (link or None),
+            "case_title": case.get("case_title"),
+            "classification": case.get("classification"),
+            "filed_date": _iso(parse_filed_date(case.get("filed_date", ""))),
+            "status": case.get("status"),
+            "data": json.dumps(case, ensure_ascii=False),
+            "run_id": self.run_id,
+            "updated_at": updated_at,
+        }
+
+    def _article_row(self, article: Dict, updated_at: str) -> Optional[Dict]:
+        if not article.get("url"):
+            return None
+        return {
+            "url": canonical_url(article["url"]),
+            "title": article.get("title"),
+            "author": article.get("author"),
+            "published_date": _iso(parse_article_date(article.get("date", ""))),
+            "date_text": article.get("date"),
+            "line_count": article.get("line_count"),
+            "data": json.dumps(article, ensure_ascii=False),
+            "run_id": self.run_id,
+            "updated_at": updated_at,
+        }
+
+    def _write_records(self, records: List[Dict]):
+        updated_at = datetime.now().isoformat(timespec="seconds")
+        to_row = self._case_row if self.record_type == "cases" else self._article_row
+        rows = [row for row in (to_row(record, updated_at) for record in records) if row]
+        self.skipped += len(records) - len(rows)
+        # One transaction per batch (a results page or a group of articles)
+        with self.connection:
+            self.connection.executemany(
+                UPSERT_CASE if self.record_type == "cases" else UPSERT_ARTICLE, rows)
+
+    def _finish(self):
+        """The connection stays open until the run row has been updated"""
+
+    def position(self) -> Dict:
+        return {**super().position(), "run_id": self.run_id, "skipped": self.skipped}
+
+    def close(self, summary: Optional[Dict] = None, status: str = "complete"):
+        """
+        Record the run summary and close the database
+
+        Args:
+            summary: Run summary to store in the runs table
+            status: 'complete', or 'failed' when the run stopped early
+        """
+        if self.closed:
+            return
+        super().close(summary, status)
+        self.connection.close()
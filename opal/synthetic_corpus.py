@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Synthetic news articles, listing pages and court result tables
+
+The generated HTML uses the markup the parsers read on the real sites
+(1819 News, Alabama Daily News and the Appeals Court public portal), so
+inputs much larger than the recorded fixtures can be produced for scaling
+tests without touching those sites. Every document is derived from a seed
+and its index alone, so any document of a corpus can be regenerated on its
+own and corpora of a million documents never have to be held in memory.
+
+    python -m opal.synthetic_corpus --kind 1819 --count 10000 --output corpus/
+"""
+import argparse
+import os
+import random
+from datetime import date, timedelta
+from html import escape
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+DOCUMENT_KINDS = ("1819", "daily", "listing", "court")
+
+BASE_URLS = {
+    "1819": "https://1819news.com",
+    "daily": "https://www.aldailynews.com",
+}
+
+# URL part that marks article links on each news site
+ARTICLE_SUFFIXES = {"1819": "/news/item/", "daily": "/news/"}
+
+COURTS = (
+    ("Alabama Civil Court of Appeals", "CL"),
+    ("Alabama Court of Criminal Appeals", "CR"),
+    ("Alabama Supreme Court", "SC"),
+)
+
+CLASSIFICATIONS = ("Appeal", "Petition for Writ of Mandamus", "Certiorari",
+                   "Petition for Writ of Certiorari", "Appeal - Juvenile", "Original Proceeding")
+
+STATUSES = ("Active", "Closed", "Active - Briefing", "Submitted", "Decided")
+
+SURNAMES = ("Smith", "Jones", "Johnson", "Williams", "Brown", "Davis", "Miller", "Wilson", "Moore",
+            "Taylor", "Anderson", "Thomas", "Jackson", "White", "Harris", "Martin", "Thompson",
+            "Garcia", "Robinson", "Lewis", "Walker", "Hall", "Young", "King")
+
+FIRST_NAMES = ("Jane", "John", "Mary", "James", "Patricia", "Robert", "Linda", "Michael", "Sarah",
+               "David", "Karen", "William")
+
+SUBJECTS = ("The Legislature", "The governor", "A House committee", "The Senate", "Lawmakers",
+            "The state school board", "County commissioners", "The attorney general",
+            "City council members", "Supporters of the bill", "Opponents")
+
+ACTIONS = ("approved", "debated", "rejected", "delayed a vote on", "advanced", "questioned",
+           "amended", "held a hearing on", "called for changes to", "praised")
+
+OBJECTS = ("a broadband expansion bill", "the education budget", "a proposed lottery",
+           "new prison construction", "a grocery tax cut", "rural hospital funding",
+           "changes to absentee voting", "a teacher pay raise", "the general fund budget",
+           "an economic development package", "a Medicaid waiver", "road and bridge projects")
+
+CLAUSES = ("on Tuesday", "after a lengthy debate", "despite objections from both parties",
+           "in a 31-2 vote", "ahead of the session's final week", "in Montgomery",
+           "for the second year in a row", "without discussion", "after public comment")
+
+# Publication dates are spread over the years before this day
+START_DATE = date(2025, 6, 11)
+
+
+def _rng(seed: int, kind: str, index: int) -> random.Random:
+    """Random generator for one document, independent of every other document"""
+    return random.Random(f"{seed}:{kind}:{index}")
+
+
+def _sentence(rng: random.Random) -> str:
+    return f"{rng.choice(SUBJECTS)} {rng.choice(ACTIONS)} {rng.choice(OBJECTS)} {rng.choice(CLAUSES)}."
+
+
+def _paragraph(rng: random.Random) -> str:
+    return " ".join(_sentence(rng) for _ in range(rng.randint(1, 4)))
+
+
+def _headline(rng: random.Random) -> str:
+    return f"{rng.choice(SUBJECTS)} {rng.choice(ACTIONS)} {rng.choice(OBJECTS)}"
+
+
+def _slug(headline: str, index: int) -> str:
+    words = "".join(char if char.isalnum() else " " for char in headline.lower()).split()
+    return "-".join(words[:8] + [str(index)])
+
+
+def article_url(kind: str, index: int, seed: int = 0, base_url: Optional[str] = None) -> str:
+    """
+    URL of a synthetic article
+
+    Args:
+        kind: '1819' or 'daily'
+        index: Article number in the corpus
+        seed: Corpus seed
+        base_url: Site URL (default: the real site's), for example a mock server's
+    """
+    slug = _slug(_headline(_rng(seed, kind, index)), index)
+    return f"{base_url or BASE_URLS[kind]}{ARTICLE_SUFFIXES[kind]}{slug}"
+
+
+def article_index(url: str) -> Optional[int]:
+    """Corpus index of a synthetic article URL, or None if the URL is not one"""
+    last = url.rstrip("/").rsplit("-", 1)[-1]
+    return int(last) if last.isdigit() else None
+
+
+def article_html(kind: str, index: int, seed: int = 0, paragraphs: Optional[int] = None,
+                 base_url: Optional[str] = None) -> str:
+    """
+    Synthetic article page in the markup of the given site
+
+    Args:
+        kind: '1819' (read by Parser1819) or 'daily' (read by ParserDailyNews)
+        index: Article number in the corpus
+        seed: Corpus seed
+        paragraphs: Paragraphs in the article body (default: 4 to 20)
+        base_url: Site URL used in links (default: the real site's)
+
+    Returns:
+        HTML of the article page
+    """
+    if kind not in BASE_URLS:
+        raise ValueError(f"Unknown article kind: {kind}")
+    rng = _rng(seed, kind, index)
+    headline = _headline(rng)
+    author = f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}"
+    published = (START_DATE - timedelta(days=rng.randrange(2000))).strftime("%B %d, %Y")
+    body = "\n".join(f"        <p>{escape(_paragraph(rng))}</p>"
+                     for _ in range(paragraphs if paragraphs is not None else rng.randint(4, 20)))
+    base_url = base_url or BASE_URLS[kind]
+    author_slug = author.lower().replace(" ", "-")
+
+    if kind == "1819":
+        return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>{escape(headline)}</title>
+</head>
+<body>
+  <header class="site-header">
+    <nav><a href="/">Home</a> <a href="/news/">News</a> <a href="/news/politics">Politics</a></nav>
+  </header>
+  <main>
+    <article class="article">
+      <h1 class="article-title">{escape(headline)}</h1>
+      <div class="author-date"><a href="/authors/{author_slug}">{author}</a> | {published}</div>
+      <div class="article-body">
+{body}
+      </div>
+    </article>
+  </main>
+  <footer><p>&copy; 2025 1819 News. All rights reserved.</p></footer>
+</body>
+</html>
+"""
+    return f"""<!DOCTYPE html>
+<html lang="en-US">
+<head>
+  <meta charset="UTF-8">
+  <title>{escape(headline)} - Alabama Daily News</title>
+</head>
+<body class="post-template-default single single-post">
+  <main id="main" class="site-main">
+    <article class="post type-post status-publish">
+      <header class="entry-header">
+        <h1 class="entry-title">{escape(headline)}</h1>
+        <div class="entry-meta">
+          <span class="author vcard">By <a class="url fn n" href="{base_url}/author/{author_slug}/">{author}</a></span>
+          <span class="post-date"><a href="{article_url(kind, index, seed, base_url)}" rel="bookmark">{published}</a></span>
+        </div>
+      </header>
+      <div class="entry-content">
+{body}
+      </div>
+    </article>
+  </main>
+  <footer id="colophon" class="site-footer"><p>Copyright 2025 Alabama Daily News</p></footer>
+</body>
+</html>
+"""
+
+
+def listing_html(kind: str, page: int, links_per_page: int = 20, total_pages: Optional[int] = None,
+                 seed: int = 0, base_url: Optional[str] = None, links: Optional[int] = None) -> str:
+    """
+    Synthetic listing page with article links, as read by get_all_news_urls
+
+    Page 1 links articles 0 to links_per_page - 1, page 2 the next ones, and so
+    on. Each article is linked twice (image and headline) and the page has
+    navigation, author and external links that are not articles.
+
+    Args:
+        kind: News site, '1819' or 'daily'
+        page: Page number, starting at 1
+        links_per_page: Articles linked from each full page
+        total_pages: Last page, which gets no 'Next' link (None for endless)
+        seed: Corpus seed
+        base_url: Site URL used in links (default: the real site's)
+        links: Articles linked from this page when fewer than links_per_page,
+            as on the last page
+
+    Returns:
+        HTML of the listing page
+    """
+    if kind not in BASE_URLS:
+        raise ValueError(f"Unknown article kind: {kind}")
+    base_url = base_url or BASE_URLS[kind]
+    first = (page - 1) * links_per_page
+    cards = []
+    for index in range(first, first + (links_per_page if links is None else links)):
+        url = article_url(kind, index, seed, base_url)
+        headline = escape(_headline(_rng(seed, kind, index)))
+        cards.append(f'      <article class="story-card"><a href="{url}"><img src="/img/{index}.jpg" alt=""></a>'
+                     f'<h3><a href="{url}">{headline}</a></h3><a href="/authors/staff">Staff</a></article>')
+    next_link = "" if total_pages is not None and page >= total_pages else \
+        f'<a href="{base_url}/page/{page + 1}">Next</a>'
+    cards_html = "\n".join(cards)
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>News - page {page}</title>
+</head>
+<body>
+  <header class="site-header">
+    <nav><a href="/">Home</a> <a href="/news/">News</a> <a href="/about">About</a> <a href="#main">Skip to content</a></nav>
+  </header>
+  <main id="main">
+    <section class="story-list">
+{cards_html}
+    </section>
+    <nav class="pagination">{next_link}</nav>
+  </main>
+  <footer>
+    <a href="https://www.facebook.com/alnews">Facebook</a> <a href="mailto:tips@example.com">Send a tip</a> <a>Back to top</a>
+  </footer>
+</body>
+</html>
+"""
+
+
+def court_case(index: int, seed: int = 0) -> Dict:
+    """
+    Synthetic court case as ParserAppealsAL returns it
+
+    Args:
+        index: Case number in the corpus
+        seed: Corpus seed
+    """
+    rng = _rng(seed, "court", index)
+    court, prefix = COURTS[index % len(COURTS)]
+    first, second = rng.sample(SURNAMES, 2)
+    if rng.random() < 0.25:
+        title = f"Ex parte {first} (In re: State of Alabama v. {second})"
+    else:
+        title = f"{first} v. {second}"
+    filed = START_DATE - timedelta(days=index // 40)
+    return {
+        "court": court,
+        "case_number": {
+            "text": f"{prefix}-{filed.year}-{index % 10000:04d}",
+            "link": f"/portal/court/68f021c4-6a44-4735-9a76-5360b2e8af13/case/{10000000 + index}",
+        },
+        "case_title": title,
+        "classification": rng.choice(CLASSIFICATIONS),
+        "filed_date": filed.strftime("%m/%d/%Y"),
+        "status": rng.choice(STATUSES),
+    }
+
+
+def court_results_html(start: int, rows: int, total_elements: Optional[int] = None, seed: int = 0) -> str:
+    """
+    Synthetic results page in the portal's table markup
+
+    Args:
+        start: Index of the first case on the page
+        rows: Cases on the page
+        total_elements: Total shown in the paginator (default: start + rows)
+        seed: Corpus seed
+
+    Returns:
+        HTML of the rendered results page
+    """
+    lines = []
+    for index in range(start, start + rows):
+        case = court_case(index, seed)
+        lines.append(f"""        <tr class="mat-row">
+          <td class="mat-cell cdk-column-court">{case['court']}</td>
+          <td class="mat-cell cdk-column-caseNumber"><a href="{case['case_number']['link']}" class="case-link">{case['case_number']['text']}</a></td>
+          <td class="mat-cell cdk-column-caseTitle">{escape(case['case_title'])}</td>
+          <td class="mat-cell cdk-column-classification">{case['classification']}</td>
+          <td class="mat-cell cdk-column-filedDate">{case['filed_date']}</td>
+          <td class="mat-cell cdk-column-status">{case['status']}</td>
+        </tr>""")
+    total = total_elements if total_elements is not None else start + rows
+    rows_html = "\n".join(lines)
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>Public Portal - Case Search Results</title>
+</head>
+<body>
+  <app-root>
+    <div class="search-results">
+      <table mat-table class="mat-table results-table" role="table">
+        <tr class="mat-header-row">
+          <th class="mat-header-cell">Court</th>
+          <th class="mat-header-cell">Case Number</th>
+          <th class="mat-header-cell">Case Title</th>
+          <th class="mat-header-cell">Classification</th>
+          <th class="mat-header-cell">Filed Date</th>
+          <th class="mat-header-cell">Status</th>
+        </tr>
+{rows_html}
+      </table>
+      <mat-paginator class="mat-paginator">
+        <div class="mat-paginator-range-label">{start + 1 if rows else 0} &ndash; {start + rows} of {total}</div>
+      </mat-paginator>
+    </div>
+  </app-root>
+</body>
+</html>
+"""
+
+
+def iter_documents(kind: str, count: int, seed: int = 0, page_size: int = 500,
+                   links_per_page: int = 20) -> Iterator[Tuple[str, str, int]]:
+    """
+    Generate a corpus one document at a time
+
+    Args:
+        kind: '1819' or 'daily' articles, 'listing' pages of 1819 News, or
+            'court' result pages
+        count: Articles, listing links or court cases in the corpus
+        seed: Corpus seed
+        page_size: Cases per court results page
+        links_per_page: Article links per listing page
+
+    Yields:
+        Tuples of (name, HTML, items in the document), where items is 1 for
+        articles, the links of a listing page or the rows of a results page
+    """
+    if kind in BASE_URLS:
+        for index in range(count):
+            yield f"{kind}_article_{index:07d}.html", article_html(kind, index, seed), 1
+    elif kind == "listing":
+        total_pages = max(1, -(-count // links_per_page))
+        for page in range(1, total_pages + 1):
+            links = min(links_per_page, count - (page - 1) * links_per_page)
+            yield (f"listing_page_{page:05d}.html",
+                   listing_html("1819", page, links_per_page, total_pages, seed, links=links), links)
+    elif kind == "court":
+        for page, start in enumerate(range(0, count, page_size)):
+            rows = min(page_size, count - start)
+            yield f"court_results_{page:05d}.html", court_results_html(start, rows, count, seed), rows
+    else:
+        raise ValueError(f"Unknown document kind: {kind}")
+
+
+def write_corpus(kind: str, count: int, output_dir: str, seed: int = 0, **options) -> List[str]:
+    """
+    Write a generated corpus as HTML files
+
+    Args:
+        kind, count, seed, options: As for iter_documents
+        output_dir: Directory for the files (created if needed)
+
+    Returns:
+        Paths of the written files
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for name, html, _ in iter_documents(kind, count, seed, **options):
+        path = os.path.join(output_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic news and court pages for scaling tests')
+    parser.add_argument('--kind', choices=DOCUMENT_KINDS, required=True,
+                        help='1819 or daily articles, listing pages, or court result pages')
+    parser.add_argument('--count', type=int, required=True,
+                        help='Articles, listing links or court cases to generate')
+    parser.add_argument('--output', required=True, help='Directory for the HTML files')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus seed (default: 0)')
+    parser.add_argument('--page-size', type=int, default=500,
+                        help='Cases per court results page (default: 500)')
+    parser.add_argument('--links-per-page', type=int, default=20,
+                        help='Article links per listing page (default: 20)')
+    args = parser.parse_args()
+
+    if args.count < 1:
+        parser.error("--count must be at least 1")
+    if args.page_size < 1 or args.links_per_page < 1:
+        parser.error("--page-size and --links-per-page must be at least 1")
+
+    paths = write_corpus(args.kind, args.count, args.output, args.seed,
+                         page_size=args.page_size, links_per_page=args.links_per_page)
+    print(f"Wrote {len(paths)} files to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,41 @@
 """
 Module to create an array of urls using a base URL and additional suffix
 """
+import logging
 import time
 from urllib.parse import urljoin
 import requests
 from bs4 import BeautifulSoup
+from opal import metrics
+from opal.log_config import ThrottledLog
+
+logger = logging.getLogger(__name__)
+
+
+def filter_news_links(html: str, page_url: str, base_url: str, suffix: str, seen: set) -> list:
+    """Article links on one listing page that were not seen before.
+
+    Args:
+        html (string): HTML of the listing page
+        page_url (string): URL of the listing page, to resolve relative links
+        base_url (string): Links must start with this URL
+        suffix (string): Links must contain this text (None to accept any)
+        seen (set): URLs found so far; new URLs are added to it
+
+    Returns:
+        list: New URLs in page order
+    """
+    new_urls = []
+    for link in BeautifulSoup(html, 'html.parser').find_all('a'):
+        href = link.get('href')
+        if href:
+            full_url = urljoin(page_url, href)
+            if ((suffix is None) or (suffix in full_url)) \
+                    and full_url.startswith(base_url) and full_url not in seen:
+                seen.add(full_url)
+                new_urls.append(str(full_url))
+    return new_urls
+
 
 def get_all_news_urls(base_url: str, suffix: str, max_pages: int = None):
     """Gets urls from a website.
@@ -19,6 +50,8 @@ def get_all_news_urls(base_url: str, suffix: str, max_pages: int = None):
     """
     #initialize an empty list to save the urls
     news_urls = []
+    seen_urls = set()
+    progress = ThrottledLog(logger)
     #begin the page search at "1"
     page = 1
 
@@ -38,51 +71,47 @@ def get_all_news_urls(base_url: str, suffix: str, max_pages: int = None):
 
             # Check max_pages before making request
             if max_pages is not None and pages_processed > max_pages:
-                print(f"Reached maximum pages limit: {max_pages}")
+                logger.info("Reached maximum pages limit: %d", max_pages)
                 break
 
             # Construct current URL using standard pagination practices
             current_url = base_url if page == 1 else f"{base_url}/page/{page}"
 
             # Make request
-            response = requests.get(current_url, headers=headers, timeout=5)
+            metrics.add("listing", "requests")
+            with metrics.timer("listing"):
+                response = requests.get(current_url, headers=headers, timeout=5)
+            metrics.add("listing", "bytes", len(response.content))
             if response.status_code != 200:
-                print(f"Reached end at page {page-1}")
+                logger.info("Reached end at page %d", page - 1)
                 break
 
             # Parse page to find additional links on the primary page
-            soup = BeautifulSoup(response.text, 'html.parser')
-            links = soup.find_all('a')
-            found_on_page = 0
-
-            # Process links based on those links extracted from each page
-            for link in links:
-                href = link.get('href')
-                if href:
-                    full_url = urljoin(current_url, href)
-                    if ((suffix is None) or (suffix in full_url)) \
-                            and full_url.startswith(base_url) and full_url not in news_urls:
-                        news_urls.append(str(full_url))
-                        found_on_page += 1
-
-            print(f"Page {page}: Found {found_on_page} new URLs")
+            new_urls = filter_news_links(response.text, current_url, base_url, suffix, seen_urls)
+            news_urls.extend(new_urls)
+            found_on_page = len(new_urls)
+
+            progress("Page %d: Found %d new URLs (%d in total)", page, found_on_page, len(news_urls),
+                     page=page, found=found_on_page, total_urls=len(news_urls))
 
             # Check exit conditions
             #if max_pages is met, break
             if max_pages is not None and page >= max_pages:
-                print(f"Reached maximum pages limit: {max_pages}")
+                logger.info("Reached maximum pages limit: %d", max_pages)
                 break
             #if no pages found, break
             if found_on_page == 0:
-                print("No new URLs found on this page")
+                logger.info("No new URLs found on page %d", page)
                 break
 
             page += 1
             # this tells the program not to run the request more than once a second
-            time.sleep(1)
+            with metrics.timer("wait"):
+                time.sleep(1)
         #this is a standard exception raiser in the event that the request fails.
         except requests.RequestException as e:
-            print(f"Error making request: {e}")
+            metrics.add("listing", "errors")
+            logger.error("Error making request: %s", e, extra={"url": current_url})
             break
     #At the end of all the loops, it returns a list of all the urls
     return news_urls
@@ -11,6 +11,10 @@ setup(
         "webdriver-manager>=4.0.0",
         "pytest"
     ],
+    extras_require={
+        "parquet": ["pyarrow"],
+        "zstd": ["zstandard"],
+    },
     entry_points={
         'console_scripts': [
             'opal=opal.main:main',
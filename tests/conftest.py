@@ -15,4 +15,29 @@ def sample_1819_html():
 def sample_daily_html():
     """Load sample Daily News HTML"""
     with open(os.path.join(FIXTURES_DIR, 'sample_daily_article.html'), 'r', encoding='utf-8') as f:
-        return f.read()
\ No newline at end of file
+        return f.read()
+@pytest.fixture
+def court_browser_parser():
+    """Court parser with a running Chrome; skips the test when Chrome cannot start"""
+    from opal.court_case_parser import ParserAppealsAL
+    parser = ParserAppealsAL(headless=True, rate_limit_seconds=0)
+    try:
+        parser._setup_driver()
+    except Exception as e:
+        pytest.skip(f"Chrome is not available: {e}")
+    yield parser
+    parser._close_driver()
+
+@pytest.fixture
+def make_case():
+    """Factory for court results rows such as the parser produces"""
+    def make(number, filed_date="06/10/2025", status="Open"):
+        return {
+            "court": "Alabama Civil Court of Appeals",
+            "case_number": {"text": f"CL-2025-{number:04d}", "link": f"/portal/case/{number}"},
+            "case_title": f"Case {number}",
+            "classification": "Appeal",
+            "filed_date": filed_date,
+            "status": status,
+        }
+    return make
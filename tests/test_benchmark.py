@@ -0,0 +1,77 @@
+"""Tests for the offline benchmark suite"""
+import pytest
+from opal import benchmark
+from opal.benchmark import (
+    build_benchmarks, compare_to_baseline, read_fixture, repeat_table_rows, run_benchmarks
+)
+from opal.url_catcher_module import filter_news_links
+
+
+def test_benchmarks_run_offline_on_fixtures(monkeypatch):
+    """Every benchmark runs against the recorded fixtures and reports per-item timings"""
+    monkeypatch.setattr(benchmark, "MIN_ROUND_SECONDS", 0)
+    results = run_benchmarks(build_benchmarks(table_rows=60), repeat=2)
+
+    assert set(results) == {
+        "parser_1819.parse_article", "daily_news.parse_article", "appeals_al.parse_table_row",
+        "appeals_al.parse_results_html", "url_catcher.filter_news_links",
+        "court_url.build_court_url", "court_url.parse_court_url",
+    }
+    assert results["appeals_al.parse_table_row"]["items"] == 60
+    for result in results.values():
+        assert 0 < result["min"] <= result["median"] <= result["max"]
+
+
+def test_large_table_keeps_recorded_rows():
+    """The grown table parses into the requested number of cases"""
+    html = repeat_table_rows(read_fixture(benchmark.DEFAULT_FIXTURES_DIR, "court_results_page.html"), 120)
+    cases = benchmark.ParserAppealsAL().parse_results_html(html)["cases"]
+
+    assert len(cases) == 120
+    assert cases[25] == cases[0]
+    assert cases[0]["case_number"]["text"] == "CL-2025-1021"
+
+
+def test_filter_news_links_skips_seen_and_foreign_links():
+    """Only new article links under the base URL are returned, in page order"""
+    listing = read_fixture(benchmark.DEFAULT_FIXTURES_DIR, "news_listing_1819.html")
+    seen = {"https://1819news.com/news/item/state-budget-heads-to-conference"}
+    urls = filter_news_links(listing, "https://1819news.com/news", "https://1819news.com/", "/news/item", seen)
+
+    assert len(urls) == 19
+    assert urls[0] == "https://1819news.com/news/item/school-choice-bill-advances"
+    assert all(url.startswith("https://1819news.com/news/item/") for url in urls)
+    assert len(seen) == 20
+
+
+def test_compare_to_baseline_flags_slowdowns_over_threshold():
+    """Only benchmarks slower than baseline by more than the threshold are regressions"""
+    baseline = {"a": {"min": 1.0}, "b": {"min": 1.0}}
+    results = {"a": {"min": 1.2}, "b": {"min": 1.5}, "new": {"min": 9.0}}
+
+    regressions = compare_to_baseline(results, baseline, threshold=0.25)
+    assert [regression["name"] for regression in regressions] == ["b"]
+    assert regressions[0]["change"] == pytest.approx(0.5)
+
+
+def test_check_fails_without_a_baseline(monkeypatch, tmp_path, capsys):
+    """--check exits non-zero before running anything when the baseline is missing"""
+    missing = str(tmp_path / "baseline.json")
+    monkeypatch.setattr(benchmark, "run_benchmarks", lambda *args: pytest.fail("benchmarks ran"))
+    monkeypatch.setattr("sys.argv", ["benchmark", "--check", "--baseline", missing])
+
+    with pytest.raises(SystemExit) as exit_info:
+        benchmark.main()
+
+    assert exit_info.value.code == 1
+    assert "No baseline at" in capsys.readouterr().out
+
+
+def test_missing_baseline_only_warns_without_check(monkeypatch, tmp_path, capsys):
+    """Without --check a run with no baseline prints a note and succeeds"""
+    monkeypatch.setattr(benchmark, "run_benchmarks", lambda *args: {})
+    monkeypatch.setattr("sys.argv", ["benchmark", "--baseline", str(tmp_path / "baseline.json")])
+
+    benchmark.main()
+
+    assert "run with --save-baseline" in capsys.readouterr().out
@@ -0,0 +1,97 @@
+"""Tests for the case detail fetcher"""
+from unittest.mock import patch
+from opal.case_detail_fetcher import CaseDetailCache, CaseDetailFetcher, DETAIL_WAIT_SELECTOR, parse_case_detail
+from opal.court_case_parser import ParserAppealsAL
+from opal.rate_limiter import RateLimiter
+
+DETAIL_HTML = """
+<html><body>
+  <dl><dt>Case Number:</dt><dd>CL-2025-0001</dd><dt>Status:</dt><dd>Active</dd></dl>
+  <h3>Parties</h3>
+  <table>
+    <tr><th>Name</th><th>Type</th></tr>
+    <tr><td>John Smith</td><td>Appellant</td></tr>
+    <tr><td>Jane Jones</td><td>Appellee</td></tr>
+  </table>
+  <h3>Docket</h3>
+  <table>
+    <tr><th>Date</th><th>Description</th></tr>
+    <tr><td>06/11/2025</td><td>Notice of appeal filed</td></tr>
+  </table>
+  <h3>Panel</h3>
+  <table>
+    <tr><th>Judge</th></tr>
+    <tr><td>Hon. A. Judge</td></tr>
+  </table>
+</body></html>
+"""
+
+
+def test_parse_case_detail():
+    """Detail pages are split into fields, parties, docket entries and judges"""
+    record = parse_case_detail(DETAIL_HTML, "CL-2025-0001", "https://example.com/detail")
+
+    assert record["fields"] == {"Case Number": "CL-2025-0001", "Status": "Active"}
+    assert record["parties"] == [
+        {"Name": "John Smith", "Type": "Appellant"},
+        {"Name": "Jane Jones", "Type": "Appellee"}
+    ]
+    assert record["docket_entries"] == [{"Date": "06/11/2025", "Description": "Notice of appeal filed"}]
+    assert record["judges"] == [{"Judge": "Hon. A. Judge"}]
+
+
+def test_fetch_all_uses_cache(make_case, tmp_path):
+    """Unchanged cases come from the cache and changed cases are refetched"""
+    cache_path = str(tmp_path / "cache.jsonl")
+
+    def fetch_case(case):
+        return {"case_number": case["case_number"]["text"], "status": case["status"]}
+
+    fetcher = CaseDetailFetcher(max_workers=2, requests_per_second=100, cache_path=cache_path)
+    with patch.object(CaseDetailFetcher, 'fetch_case', side_effect=fetch_case):
+        first = fetcher.fetch_all([make_case(1), make_case(2), make_case(2)])
+    assert (first["fetched"], first["cached"]) == (2, 0)
+
+    fetcher = CaseDetailFetcher(max_workers=2, requests_per_second=100, cache_path=cache_path)
+    with patch.object(CaseDetailFetcher, 'fetch_case', side_effect=fetch_case) as mock_fetch:
+        second = fetcher.fetch_all([make_case(1), make_case(2, status="Closed")])
+    assert (second["fetched"], second["cached"]) == (1, 1)
+    assert mock_fetch.call_args[0][0]["case_number"]["text"] == "CL-2025-0002"
+
+
+def test_fetch_case_waits_for_detail_layout(make_case):
+    """Detail pages laid out without a table still count as loaded"""
+    fetcher = CaseDetailFetcher(cache_path=None)
+    with patch.object(ParserAppealsAL, 'make_request', return_value=DETAIL_HTML) as mock_request:
+        record = fetcher.fetch_case(make_case(1))
+
+    assert mock_request.call_args.kwargs["wait_selector"] == DETAIL_WAIT_SELECTOR
+    assert "dl" in DETAIL_WAIT_SELECTOR.split(", ")
+    assert record["fields"]["Status"] == "Active"
+
+
+def test_cache_appends_each_record(tmp_path):
+    """Each record is appended as it is stored; later lines win and compact keeps one per case"""
+    cache_path = tmp_path / "cache.jsonl"
+    cache = CaseDetailCache(str(cache_path))
+    cache.put("CL-1", "a", {"status": "Active"})
+    cache.put("CL-1", "b", {"status": "Closed"})
+    assert len(cache_path.read_text(encoding="utf-8").splitlines()) == 2
+
+    with open(cache_path, "a", encoding="utf-8") as f:
+        f.write('{"case_number": "CL-2", "finger')  # cut short by a crash
+    reloaded = CaseDetailCache(str(cache_path))
+    assert reloaded.get("CL-1", "b") == {"status": "Closed"}
+    assert reloaded.get("CL-1", "a") is None
+    reloaded.put("CL-3", "c", {"status": "Active"})
+    assert CaseDetailCache(str(cache_path)).get("CL-3", "c") == {"status": "Active"}
+
+    reloaded.compact()
+    assert len(cache_path.read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_rate_limiter_spaces_requests():
+    """Requests after the first wait for the minimum interval"""
+    limiter = RateLimiter(requests_per_second=1000)
+    assert limiter.wait() == 0
+    assert limiter.wait() > 0
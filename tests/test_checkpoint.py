@@ -0,0 +1,227 @@
+"""Tests for checkpointing and resuming extractions"""
+import argparse
+import json
+import sqlite3
+import pytest
+from unittest.mock import MagicMock, patch
+from opal.checkpoint import ExtractionCheckpoint, can_resume
+from opal.court_case_parser import ParserAppealsAL
+from opal.court_url_paginator import parse_court_page_info
+from opal.integrated_parser import IntegratedParser
+from opal.main import STREAM_BATCH_SIZE, stream_records
+from opal.output_writers import StreamingWriter, open_writer
+from opal.parser_module import Parser1819
+
+BASE_URL = "https://publicportal.alappeals.gov/portal/search/case/results?criteria=~%28advanced~false~courtID~%2768f021c4-6a44-4735-9a76-5360b2e8af13~page~%28size~25~number~0~totalElements~0~totalPages~0%29~sort~%28sortBy~%27caseHeader.filedDate~sortDesc~true%29~case~%28caseCategoryID~1000000~caseNumberQueryTypeID~10463~caseTitleQueryTypeID~300054~filedDateChoice~%27-1y~filedDateStart~%2706%2a2f11%2a2f2024~filedDateEnd~%2706%2a2f11%2a2f2025~excludeClosed~false%29%29"
+
+JOB = {"parser": "Parser1819", "url": "https://example.com", "output_format": "jsonl"}
+
+
+def case(number):
+    return {"court": "Civil", "case_number": {"text": f"CL-{number}", "link": f"/case/{number}"},
+            "case_title": f"Case, {number}", "filed_date": "06/10/2025", "status": "Open"}
+
+
+@pytest.mark.parametrize("output_format", ["jsonl", "csv"])
+def test_resumed_writer_drops_records_after_the_checkpoint(tmp_path, output_format):
+    """Records written after the last checkpoint are cut off and the file is appended to"""
+    checkpoint = ExtractionCheckpoint(str(tmp_path / "run.checkpoint.json"), JOB)
+    writer = open_writer(output_format, str(tmp_path / "cases"))
+    checkpoint.writer = writer
+    writer.write_many([case(1), case(2)])
+    checkpoint.mark_done(0)
+    writer.write(case(3))  # the run dies before page 1 is checkpointed
+
+    resumed = ExtractionCheckpoint.load(checkpoint.path, JOB)
+    assert resumed.next_page() == 1
+    writer = open_writer(output_format, str(tmp_path / "other"), resume=resumed.output)
+    writer.write_many([case(3), case(4)])
+    writer.close()
+
+    with open(writer.path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert len(lines) == (4 if output_format == "jsonl" else 5)
+    assert lines[-1].startswith('{"court"' if output_format == "jsonl" else 'Civil,CL-4,"Case, 4"')
+    with open(writer.manifest_path, encoding="utf-8") as f:
+        assert json.load(f)["records"] == 4
+
+
+def test_resumed_sqlite_writer_continues_its_run(tmp_path):
+    """A resumed SQLite run updates the same runs row"""
+    database = str(tmp_path / "opal.db")
+    writer = open_writer("sqlite", str(tmp_path / "x"), database_path=database)
+    writer.write(case(1))
+    position = writer.position()
+
+    writer = open_writer("sqlite", str(tmp_path / "x"), database_path=database, resume=position)
+    writer.write_many([case(1), case(2)])
+    writer.close()
+
+    db = sqlite3.connect(database)
+    assert db.execute("SELECT id, status, records FROM runs").fetchall() == [(1, "complete", 3)]
+    assert db.execute("SELECT COUNT(*) FROM cases").fetchone()[0] == 2
+
+
+def test_checkpoint_rejects_other_settings(tmp_path):
+    """A checkpoint is only resumed by a run with the same settings"""
+    checkpoint = ExtractionCheckpoint(str(tmp_path / "run.checkpoint.json"), JOB)
+    checkpoint.mark_done("https://example.com/a1")
+
+    with pytest.raises(ValueError):
+        ExtractionCheckpoint.load(checkpoint.path, {**JOB, "url": "https://example.org"})
+    with pytest.raises(FileNotFoundError):
+        ExtractionCheckpoint.load(str(tmp_path / "missing.json"), JOB)
+    assert not can_resume("parquet") and not can_resume("csv", "gzip") and can_resume("csv")
+
+
+@patch('opal.integrated_parser.get_all_news_urls')
+def test_resumed_news_run_skips_completed_articles(mock_get_urls, tmp_path):
+    """Articles are not fetched again and the original URL list is reused"""
+    urls = ["https://example.com/a1", "https://example.com/a2", "https://example.com/a3"]
+    mock_get_urls.return_value = urls
+    path = str(tmp_path / "news.checkpoint.json")
+    parser = IntegratedParser(Parser1819)
+
+    with patch.object(Parser1819, '_request', side_effect=["<html>1</html>", "<html>2</html>", OSError("offline")]), \
+         patch.object(Parser1819, 'parse_article', side_effect=lambda html, url: {"title": html}):
+        records = []
+        with pytest.raises(OSError):
+            for record in parser.iter_records("https://example.com", "/news", 1,
+                                              checkpoint=ExtractionCheckpoint(path, JOB)):
+                records.append(record)
+    assert len(records) == 2
+
+    mock_get_urls.return_value = []
+    checkpoint = ExtractionCheckpoint.load(path, JOB)
+    with patch.object(Parser1819, '_request', return_value="<html>3</html>") as mock_request, \
+         patch.object(Parser1819, 'parse_article', side_effect=lambda html, url: {"title": html}):
+        resumed = list(parser.iter_records("https://example.com", "/news", 1, checkpoint=checkpoint))
+
+    assert resumed == [{"title": "<html>3</html>", "url": "https://example.com/a3"}]
+    mock_request.assert_called_once_with("https://example.com/a3")
+    assert checkpoint.completed == urls
+
+
+def test_iter_pages_starts_at_resumed_page():
+    """Pages before start_page are skipped without loading them"""
+    court_parser = ParserAppealsAL()
+    loaded = []
+
+    def parse_article(url):
+        loaded.append(parse_court_page_info(url)['number'])
+        court_parser.driver = MagicMock(current_url=url.replace("totalElements~0", "totalElements~100"))
+        return {"cases": [{}] * 25}
+
+    with patch.object(court_parser, 'parse_article', side_effect=parse_article):
+        pages = [index for index, _ in court_parser.iter_pages(BASE_URL, start_page=2)]
+
+    assert loaded == [2, 3]
+    assert pages == [2, 3]
+
+
+def run_court_extraction(tmp_path, rows_for_page):
+    """Stream a custom URL extraction of a 100 case search whose pages return rows_for_page(number)"""
+    from opal.configurable_court_extractor import extract_court_cases_with_params
+
+    def parse_article(parser, url):
+        number = parse_court_page_info(url)['number']
+        parser.driver = MagicMock(current_url=url.replace("totalElements~0", "totalElements~100"))
+        rows = rows_for_page(number)
+        if rows is None:
+            return {"error": "Failed to load page", "cases": []}
+        return {"cases": [case(number * 25 + i) for i in range(rows)]}
+
+    checkpoint_path = str(tmp_path / "court.checkpoint.json")
+    with patch.object(ParserAppealsAL, 'parse_article', autospec=True, side_effect=parse_article), \
+         patch('opal.court_case_parser.time.sleep'):
+        result = extract_court_cases_with_params(custom_url=BASE_URL, page_size=25, output_format="jsonl",
+                                                 output_prefix=str(tmp_path / "cases"),
+                                                 checkpoint_path=checkpoint_path)
+    manifest_path = next(tmp_path.glob("cases_*.manifest.json"))
+    with open(manifest_path, encoding="utf-8") as f:
+        return result, checkpoint_path, json.load(f)
+
+
+def saved_pages(checkpoint_path):
+    with open(checkpoint_path, encoding="utf-8") as f:
+        return json.load(f)["completed"]
+
+
+def test_failed_page_keeps_checkpoint(tmp_path):
+    """A page that keeps failing mid-run fails the run and leaves the checkpoint to resume from"""
+    result, checkpoint_path, manifest = run_court_extraction(tmp_path, lambda number: None if number == 2 else 25)
+
+    assert result is None
+    assert manifest["status"] == "failed"
+    assert saved_pages(checkpoint_path) == [0, 1]
+
+
+def test_short_run_is_not_marked_complete(tmp_path):
+    """Fewer cases than the portal reported keeps the checkpoint and marks the output failed"""
+    result, checkpoint_path, manifest = run_court_extraction(tmp_path, lambda number: 10 if number == 1 else 25)
+
+    assert result["status"] == "incomplete"
+    assert result["total_cases"] == 85
+    assert result["pages_processed"] == 4
+    assert manifest["status"] == "failed"
+    assert saved_pages(checkpoint_path) == [0, 1, 2, 3]
+
+
+def test_complete_run_removes_checkpoint(tmp_path):
+    """A run that finds every reported case is complete and removes its checkpoint"""
+    result, checkpoint_path, manifest = run_court_extraction(tmp_path, lambda number: 25)
+
+    assert result["status"] == "success"
+    assert result["pages_processed"] == 4
+    assert manifest["status"] == "complete"
+    assert not (tmp_path / "court.checkpoint.json").exists()
+
+
+class FakeNewsParser:
+    """Yields articles and marks each URL done when the next record is requested, like iter_records"""
+
+    def __init__(self, articles, fail_after=None):
+        self.articles = articles
+        self.fail_after = fail_after
+
+    def iter_records(self, base_url, suffix="", max_pages=None, checkpoint=None):
+        for index in range(self.articles):
+            if index == self.fail_after:
+                raise OSError("offline")
+            url = f"https://example.com/a{index}"
+            yield {"url": url, "title": f"Article {index}"}
+            checkpoint.mark_done(url)
+
+
+def stream_args():
+    return argparse.Namespace(parser="Parser1819", format="jsonl", database=None, csv_compression=None,
+                              url="https://example.com", suffix="/news", max_pages=1)
+
+
+def test_news_records_are_written_in_batches(tmp_path):
+    """Articles reach the writer in batches and the checkpoint is removed at the end"""
+    checkpoint = ExtractionCheckpoint(str(tmp_path / "news.checkpoint.json"), JOB)
+    batches = []
+    write_many = StreamingWriter.write_many
+
+    def record_batch(writer, records):
+        batches.append(len(records))
+        write_many(writer, records)
+
+    with patch.object(StreamingWriter, "write_many", autospec=True, side_effect=record_batch):
+        stream_records(FakeNewsParser(2 * STREAM_BATCH_SIZE + 50), stream_args(), str(tmp_path / "day"), checkpoint)
+
+    assert batches == [STREAM_BATCH_SIZE, STREAM_BATCH_SIZE, 50]
+    assert not (tmp_path / "news.checkpoint.json").exists()
+
+
+def test_checkpoint_follows_written_batches(tmp_path):
+    """URLs are checkpointed only once the batch holding their articles has been written"""
+    path = str(tmp_path / "news.checkpoint.json")
+    with pytest.raises(OSError):
+        stream_records(FakeNewsParser(200, fail_after=STREAM_BATCH_SIZE + 30), stream_args(),
+                       str(tmp_path / "day"), ExtractionCheckpoint(path, JOB))
+
+    checkpoint = ExtractionCheckpoint.load(path, JOB)
+    assert checkpoint.completed == [f"https://example.com/a{index}" for index in range(STREAM_BATCH_SIZE)]
+    assert checkpoint.output["records"] == STREAM_BATCH_SIZE
@@ -0,0 +1,98 @@
+"""Tests for single-court extraction with search parameters"""
+import pytest
+from unittest.mock import MagicMock, patch
+from opal.configurable_court_extractor import (
+    CourtOutputOptions, CourtSearchBuilder, CourtSearchOptions, extract_court_cases_with_params
+)
+from opal.court_case_parser import ParserAppealsAL
+from opal.court_criteria import CourtCriteria
+from opal.court_sync import CourtSyncStore
+
+CIVIL_ID = "68f021c4-6a44-4735-9a76-5360b2e8af13"
+
+
+@pytest.fixture
+def builder():
+    search_builder = CourtSearchBuilder()
+    search_builder.set_court_id_manually('civil', CIVIL_ID)
+    search_builder.session_initialized = True
+    return search_builder
+
+
+def portal_pages(make_case, total=60, page_size=25):
+    """parse_article stand-in serving total cases, newest first"""
+    loaded = []
+
+    def parse_article(parser, url):
+        criteria = CourtCriteria.from_url(url)
+        number = criteria.page_number
+        loaded.append(number)
+        parser.driver = MagicMock(current_url=url.replace("totalElements~0", f"totalElements~{total}"))
+        first = number * page_size
+        return {"cases": [make_case(total - index, filed_date=f"06/{30 - index // 25:02d}/2025")
+                          for index in range(first, min(first + page_size, total))]}
+
+    return parse_article, loaded
+
+
+def extract(builder, parse_article, **kwargs):
+    with patch.object(ParserAppealsAL, 'parse_article', autospec=True, side_effect=parse_article), \
+         patch('opal.court_case_parser.time.sleep'):
+        return extract_court_cases_with_params(court='civil', search_builder=builder, page_size=25,
+                                               save_output=False, **kwargs)
+
+
+def test_search_parameters_build_the_url(builder, make_case):
+    """Filters reach the search URL and every page is collected"""
+    parse_article, loaded = portal_pages(make_case)
+
+    result = extract(builder, parse_article, case_category='Appeal', exclude_closed=True)
+
+    assert result["status"] == "success"
+    assert (result["total_cases"], result["expected_total"], result["pages_processed"]) == (60, 60, 3)
+    assert loaded == [0, 1, 2]
+    assert result["search_parameters"]["case_category"] == 'Appeal'
+
+
+def test_sync_stops_at_known_cases(builder, make_case, tmp_path):
+    """A second sync emits nothing and stops after the first, already known page"""
+    state_path = str(tmp_path / "sync.json")
+    parse_article, loaded = portal_pages(make_case)
+    first = extract(builder, parse_article, sync=True, sync_state_path=state_path)
+    assert first["total_cases"] == 60
+    assert CourtSyncStore(state_path).watermark('civil') == "2025-06-30"
+
+    loaded.clear()
+    second = extract(builder, parse_article, sync=True, sync_state_path=state_path)
+    assert second["total_cases"] == 0
+    assert second["sync"]["reached_known"] is True
+    assert loaded == [0]
+
+
+def test_max_pages_limits_the_run(builder, make_case):
+    """A page limit is not reported as a short run"""
+    parse_article, loaded = portal_pages(make_case)
+
+    result = extract(builder, parse_article, max_pages=2)
+
+    assert result["status"] == "success"
+    assert result["total_cases"] == 50
+    assert loaded == [0, 1]
+
+
+def test_options_describe_the_job():
+    """The checkpoint job and the output's search parameters come from the search options"""
+    search = CourtSearchOptions(court='criminal', case_title="Smith")
+    assert search.checkpoint_job('jsonl')["case_title"] == "Smith"
+    assert search.checkpoint_job('jsonl')["output_format"] == 'jsonl'
+    assert search.search_parameters()["court"] == 'criminal'
+    assert search.sync_key() == 'criminal'
+    assert CourtSearchOptions(custom_url="https://example.com/results").search_parameters()["court"] == "Custom URL"
+
+    output = CourtOutputOptions(output_format='jsonl', checkpoint_path="run.checkpoint.json")
+    assert output.wants_checkpoint(sync=False)
+    assert not output.wants_checkpoint(sync=True)
+    assert not CourtOutputOptions(output_format='json', checkpoint_path="x").wants_checkpoint(sync=False)
+    with pytest.raises(ValueError):
+        CourtOutputOptions(output_format='parquet', checkpoint_path="x", resume=True).open_checkpoint(
+            search, sync=False)
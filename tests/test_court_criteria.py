@@ -0,0 +1,78 @@
+"""Tests for the court criteria codec"""
+import pytest
+from opal.configurable_court_extractor import CourtSearchBuilder
+from opal.court_criteria import CourtCriteria, decode_criteria, encode_criteria
+
+PORTAL_URL = "https://publicportal.alappeals.gov/portal/search/case/results?criteria=~%28advanced~false~courtID~%2768f021c4-6a44-4735-9a76-5360b2e8af13~page~%28size~25~number~0~totalElements~0~totalPages~0%29~sort~%28sortBy~%27caseHeader.filedDate~sortDesc~true%29~case~%28caseCategoryID~1000000~caseNumberQueryTypeID~10463~caseTitleQueryTypeID~300054~filedDateChoice~%27-1y~filedDateStart~%2706%2a2f11%2a2f2024~filedDateEnd~%2706%2a2f11%2a2f2025~excludeClosed~false%29%29"
+
+
+def test_portal_url_round_trips_exactly():
+    """Decoding and re-encoding a portal URL reproduces it byte for byte"""
+    criteria = CourtCriteria.from_url(PORTAL_URL)
+
+    assert criteria.values["page"] == {"size": 25, "number": 0, "totalElements": 0, "totalPages": 0}
+    assert criteria.values["case"]["filedDateStart"] == "06/11/2024"
+    assert criteria.values["sort"]["sortDesc"] is True
+    assert criteria.to_url() == PORTAL_URL
+
+
+def test_page_url_leaves_criteria_unchanged():
+    """Page URLs are generated without changing the decoded criteria"""
+    criteria = CourtCriteria.from_url(PORTAL_URL)
+
+    url = criteria.page_url(7, page_size=100)
+
+    assert CourtCriteria.from_url(url).values["page"]["number"] == 7
+    assert CourtCriteria.from_url(url).values["page"]["size"] == 100
+    assert criteria.page_number == 0
+    assert criteria.page_size == 25
+
+
+@pytest.mark.parametrize("value", [
+    {"title": "Smith v. Jones (2024) & Co's $5*", "empty": "", "n": -3, "x": 1.5},
+    {"list": [1, "two", None, False, {"nested": []}], "unicode": "café – ü"},
+    [],
+])
+def test_encode_decode_round_trip(value):
+    """Any supported value survives encoding and decoding"""
+    assert decode_criteria(encode_criteria(value)) == value
+
+
+def test_decode_rejects_malformed_criteria():
+    """Malformed criteria raise ValueError instead of being misread"""
+    with pytest.raises(ValueError):
+        decode_criteria("~(page~(size~25)")
+    with pytest.raises(ValueError):
+        decode_criteria("~(caseNumber~CL-2024)")
+
+
+def test_builder_uses_codec():
+    """Builder URLs decode back to the builder's parameters, including text filters"""
+    builder = CourtSearchBuilder()
+    builder.set_court_id_manually('civil', "68f021c4-6a44-4735-9a76-5360b2e8af13")
+    builder.set_court('civil')
+    builder.set_date_range("2024-06-11", "2025-06-11", period='custom')
+    builder.set_case_number_filter("CL-2024-")
+    builder.set_case_title_filter("Smith v. Jones")
+
+    url = builder.build_url(3)
+    case = CourtCriteria.from_url(url).values["case"]
+
+    assert "filedDateStart~%2706%2a2f11%2a2f2024" in url
+    assert case["caseNumber"] == "CL-2024-"
+    assert case["caseTitle"] == "Smith v. Jones"
+    assert CourtCriteria.from_url(url).page_number == 3
+
+
+def test_non_ascii_title_is_escaped_and_round_trips():
+    """Letters outside ASCII are escaped like other unsafe characters, so URLs stay ASCII"""
+    assert encode_criteria("Peña – Müller") == "~'Pe*f1a*20**2013*20M*fcller"
+
+    builder = CourtSearchBuilder()
+    builder.set_court_id_manually('civil', "68f021c4-6a44-4735-9a76-5360b2e8af13")
+    builder.set_court('civil')
+    builder.set_case_title_filter("Peña v. Müller")
+    url = builder.build_url(0)
+
+    assert url.isascii()
+    assert CourtCriteria.from_url(url).values["case"]["caseTitle"] == "Peña v. Müller"
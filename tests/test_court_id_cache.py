@@ -0,0 +1,92 @@
+"""Tests for the persisted court ID cache"""
+from unittest.mock import MagicMock
+from opal.configurable_court_extractor import FALLBACK_COURT_ID, CourtSearchBuilder
+from opal.court_id_cache import CourtIdCache, is_valid_court_id
+
+CIVIL_ID = "68f021c4-6a44-4735-9a76-5360b2e8af13"
+CRIMINAL_ID = "11111111-2222-3333-4444-555555555555"
+
+
+def test_is_valid_court_id():
+    """Only UUID-shaped values are accepted as court IDs"""
+    assert is_valid_court_id(CIVIL_ID)
+    assert not is_valid_court_id("civil")
+    assert not is_valid_court_id(None)
+
+
+def test_fresh_cache_skips_browser(tmp_path):
+    """A fresh cache supplies court and category IDs without loading the website"""
+    cache = CourtIdCache(str(tmp_path / "ids.json"))
+    cache.save({"civil": CIVIL_ID, "criminal": CRIMINAL_ID, "supreme": "not-an-id"}, {"Appeal": 42})
+
+    builder = CourtSearchBuilder(id_cache=CourtIdCache(str(tmp_path / "ids.json")))
+    parser = MagicMock()
+    builder.discover_court_ids(parser)
+
+    parser.driver.get.assert_not_called()
+    assert builder.courts["civil"]["id"] == CIVIL_ID
+    assert builder.courts["criminal"]["id"] == CRIMINAL_ID
+    assert builder.courts["supreme"]["id"] is None
+    builder.set_court("criminal")
+    builder.set_case_category("Appeal")
+    assert builder.params["courtID"] == CRIMINAL_ID
+    assert builder.params["case"]["caseCategoryID"] == 42
+
+
+def test_stale_cache_is_ignored(tmp_path):
+    """Cached IDs older than the TTL are not used"""
+    cache = CourtIdCache(str(tmp_path / "ids.json"), ttl_seconds=0)
+    cache.save({"civil": CIVIL_ID}, {})
+
+    builder = CourtSearchBuilder(id_cache=cache)
+
+    assert not builder.apply_cached_ids()
+    assert builder.courts["civil"]["id"] is None
+
+
+
+def test_cache_missing_a_searched_court_is_not_used(tmp_path):
+    """A cache without an ID for a court being searched sends discovery to the website"""
+    cache = CourtIdCache(str(tmp_path / "ids.json"))
+    cache.save({"civil": CIVIL_ID}, {})
+
+    builder = CourtSearchBuilder(id_cache=cache)
+    assert builder.apply_cached_ids()
+    assert not builder.apply_cached_ids(["criminal"])
+    assert not builder.apply_cached_ids(["civil", "supreme"])
+
+    parser = MagicMock()
+    parser.driver.find_elements.return_value = []
+    builder.discover_court_ids(parser, courts=["criminal"])
+    parser.driver.get.assert_called_once()
+
+def test_court_mismatch():
+    """Results from another court are detected by their case number prefix"""
+    builder = CourtSearchBuilder(id_cache=CourtIdCache(None))
+    builder.set_court("civil")
+
+    assert builder.court_mismatch([{"case_number": {"text": "SC-2025-0432"}}])
+    assert not builder.court_mismatch([{"case_number": {"text": "CL-2025-0001"}}])
+    assert not builder.court_mismatch([])
+
+
+def test_fallback_id_is_not_cached(tmp_path):
+    """Only IDs read from the court selector are cached, never the fallback"""
+    cache_path = tmp_path / "ids.json"
+    parser = MagicMock()
+    parser.driver.find_elements.return_value = []
+
+    builder = CourtSearchBuilder(id_cache=CourtIdCache(str(cache_path)))
+    builder.discover_court_ids(parser, force=True)
+    assert builder.courts["civil"]["id"] == FALLBACK_COURT_ID
+    assert not cache_path.exists()
+
+    option = MagicMock(text="Court of Criminal Appeals")
+    option.get_attribute.return_value = CRIMINAL_ID
+    selector = MagicMock()
+    selector.find_elements.return_value = [option]
+    parser.driver.find_elements.side_effect = lambda by, xpath: [selector] if "court" in xpath else []
+
+    builder = CourtSearchBuilder(id_cache=CourtIdCache(str(cache_path)))
+    builder.discover_court_ids(parser, force=True)
+    assert CourtIdCache(str(cache_path)).courts() == {"criminal": CRIMINAL_ID}
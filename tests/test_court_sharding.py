@@ -0,0 +1,125 @@
+"""Tests for date-window sharding of court searches"""
+import json
+import os
+import pytest
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+from opal.configurable_court_extractor import CourtSearchBuilder
+from opal.court_case_parser import ParserAppealsAL
+from opal.court_criteria import CourtCriteria
+from opal.court_sharding import (
+    extract_sharded_court_cases, merge_window_cases, plan_date_windows, search_digest, search_parameters,
+    split_date_range
+)
+
+
+def test_split_date_range_is_disjoint_and_complete():
+    """Windows cover every day of the range exactly once"""
+    windows = split_date_range(date(2024, 1, 1), date(2024, 12, 31), 7)
+
+    assert len(windows) == 7
+    assert windows[0][0] == date(2024, 1, 1)
+    assert windows[-1][1] == date(2024, 12, 31)
+    for (_, previous_end), (next_start, _) in zip(windows, windows[1:]):
+        assert next_start == previous_end + timedelta(days=1)
+
+
+def test_split_date_range_caps_at_days():
+    """A range is never split into more windows than it has days"""
+    assert split_date_range(date(2024, 1, 1), date(2024, 1, 3), 10) == [
+        (date(2024, 1, 1), date(2024, 1, 1)),
+        (date(2024, 1, 2), date(2024, 1, 2)),
+        (date(2024, 1, 3), date(2024, 1, 3)),
+    ]
+
+
+def test_plan_date_windows_adapts_to_density():
+    """Dense periods are split until each window is under the target"""
+    def count(template, parser, start, end):
+        # 10 cases a day in January, 1 a day afterwards
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        return sum(10 if day.month == 1 else 1 for day in days)
+
+    with patch('opal.court_sharding.count_window_cases', side_effect=count):
+        windows = plan_date_windows(CourtSearchBuilder(), None, date(2024, 1, 1), date(2024, 6, 30),
+                                    target_cases=100)
+
+    assert windows[0]["start"] == "2024-01-01"
+    assert windows[-1]["end"] == "2024-06-30"
+    assert all(window["expected_cases"] <= 100 for window in windows)
+    assert sum(window["expected_cases"] for window in windows) == count(None, None, date(2024, 1, 1),
+                                                                         date(2024, 6, 30))
+
+
+def test_merge_window_cases_deduplicates():
+    """Cases seen in more than one window are kept once"""
+    first = {"cases": [{"case_number": {"text": "CL-1"}}, {"case_number": {"text": "CL-2"}}]}
+    second = {"cases": [{"case_number": {"text": "CL-2"}}, {"case_number": {"text": "CL-3"}}]}
+
+    merged = merge_window_cases([first, second])
+
+    assert [case["case_number"]["text"] for case in merged] == ["CL-1", "CL-2", "CL-3"]
+
+
+def test_custom_date_range_uses_portal_format():
+    """Custom dates are sent in the MM/DD/YYYY format the portal expects"""
+    builder = CourtSearchBuilder()
+    builder.set_date_range("2024-01-05", "2024-02-29", period='custom')
+
+    assert builder.params['case']['filedDateStart'] == "01/05/2024"
+    assert builder.params['case']['filedDateEnd'] == "02/29/2024"
+
+
+def test_failed_or_short_windows_are_not_saved(tmp_path, caplog):
+    """Only complete windows are written, so a rerun extracts the others again"""
+    shard_dir = tmp_path / "shards"
+    shard_dir.mkdir()
+    windows = [{"start": "2024-01-01", "end": "2024-01-31", "expected_cases": 30},
+               {"start": "2024-02-01", "end": "2024-02-29", "expected_cases": 30},
+               {"start": "2024-03-01", "end": "2024-03-31", "expected_cases": 30}]
+    with open(shard_dir / "plan.json", "w", encoding="utf-8") as f:
+        json.dump({"search": search_parameters("civil", "2024-01-01", "2024-03-31"),
+                   "page_size": 25, "windows": windows}, f)
+
+    def parse_article(parser, url):
+        criteria = CourtCriteria.from_url(url)
+        month = criteria.values["case"]["filedDateStart"][:2]
+        parser.driver = MagicMock(current_url=url.replace("totalElements~0", "totalElements~30"))
+        if criteria.page_number == 0:
+            return {"cases": [{"case_number": {"text": f"CL-{month}-{i}"}} for i in range(25)]}
+        if month == "02":
+            return {"error": "Failed to load page", "cases": []}
+        rows = 5 if month == "01" else 2
+        return {"cases": [{"case_number": {"text": f"CL-{month}-{25 + i}"}} for i in range(rows)]}
+
+    def discover(builder, parser, force=False, courts=None):
+        builder.courts['civil']['id'] = "68f021c4-6a44-4735-9a76-5360b2e8af13"
+
+    with patch.object(CourtSearchBuilder, 'discover_court_ids', autospec=True, side_effect=discover), \
+         patch.object(ParserAppealsAL, 'parse_article', autospec=True, side_effect=parse_article), \
+         caplog.at_level("INFO", logger="opal.court_sharding"):
+        result = extract_sharded_court_cases("2024-01-01", "2024-03-31", shard_dir=str(shard_dir),
+                                             output_prefix=str(tmp_path / "cases"))
+
+    assert result["status"] == "partial"
+    assert result["total_cases"] == 30
+    assert sorted(os.listdir(shard_dir)) == ["plan.json", "window_2024-01-01_2024-01-31.json"]
+    window_records = {record.window_start: record.levelname for record in caplog.records
+                      if hasattr(record, "window_start")}
+    assert window_records == {"2024-01-01": "INFO", "2024-02-01": "WARNING", "2024-03-01": "WARNING"}
+
+
+def test_shard_dir_of_another_search_is_refused(tmp_path):
+    """Windows planned for other filters are never merged into a new search"""
+    shard_dir = tmp_path / "shards"
+    shard_dir.mkdir()
+    with open(shard_dir / "plan.json", "w", encoding="utf-8") as f:
+        json.dump({"search": search_parameters("civil", "2024-01-01", "2024-03-31"),
+                   "page_size": 25, "windows": []}, f)
+
+    with pytest.raises(ValueError, match="different search"):
+        extract_sharded_court_cases("2024-01-01", "2024-03-31", case_category="Appeal",
+                                    shard_dir=str(shard_dir))
+
+    appeals = search_parameters("civil", "2024-01-01", "2024-03-31", case_category="Appeal")
+    assert search_digest(appeals) != search_digest(search_parameters("civil", "2024-01-01", "2024-03-31"))
@@ -0,0 +1,69 @@
+"""Tests for incremental court sync state"""
+from opal.court_criteria import CourtCriteria
+from opal.court_sync import CourtSyncStore, sync_key_for_url
+
+PORTAL_URL = "https://publicportal.alappeals.gov/portal/search/case/results?criteria=~%28advanced~false~courtID~%2768f021c4-6a44-4735-9a76-5360b2e8af13~page~%28size~25~number~0~totalElements~0~totalPages~0%29~sort~%28sortBy~%27caseHeader.filedDate~sortDesc~true%29~case~%28caseCategoryID~1000000~caseNumberQueryTypeID~10463~caseTitleQueryTypeID~300054~filedDateChoice~%27-1y~filedDateStart~%2706%2a2f11%2a2f2024~filedDateEnd~%2706%2a2f11%2a2f2025~excludeClosed~false%29%29"
+
+
+def test_first_sync_emits_everything(make_case, tmp_path):
+    """Without state every case is new and paging never stops early"""
+    store = CourtSyncStore(str(tmp_path / "state.json"))
+    page = [make_case(2, "06/11/2025"), make_case(1, "06/10/2025")]
+
+    delta, reached_known = store.filter_page("civil", page)
+
+    assert delta == page
+    assert reached_known is False
+
+
+def test_sync_stops_at_known_page(make_case, tmp_path):
+    """A page of known, unchanged cases ends the sync and only the delta is emitted"""
+    path = str(tmp_path / "state.json")
+    store = CourtSyncStore(path)
+    store.record("civil", [make_case(2, "06/11/2025"), make_case(1, "06/10/2025")])
+    store.save()
+
+    store = CourtSyncStore(path)
+    assert store.watermark("civil") == "2025-06-11"
+
+    first_page = [make_case(3, "06/12/2025"), make_case(2, "06/11/2025", status="Closed")]
+    delta, reached_known = store.filter_page("civil", first_page)
+    assert [case["case_number"]["text"] for case in delta] == ["CL-2025-0003", "CL-2025-0002"]
+    assert reached_known is False
+
+    second_page = [make_case(1, "06/10/2025")]
+    delta, reached_known = store.filter_page("civil", second_page)
+    assert delta == []
+    assert reached_known is True
+
+
+def test_watermarks_are_per_court(make_case, tmp_path):
+    """Cases known in one court do not stop a sync of another"""
+    store = CourtSyncStore(str(tmp_path / "state.json"))
+    store.record("civil", [make_case(1, "06/10/2025")])
+
+    delta, reached_known = store.filter_page("criminal", [make_case(1, "06/10/2025")])
+
+    assert len(delta) == 1
+    assert reached_known is False
+    assert store.watermark("criminal") is None
+
+
+def test_custom_url_sync_key_follows_the_criteria():
+    """Pages and shifted relative dates share a key; other filters or courts do not"""
+    key = sync_key_for_url(PORTAL_URL)
+    assert key.startswith("custom:68f021c4-6a44-4735-9a76-5360b2e8af13:")
+
+    criteria = CourtCriteria.from_url(PORTAL_URL)
+    assert sync_key_for_url(criteria.page_url(12, 100)) == key
+    criteria.values["case"]["filedDateStart"] = "06/12/2024"
+    criteria.values["case"]["filedDateEnd"] = "06/12/2025"
+    assert sync_key_for_url(criteria.to_url()) == key
+
+    criteria.values["case"]["caseCategoryID"] = 1000001
+    assert sync_key_for_url(criteria.to_url()) != key
+    criteria = CourtCriteria.from_url(PORTAL_URL)
+    criteria.values["courtID"] = "other-court"
+    assert sync_key_for_url(criteria.to_url()).startswith("custom:other-court:")
+
+    assert sync_key_for_url("https://example.com/results?criteria=~%28broken") == "custom"
@@ -0,0 +1,84 @@
+"""Tests for court results table extraction"""
+from unittest.mock import MagicMock, patch
+from bs4 import BeautifulSoup
+from opal import metrics
+from opal.court_case_parser import ParserAppealsAL
+
+TABLE_HTML = """
+<table>
+  <tr><th>Court</th><th>Case Number</th><th>Title</th><th>Class</th><th>Filed</th><th>Status</th></tr>
+  <tr>
+    <td> Alabama Civil Court of Appeals </td>
+    <td><a href="/portal/case/detail/123"> CL-2025-0001 </a></td>
+    <td>Smith v.
+        <b>Jones</b></td>
+    <td>Appeal</td>
+    <td>06/11/2025</td>
+    <td>Active</td>
+  </tr>
+  <tr>
+    <td>Alabama Civil Court of Appeals</td>
+    <td>CL-2025-0002</td>
+    <td>Doe v. Roe</td>
+    <td>Petition</td>
+    <td>06/10/2025</td>
+    <td>Closed</td>
+  </tr>
+  <tr><td>Incomplete row</td></tr>
+</table>
+"""
+
+
+def browser_rows(html):
+    """Build the row data TABLE_ROWS_SCRIPT would return for the given HTML"""
+    rows = []
+    for row in BeautifulSoup(html, 'html.parser').find('table').find_all('tr')[1:]:
+        cells = row.find_all('td')
+        anchor = cells[1].find('a') if len(cells) > 1 else None
+        rows.append({
+            "cells": [cell.get_text(strip=True) for cell in cells],
+            "link": {"text": anchor.get_text(strip=True), "href": anchor.get('href', '')} if anchor else None
+        })
+    return rows
+
+
+def test_row_data_matches_parse_table_row():
+    """Browser row data and BeautifulSoup rows produce identical cases"""
+    parser = ParserAppealsAL()
+    soup_rows = BeautifulSoup(TABLE_HTML, 'html.parser').find('table').find_all('tr')[1:]
+
+    from_soup = [parser.parse_table_row(row) for row in soup_rows]
+    from_browser = [parser.parse_row_data(row) for row in browser_rows(TABLE_HTML)]
+
+    assert from_soup == from_browser
+    assert from_soup[0]["case_number"] == {"text": "CL-2025-0001", "link": "/portal/case/detail/123"}
+    assert from_soup[0]["case_title"] == "Smith v.Jones"
+    assert from_soup[1]["case_number"] == {"text": "CL-2025-0002", "link": ""}
+    assert from_soup[2] is None
+
+
+def test_parse_article_uses_browser_extraction():
+    """parse_article collects rows with execute_script instead of page_source and counts their size"""
+    metrics.get_metrics().reset()
+    parser = ParserAppealsAL()
+    parser.driver = MagicMock()
+    parser.driver.execute_script.return_value = browser_rows(TABLE_HTML)
+
+    with patch.object(parser, '_load_page', return_value=True):
+        result = parser.parse_article("https://example.com/results")
+
+    assert len(result["cases"]) == 2
+    parser.driver.execute_script.assert_called_once()
+    assert metrics.get_metrics().counter("page_load", "bytes") > 0
+
+
+def test_parse_article_reports_missing_table():
+    """A page without a table is reported the same way as the soup path"""
+    parser = ParserAppealsAL()
+    parser.driver = MagicMock()
+    parser.driver.execute_script.return_value = None
+
+    with patch.object(parser, '_load_page', return_value=True):
+        result = parser.parse_article("https://example.com/results")
+
+    assert result == {"error": "No table found", "cases": []}
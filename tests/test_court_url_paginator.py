@@ -0,0 +1,180 @@
+"""Tests for the court URL paginator"""
+import pytest
+from unittest.mock import MagicMock, patch
+from opal.court_case_parser import PageLoadError, ParserAppealsAL
+from opal.court_url_paginator import (
+    build_court_url, discover_court_pages, is_court_url, iter_court_urls, negotiate_page_size,
+    paginate_court_urls, parse_court_page_info, parse_court_url, total_pages_for
+)
+
+BASE_URL = "https://publicportal.alappeals.gov/portal/search/case/results?criteria=~%28advanced~false~courtID~%2768f021c4-6a44-4735-9a76-5360b2e8af13~page~%28size~25~number~0~totalElements~0~totalPages~0%29~sort~%28sortBy~%27caseHeader.filedDate~sortDesc~true%29~case~%28caseCategoryID~1000000~caseNumberQueryTypeID~10463~caseTitleQueryTypeID~300054~filedDateChoice~%27-1y~filedDateStart~%2706%2a2f11%2a2f2024~filedDateEnd~%2706%2a2f11%2a2f2025~excludeClosed~false%29%29"
+
+LAST_PAGE_URL = BASE_URL.replace("size~25~number~0~totalElements~0~totalPages~0",
+                                 "size~25~number~12~totalElements~318~totalPages~13")
+
+
+def fake_parser(rows_for_size, total_elements):
+    """Parser stand-in whose portal caps pages at some size"""
+    parser = MagicMock()
+
+    def parse_article(url):
+        size = parse_court_page_info(url)['size']
+        rows = rows_for_size(size)
+        parser.driver.current_url = url.replace(
+            "totalElements~0", f"totalElements~{total_elements}")
+        return {"cases": [{"case_number": {"text": str(i)}} for i in range(rows)]}
+
+    parser.parse_article.side_effect = parse_article
+    return parser
+
+
+def test_parse_court_url():
+    """Page number and total pages are read from the URL"""
+    assert parse_court_url(LAST_PAGE_URL) == (12, 13)
+
+
+def test_parse_court_page_info():
+    """All pagination fields are read from the URL"""
+    assert parse_court_page_info(LAST_PAGE_URL) == {
+        'size': 25, 'number': 12, 'totalElements': 318, 'totalPages': 13
+    }
+
+
+def test_is_court_url_checks_the_host():
+    """Search URLs count only on the portal, the local mock server or an allowed host"""
+    mock_url = BASE_URL.replace("https://publicportal.alappeals.gov", "http://127.0.0.1:8000")
+    other_url = BASE_URL.replace("publicportal.alappeals.gov", "example.com")
+
+    assert is_court_url(BASE_URL)
+    assert is_court_url(mock_url)
+    assert not is_court_url(other_url)
+    assert is_court_url(other_url, allowed_hosts=["example.com"])
+    assert not is_court_url(mock_url, allowed_hosts=[])
+    assert not is_court_url("https://publicportal.alappeals.gov/portal/home")
+
+
+def test_build_court_url_page_size():
+    """build_court_url can change both the page number and the page size"""
+    url = build_court_url(BASE_URL, 3, page_size=100)
+    assert parse_court_page_info(url)['number'] == 3
+    assert parse_court_page_info(url)['size'] == 100
+    assert build_court_url(BASE_URL, 3) == BASE_URL.replace("number~0", "number~3")
+
+
+def test_total_pages_for():
+    """Page math rounds up and never returns zero pages"""
+    assert total_pages_for(318, 25) == 13
+    assert total_pages_for(318, 100) == 4
+    assert total_pages_for(0, 100) == 1
+
+
+def test_paginate_court_urls_page_size():
+    """Paginated URLs use the requested size and recomputed page count"""
+    urls = paginate_court_urls(LAST_PAGE_URL, page_size=100)
+    assert len(urls) == 4
+    assert [parse_court_page_info(url)['number'] for url in urls] == [0, 1, 2, 3]
+    assert all(parse_court_page_info(url)['size'] == 100 for url in urls)
+
+
+def test_negotiate_page_size_honored():
+    """The largest candidate is used when the portal honors it"""
+    parser = fake_parser(lambda size: min(size, 318), 318)
+    page_size, first_result = negotiate_page_size(BASE_URL, parser)
+    assert page_size == 500
+    assert len(first_result["cases"]) == 318
+    assert parser.parse_article.call_count == 1
+
+
+def test_negotiate_page_size_capped():
+    """A capped page falls back to the number of rows actually returned"""
+    parser = fake_parser(lambda size: min(size, 100), 318)
+    page_size, first_result = negotiate_page_size(BASE_URL, parser)
+    assert page_size == 100
+    assert len(first_result["cases"]) == 100
+
+
+def test_discover_court_pages_loads_first_page_once():
+    """Page discovery returns page 0's cases so it is not loaded again"""
+    parser = fake_parser(lambda size: min(size, 318), 318)
+    urls, first_result = discover_court_pages(BASE_URL, parser, page_size=100)
+
+    assert len(urls) == 4
+    assert len(first_result["cases"]) == 100
+    assert parser.parse_article.call_count == 1
+
+
+def test_parse_all_cases_reuses_first_page():
+    """parse_all_cases skips loading the first URL when its result is given"""
+    court_parser = ParserAppealsAL()
+    first = {"cases": [{"case_number": {"text": "CL-1"}}]}
+    with patch.object(court_parser, 'parse_article',
+                      return_value={"cases": [{"case_number": {"text": "CL-2"}}]}) as mock_parse:
+        result = court_parser.parse_all_cases(BASE_URL, ["page0", "page1"], first)
+
+    mock_parse.assert_called_once_with("page1")
+    assert result["total_cases"] == 2
+
+
+def test_iter_court_urls_is_lazy():
+    """Page URLs are generated on demand when the page count is unknown"""
+    urls = iter_court_urls(BASE_URL, page_size=50)
+    assert [parse_court_page_info(next(urls))['number'] for _ in range(3)] == [0, 1, 2]
+    assert len(list(iter_court_urls(BASE_URL, total_pages=4))) == 4
+
+
+def test_iter_cases_stops_at_portal_total():
+    """iter_cases stops paging once totalElements is covered"""
+    court_parser = ParserAppealsAL()
+    loaded = []
+
+    def parse_article(url):
+        loaded.append(parse_court_page_info(url)['number'])
+        court_parser.driver = MagicMock(current_url=url.replace("totalElements~0", "totalElements~60"))
+        return {"cases": [{"case_number": {"text": f"CL-{len(loaded)}-{i}"}} for i in range(25)]}
+
+    with patch.object(court_parser, 'parse_article', side_effect=parse_article):
+        cases = list(court_parser.iter_cases(BASE_URL))
+
+    assert loaded == [0, 1, 2]
+    assert len(cases) == 75
+    assert court_parser.pagination["total_pages"] == 3
+    assert court_parser.driver is None
+
+
+def test_iter_pages_stops_at_short_page_without_total():
+    """Without a reported total, a short page marks the end of the results"""
+    court_parser = ParserAppealsAL()
+    sizes = iter([25, 25, 7, 25])
+
+    with patch.object(court_parser, 'parse_article',
+                      side_effect=lambda url: {"cases": [{}] * next(sizes)}):
+        pages = [index for index, _ in court_parser.iter_pages(BASE_URL)]
+
+    assert pages == [0, 1, 2]
+
+
+def test_iter_pages_retries_a_failed_page():
+    """A page that fails to load is loaded again rather than ending the results"""
+    court_parser = ParserAppealsAL()
+    results = iter([{"cases": [{}] * 25}, {"error": "Failed to load page", "cases": []},
+                    {"cases": [{}] * 25}, {"cases": [{}] * 3}])
+
+    with patch.object(court_parser, 'parse_article', side_effect=lambda url: next(results)):
+        pages = [(index, len(result["cases"])) for index, result in court_parser.iter_pages(BASE_URL)]
+
+    assert pages == [(0, 25), (1, 25), (2, 3)]
+
+
+def test_iter_pages_raises_when_a_page_keeps_failing():
+    """A page that fails every attempt raises instead of looking like the last page"""
+    court_parser = ParserAppealsAL()
+    results = iter([{"cases": [{}] * 25}] + [{"error": "Failed to load page", "cases": []}] * 3)
+
+    with patch.object(court_parser, 'parse_article', side_effect=lambda url: next(results)):
+        pages = court_parser.iter_pages(BASE_URL)
+        assert next(pages)[0] == 0
+        with pytest.raises(PageLoadError) as error:
+            next(pages)
+
+    assert error.value.page_index == 1
+    assert "Failed to load page" in str(error.value)
@@ -0,0 +1,68 @@
+"""Tests for the streaming CSV writer"""
+import csv
+import gzip
+import io
+import json
+import pytest
+from opal.csv_output import CASE_COLUMNS, CsvWriter, check_compression
+from opal.output_writers import open_writer
+
+CASE = {
+    "court": "Alabama Court of Civil Appeals",
+    "case_number": {"text": "CL-2025-0001", "link": "/portal/case/1"},
+    "case_title": 'Smith, John v. "ACME, Inc."',
+    "classification": "Appeal",
+    "filed_date": "06/10/2025",
+    "status": "Open",
+}
+
+
+def test_csv_writer_quotes_instead_of_rewriting(tmp_path):
+    """Commas and quotes survive a round trip and pages are appended as they arrive"""
+    path = str(tmp_path / "cases.csv")
+    writer = CsvWriter(path)
+    writer.write_many([CASE])
+    with open(path, encoding="utf-8", newline="") as f:
+        assert len(list(csv.reader(f))) == 2
+    writer.write(CASE)
+    writer.close({"total_cases": 2})
+
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == CASE_COLUMNS
+    assert rows[1][2] == 'Smith, John v. "ACME, Inc."'
+    assert rows[1][6] == "https://publicportal.alappeals.gov/portal/case/1"
+    with open(str(tmp_path / "cases.manifest.json"), encoding="utf-8") as f:
+        assert json.load(f)["records"] == 2
+
+
+def test_open_writer_gzip_articles(tmp_path):
+    """Compressed output gets its suffix and articles keep multi-line text"""
+    writer = open_writer("csv", str(tmp_path / "news"), record_type="articles", compression="gzip")
+    writer.write({"url": "https://example.com/a", "title": "A", "author": "B", "date": "June 10, 2025",
+                  "line_count": 2, "line_content": {"line 2": "second", "line 1": "first"}})
+    writer.close()
+
+    assert writer.path.endswith("news.csv.gz")
+    assert writer.manifest_path.endswith("news.manifest.json")
+    with gzip.open(writer.path, "rt", encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[1] == ["https://example.com/a", "A", "B", "June 10, 2025", "2", "first\nsecond"]
+
+
+def test_zstd_round_trip(tmp_path):
+    """zstd output can be read back when zstandard is installed"""
+    zstandard = pytest.importorskip("zstandard")
+    path = str(tmp_path / "cases.csv.zst")
+    with CsvWriter(path, compression="zstd", manifest=False) as writer:
+        writer.write(CASE)
+
+    with open(path, "rb") as f:
+        text = zstandard.ZstdDecompressor().stream_reader(f).read().decode("utf-8")
+    assert list(csv.reader(io.StringIO(text)))[1][1] == "CL-2025-0001"
+    assert not (tmp_path / "cases.manifest.json").exists()
+
+
+def test_unknown_compression_is_rejected():
+    with pytest.raises(ValueError):
+        check_compression("bz2")
@@ -0,0 +1,62 @@
+"""Tests for browser recycling in long court sessions"""
+import os
+from unittest.mock import MagicMock, patch
+from opal.court_case_parser import ParserAppealsAL
+from opal.process_memory import process_tree_rss
+
+
+def started_parser(**kwargs):
+    """Parser whose browser start-up creates a fake driver instead of Chrome"""
+    parser = ParserAppealsAL(rate_limit_seconds=0, **kwargs)
+    drivers = []
+
+    def setup():
+        parser.driver = MagicMock()
+        parser.pages_since_restart = 0
+        drivers.append(parser.driver)
+
+    parser._setup_driver = setup
+    return parser, drivers
+
+
+@patch('opal.court_case_parser.WebDriverWait')
+@patch('opal.court_case_parser.time.sleep')
+def test_driver_recycled_after_page_limit(mock_sleep, mock_wait):
+    """The browser is restarted every recycle_after_pages loads and the page still loads"""
+    parser, drivers = started_parser(recycle_after_pages=2)
+
+    for page in range(5):
+        assert parser._load_page(f"page{page}")
+
+    assert len(drivers) == 3
+    assert drivers[0].quit.called and drivers[1].quit.called
+    drivers[2].get.assert_called_once_with("page4")
+    assert [event["reason"] for event in parser.recycle_events] == ["pages", "pages"]
+    assert parser.driver_report()["restarts"] == 2
+
+
+@patch('opal.court_case_parser.WebDriverWait')
+@patch('opal.court_case_parser.time.sleep')
+def test_driver_recycled_over_memory_limit(mock_sleep, mock_wait):
+    """Crossing the RSS threshold restarts the browser and records per-process memory"""
+    parser, drivers = started_parser(max_browser_rss_mb=500)
+    usage = iter([{1: 100 * 1024 * 1024}, {1: 400 * 1024 * 1024, 2: 200 * 1024 * 1024}])
+
+    with patch('opal.court_case_parser.process_tree_rss', side_effect=lambda pid: next(usage, {})):
+        for page in range(3):
+            parser._load_page(f"page{page}")
+
+    assert len(drivers) == 2
+    event = parser.recycle_events[0]
+    assert event["reason"] == "memory"
+    assert event["browser_rss_mb"] == 600.0
+    assert event["process_rss_mb"] == {"1": 400.0, "2": 200.0}
+    assert parser.peak_browser_rss_mb == 600.0
+
+
+def test_process_tree_rss_reads_own_process():
+    """Memory of the current process is reported on supported platforms"""
+    usage = process_tree_rss(os.getpid())
+    if usage:
+        assert usage[os.getpid()] > 0
+    assert process_tree_rss(None) == {}
@@ -28,4 +28,34 @@ def test_process_site(mock_make_request, mock_get_urls):
         result_dict = json.loads(result)
         assert result_dict["success"] is True
         assert result_dict["total_articles"] == 2
-        assert len(result_dict["articles"]) == 2
\ No newline at end of file
+        assert len(result_dict["articles"]) == 2
+
+@patch('opal.integrated_parser.get_all_news_urls')
+@patch('opal.parser_module.Parser1819.make_request')
+def test_process_site_objects_skips_json_round_trip(mock_make_request, mock_get_urls):
+    """The object API returns dictionaries without encoding them to JSON"""
+    mock_get_urls.return_value = ["https://example.com/article1"]
+    mock_make_request.return_value = ["<html>content1</html>"], ["https://example.com/article1"]
+
+    with patch.object(Parser1819, 'parse_article', return_value={"title": "Article 1"}), \
+         patch('opal.integrated_parser.json.dumps') as mock_dumps, \
+         patch('opal.parser_module.json.dumps') as mock_parser_dumps:
+        result = IntegratedParser(Parser1819).process_site_objects("https://example.com", "/article", 1)
+
+    assert result == {"success": True, "total_articles": 1,
+                      "articles": [{"title": "Article 1", "url": "https://example.com/article1"}]}
+    mock_dumps.assert_not_called()
+    mock_parser_dumps.assert_not_called()
+
+
+@patch('opal.integrated_parser.get_all_news_urls')
+@patch('opal.parser_module.Parser1819.make_request')
+def test_process_site_objects_reports_failed_requests(mock_make_request, mock_get_urls):
+    """When every article request fails the result says so instead of raising"""
+    mock_get_urls.return_value = ["https://example.com/article1"]
+    mock_make_request.side_effect = ValueError("All URLs failed to process")
+
+    result = IntegratedParser(Parser1819).process_site_objects("https://example.com", "/article", 1)
+
+    assert result["success"] is False
+    assert result["urls_found"] == 1
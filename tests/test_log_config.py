@@ -0,0 +1,72 @@
+"""Tests for logging configuration"""
+import io
+import json
+import logging
+import pytest
+from unittest.mock import patch
+from opal.log_config import ThrottledLog, configure_logging
+from opal.parser_module import Parser1819
+
+
+@pytest.fixture
+def log_stream():
+    yield io.StringIO()
+    logger = logging.getLogger("opal")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.setLevel(logging.NOTSET)
+    logger.propagate = True
+
+
+def test_json_records_carry_extra_fields(log_stream):
+    """JSON output is one object per line with level, logger, message and extra fields"""
+    configure_logging("INFO", "json", stream=log_stream)
+    logging.getLogger("opal.test").info("Page %d: found %d cases", 3, 25, extra={"page": 3})
+
+    record = json.loads(log_stream.getvalue())
+    assert record["level"] == "INFO"
+    assert record["logger"] == "opal.test"
+    assert record["message"] == "Page 3: found 25 cases"
+    assert record["page"] == 3
+
+
+def test_quiet_mode_skips_formatting(log_stream):
+    """Records below the level are dropped before their arguments are formatted"""
+    configure_logging("DEBUG", quiet=True, stream=log_stream)
+
+    class Unformattable:
+        def __str__(self):
+            raise AssertionError("formatted a dropped record")
+
+    logging.getLogger("opal.test").info("value %s", Unformattable())
+    logging.getLogger("opal.test").warning("kept")
+    assert log_stream.getvalue() == "WARNING: kept\n"
+
+
+def test_throttled_log_limits_records_and_counts_skipped(log_stream):
+    """A throttled message is written once per interval, with the number skipped"""
+    configure_logging("INFO", "json", stream=log_stream)
+    progress = ThrottledLog(logging.getLogger("opal.test"), interval_seconds=60)
+    for number in range(1, 6):
+        progress("Fetched %d of %d", number, 5, force=number == 5)
+
+    records = [json.loads(line) for line in log_stream.getvalue().splitlines()]
+    assert [record["message"] for record in records] == ["Fetched 1 of 5", "Fetched 5 of 5"]
+    assert records[1]["suppressed"] == 3
+
+
+def test_request_lines_are_debug_records(log_stream):
+    """Per-URL request lines only appear at DEBUG level"""
+    configure_logging("INFO", stream=log_stream)
+    with patch('opal.parser_module.requests.get') as mock_get:
+        mock_get.return_value.text = "<html></html>"
+        mock_get.return_value.content = b"<html></html>"
+        Parser1819()._request("https://example.com/a")
+    assert "Requesting" not in log_stream.getvalue()
+
+    configure_logging("DEBUG", stream=log_stream)
+    with patch('opal.parser_module.requests.get') as mock_get:
+        mock_get.return_value.text = "<html></html>"
+        mock_get.return_value.content = b"<html></html>"
+        Parser1819()._request("https://example.com/a")
+    assert "Requesting: https://example.com/a" in log_stream.getvalue()
@@ -0,0 +1,69 @@
+"""Tests for the opt-in memory instrumentation"""
+import os
+import tracemalloc
+import pytest
+from unittest.mock import patch
+from opal.memory_monitor import MB, MemoryMonitor
+from opal.metrics import RunMetrics
+
+
+@pytest.fixture
+def run_metrics():
+    return RunMetrics()
+
+
+def test_stage_growth_and_top_allocations_reach_the_run_report(run_metrics):
+    """Memory kept by a stage shows up in its growth and among the top allocations"""
+    monitor = MemoryMonitor(sample_interval_seconds=60, run_metrics=run_metrics)
+    monitor.start()
+    kept = []
+    try:
+        for _ in range(20):
+            with run_metrics.timer("parse"):
+                kept.append([str(number) * 20 for number in range(2000)])
+            with run_metrics.timer("fetch"):
+                pass
+    finally:
+        monitor.stop()
+    assert not tracemalloc.is_tracing()
+
+    report = run_metrics.report()["memory"]
+    assert report["stages"]["parse"]["boundaries"] == 20
+    assert report["stages"]["parse"]["net_growth_mb"] > 2
+    assert report["stages"]["fetch"]["net_growth_mb"] < 0.1
+    assert report["traced_mb"]["peak"] >= report["stages"]["parse"]["peak_traced_mb"]
+    assert [snapshot["label"] for snapshot in report["snapshots"]][0] == "start"
+    assert "after parse" in [snapshot["label"] for snapshot in report["snapshots"]]
+    assert report["snapshots"][-1]["label"] == "end"
+    for section in ("top_allocations_at_peak", "top_allocations_at_end"):
+        assert report[section][0]["location"].startswith("tests/test_memory_monitor.py:")
+        assert report[section][0]["growth_mb"] > 2
+    assert "MB traced" in monitor.summary()
+
+
+def test_browser_memory_is_reported_apart_from_python(run_metrics):
+    """Child processes (chromedriver and Chrome) are summed separately from this process"""
+    monitor = MemoryMonitor(run_metrics=run_metrics)
+    usage = {os.getpid(): 100 * MB, 4001: 20 * MB, 4002: 300 * MB}
+    with patch("opal.memory_monitor.process_tree_rss", return_value=usage):
+        monitor.sample()
+    with patch("opal.memory_monitor.process_tree_rss", return_value={os.getpid(): 90 * MB}):
+        monitor.sample()
+
+    report = monitor.report()
+    assert report["samples"] == 2
+    assert report["python_rss_mb"] == {"peak": 100.0, "last": 90.0}
+    assert report["browser_rss_mb"] == {"peak": 320.0, "last": 0.0}
+
+
+def test_stage_listeners_see_both_boundaries(run_metrics):
+    """Listeners are called when a timed block starts and when it ends, until removed"""
+    calls = []
+    listener = lambda stage, finished: calls.append((stage, finished))
+    run_metrics.add_stage_listener(listener)
+    with run_metrics.timer("parse"):
+        pass
+    run_metrics.remove_stage_listener(listener)
+    with run_metrics.timer("parse"):
+        pass
+    assert calls == [("parse", False), ("parse", True)]
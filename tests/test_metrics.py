@@ -0,0 +1,68 @@
+"""Tests for run metrics"""
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from opal import metrics
+from opal.metrics import Histogram, RunMetrics
+from opal.output_writers import JsonLinesWriter
+from opal.parser_module import Parser1819
+
+
+@pytest.fixture
+def run_metrics():
+    metrics.get_metrics().reset()
+    yield metrics.get_metrics()
+    metrics.get_metrics().reset()
+
+
+def test_histogram_buckets_and_quantiles():
+    """Observations land in cumulative buckets and quantiles use bucket bounds"""
+    histogram = Histogram((1, 5, 10))
+    for value in (0.5, 2, 3, 4, 7, 50):
+        histogram.observe(value)
+
+    assert list(histogram.cumulative()) == [(1, 1), (5, 4), (10, 5), ("+Inf", 6)]
+    assert histogram.quantile(0.5) == 5
+    assert histogram.quantile(0.99) == 50
+    assert histogram.to_dict()["mean"] == pytest.approx(66.5 / 6)
+
+
+def test_report_and_prometheus_text(tmp_path):
+    """Stages are reported with their counters and histograms in both formats"""
+    run = RunMetrics()
+    run.add("fetch", "bytes", 2048)
+    run.observe("fetch", "seconds", 0.2)
+    run.observe("parse", "rows", 25)
+    with run.timer("parse"):
+        pass
+
+    report_path = str(tmp_path / "report.json")
+    run.write_report(report_path, command="test")
+    with open(report_path, encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["command"] == "test"
+    assert report["stages"]["fetch"]["counters"] == {"bytes": 2048}
+    assert report["stages"]["fetch"]["seconds"]["p50"] == 0.2
+    assert report["stages"]["parse"]["rows"]["buckets"]["25"] == 1
+
+    text = run.prometheus_text()
+    assert '# TYPE opal_stage_seconds histogram' in text
+    assert 'opal_stage_seconds_bucket{stage="fetch",le="0.25"} 1' in text
+    assert 'opal_stage_rows_count{stage="parse"} 1' in text
+    assert 'opal_stage_bytes_total{stage="fetch"} 2048' in text
+
+
+def test_fetch_parse_and_write_are_recorded(run_metrics, tmp_path):
+    """Article fetches, parses and writes feed the process-wide metrics"""
+    response = MagicMock(content=b"<html>ok</html>", text="<html>ok</html>")
+    with patch('opal.parser_module.requests.get', return_value=response), \
+         patch.object(Parser1819, 'parse_article', return_value={"title": "A"}):
+        articles = list(Parser1819().iter_articles(["https://example.com/a1", "https://example.com/a2"]))
+    with JsonLinesWriter(str(tmp_path / "out.jsonl")) as writer:
+        writer.write_many(articles)
+
+    report = run_metrics.report()["stages"]
+    assert report["fetch"]["counters"] == {"bytes": 30, "requests": 2}
+    assert report["fetch"]["seconds"]["count"] == 2
+    assert report["parse"]["seconds"]["count"] == 2
+    assert report["write"]["counters"] == {"records": 2}
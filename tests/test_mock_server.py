@@ -0,0 +1,78 @@
+"""Tests for the local mock news and court portal server"""
+import json
+import pytest
+import requests
+from unittest.mock import patch
+from opal.court_case_parser import ParserAppealsAL
+from opal.court_url_paginator import build_court_url, is_court_url
+from opal.mock_server import MockSiteConfig, MockSiteServer
+from opal.parser_module import Parser1819, ParserDailyNews
+from opal.synthetic_corpus import court_case
+from opal.url_catcher_module import get_all_news_urls
+
+
+@pytest.fixture
+def server():
+    config = MockSiteConfig(articles=45, links_per_page=20, court_cases=60, javascript=False)
+    with MockSiteServer(config) as mock_server:
+        yield mock_server
+
+
+@patch('opal.url_catcher_module.time.sleep')
+def test_news_site_lists_and_serves_every_article(mock_sleep, server):
+    """get_all_news_urls pages through the listing and each article parses"""
+    base_url = f"{server.url}/sites/1819"
+    urls = get_all_news_urls(base_url, "/news/item", max_pages=10)
+
+    assert len(urls) == 45
+    articles = list(Parser1819().iter_articles(urls[:3]))
+    assert [article["url"] for article in articles] == urls[:3]
+    assert all(article["line_count"] > 0 for article in articles)
+    assert server.stats["listing"] == 3
+    assert server.stats["not_found"] == 1
+
+
+@patch('opal.url_catcher_module.time.sleep')
+def test_daily_news_site(mock_sleep, server):
+    """The Daily News mock serves articles in that site's markup"""
+    urls = get_all_news_urls(f"{server.url}/sites/daily", "/news/", max_pages=1)
+
+    assert len(urls) == 20
+    article = next(ParserDailyNews().iter_articles(urls[:1]))
+    assert article["author"] != "Unknown Author"
+
+
+def test_court_pages_follow_criteria_pagination(server):
+    """Court pages serve the rows of the page and size in the criteria"""
+    search_url = server.court_search_url(page_size=25)
+    assert is_court_url(search_url)
+
+    parser = ParserAppealsAL()
+    pages = [parser.parse_results_html(requests.get(build_court_url(search_url, page), timeout=5).text)["cases"]
+             for page in range(4)]
+
+    assert [len(cases) for cases in pages] == [25, 25, 10, 0]
+    assert pages[2][0] == court_case(50)
+
+
+def test_javascript_court_page_embeds_cases_and_totals():
+    """The portal-like page builds its table in the browser and rewrites the URL with totals"""
+    with MockSiteServer(MockSiteConfig(court_cases=30)) as mock_server:
+        html = requests.get(mock_server.court_search_url(page_size=25), timeout=5).text
+
+    assert "<table" not in html
+    data = json.loads(html.split("var data = ", 1)[1].split(";\n", 1)[0])
+    assert data["cases"][0] == court_case(0)
+    assert "totalElements~30~totalPages~2" in data["url"]
+
+
+def test_error_rate_and_recorded_files():
+    """Injected errors answer 503 and recorded fixtures are replayed"""
+    with MockSiteServer(MockSiteConfig(error_rate=1)) as failing:
+        assert requests.get(f"{failing.url}/sites/1819", timeout=5).status_code == 503
+        assert Parser1819()._request(f"{failing.url}/recorded/sample_1819_article.html") is None
+        assert requests.get(f"{failing.url}/stats", timeout=5).json()["errors"] == 2
+
+    with MockSiteServer() as mock_server:
+        html = requests.get(f"{mock_server.url}/recorded/sample_1819_article.html", timeout=5).text
+    assert "author-date" in html
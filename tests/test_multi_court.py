@@ -0,0 +1,46 @@
+"""Tests for concurrent extraction of several courts"""
+import threading
+import pytest
+from unittest.mock import patch
+from opal.configurable_court_extractor import extract_multiple_courts, parse_court_list
+from opal.court_id_cache import CourtIdCache
+
+COURT_IDS = {
+    "civil": "68f021c4-6a44-4735-9a76-5360b2e8af13",
+    "criminal": "11111111-2222-3333-4444-555555555555",
+    "supreme": "66666666-7777-8888-9999-000000000000",
+}
+
+
+def test_parse_court_list():
+    """--court accepts one court, a list or all"""
+    assert parse_court_list("all") == ["civil", "criminal", "supreme"]
+    assert parse_court_list("supreme, civil,civil") == ["supreme", "civil"]
+    with pytest.raises(ValueError):
+        parse_court_list("civil,federal")
+
+
+def test_extract_multiple_courts_merges_tagged_results(tmp_path):
+    """Courts share one builder and rate limiter, run concurrently and are merged in order"""
+    cache_path = str(tmp_path / "ids.json")
+    CourtIdCache(cache_path).save(COURT_IDS, {})
+    calls = []
+    started = threading.Barrier(3, timeout=5)
+
+    def extract(court, search_builder, rate_limiter, save_output, **kwargs):
+        calls.append((court, search_builder, rate_limiter, save_output))
+        started.wait()
+        return {"status": "success", "total_cases": 1, "page_size": 100,
+                "cases": [{"case_number": {"text": f"{court}-1"}}]}
+
+    with patch('opal.configurable_court_extractor.extract_court_cases_with_params', side_effect=extract), \
+         patch('opal.configurable_court_extractor.save_court_results') as mock_save:
+        result = extract_multiple_courts(["civil", "criminal", "supreme"], court_id_cache_path=cache_path,
+                                         output_prefix=str(tmp_path / "out"))
+
+    assert len({id(call[1]) for call in calls}) == 1
+    assert len({id(call[2]) for call in calls}) == 1
+    assert not any(call[3] for call in calls)
+    assert [case["court_key"] for case in result["cases"]] == ["civil", "criminal", "supreme"]
+    assert result["courts"]["criminal"]["total_cases"] == 1
+    mock_save.assert_called_once()
@@ -0,0 +1,75 @@
+"""Tests for the streaming output writers"""
+import json
+import pytest
+from unittest.mock import patch
+from opal.integrated_parser import IntegratedParser
+from opal.output_writers import JsonLinesWriter, TaggedWriter
+from opal.parser_module import Parser1819
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_jsonl_writer_streams_records_and_manifest(tmp_path):
+    """Records are readable before close and the manifest carries the summary"""
+    path = str(tmp_path / "cases.jsonl")
+    writer = JsonLinesWriter(path, fsync_every=2)
+
+    writer.write_many([{"n": 1}, {"n": 2, "title": "café"}])
+    assert read_lines(path) == [{"n": 1}, {"n": 2, "title": "café"}]
+    assert read_json(writer.manifest_path)["status"] == "running"
+
+    writer.write({"n": 3})
+    writer.close({"total_cases": 3})
+
+    manifest = read_json(str(tmp_path / "cases.manifest.json"))
+    assert manifest["status"] == "complete"
+    assert manifest["records"] == 3
+    assert manifest["summary"] == {"total_cases": 3}
+    assert len(read_lines(path)) == 3
+
+
+def test_jsonl_writer_keeps_partial_results_on_error(tmp_path):
+    """A failure keeps the records written so far and marks the manifest failed"""
+    path = str(tmp_path / "cases.jsonl")
+    with pytest.raises(RuntimeError):
+        with JsonLinesWriter(path) as writer:
+            writer.write({"n": 1})
+            raise RuntimeError("page 90 failed")
+
+    assert read_lines(path) == [{"n": 1}]
+    manifest = read_json(writer.manifest_path)
+    assert manifest["status"] == "failed"
+    assert manifest["summary"]["error"] == "page 90 failed"
+
+
+def test_tagged_writer_adds_fields(tmp_path):
+    """Tagged writers add their fields without changing the original record"""
+    path = str(tmp_path / "cases.jsonl")
+    record = {"case_number": {"text": "CL-1"}}
+    with JsonLinesWriter(path) as writer:
+        TaggedWriter(writer, court_key="civil").write(record)
+
+    assert read_lines(path) == [{"case_number": {"text": "CL-1"}, "court_key": "civil"}]
+    assert "court_key" not in record
+
+
+@patch('opal.integrated_parser.get_all_news_urls')
+def test_iter_records_yields_articles_one_at_a_time(mock_get_urls):
+    """News articles are fetched and parsed lazily"""
+    mock_get_urls.return_value = ["https://example.com/a1", "https://example.com/a2"]
+    parser = IntegratedParser(Parser1819)
+
+    with patch.object(Parser1819, '_request', side_effect=["<html>1</html>", None]) as mock_request, \
+         patch.object(Parser1819, 'parse_article', return_value={"title": "Article 1"}):
+        records = parser.iter_records("https://example.com", "/article", 1)
+        assert next(records) == {"title": "Article 1", "url": "https://example.com/a1"}
+        assert mock_request.call_count == 1
+        assert list(records) == []
@@ -0,0 +1,52 @@
+"""Tests for the Parquet export"""
+import datetime
+import pytest
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from opal.output_writers import open_writer
+from opal.parquet_output import ParquetWriter, article_to_row
+
+
+def test_cases_have_typed_columns(make_case, tmp_path):
+    """Dates are parsed, categories dictionary encoded and case numbers split"""
+    path = str(tmp_path / "cases.parquet")
+    with ParquetWriter(path) as writer:
+        writer.write_many([make_case(1), make_case(2, filed_date="", status="Closed")])
+
+    table = pq.read_table(path)
+    assert str(table.schema.field("court").type).startswith("dictionary")
+    assert str(table.schema.field("status").type).startswith("dictionary")
+    rows = table.to_pylist()
+    assert rows[0]["filed_date"] == datetime.date(2025, 6, 10)
+    assert rows[0]["case_number"] == "CL-2025-0001"
+    assert rows[0]["case_link"] == "https://publicportal.alappeals.gov/portal/case/1"
+    assert rows[1]["filed_date"] is None
+
+
+def test_pages_become_row_groups(make_case, tmp_path):
+    """Pages are written as row groups while the run is going"""
+    path = str(tmp_path / "cases.parquet")
+    writer = ParquetWriter(path, row_group_size=3)
+    writer.write_many([make_case(i) for i in range(3)])
+    writer.write_many([make_case(i) for i in range(3, 5)])
+    assert writer.row_groups == 1
+    writer.close()
+
+    assert pq.ParquetFile(path).num_row_groups == 2
+    assert pq.read_table(path).num_rows == 5
+
+
+def test_articles_export(tmp_path):
+    """Article lines are kept in order and byline dates are parsed"""
+    article = {"url": "https://example.com/a", "title": "A", "author": "Jane", "date": "June 10, 2025",
+               "line_count": 2, "line_content": {"line 2": "second", "line 1": "first"}}
+    assert article_to_row(article)["lines"] == ["first", "second"]
+
+    writer = open_writer("parquet", str(tmp_path / "articles"), record_type="articles")
+    writer.write(article)
+    writer.close()
+
+    row = pq.read_table(writer.path).to_pylist()[0]
+    assert row["date"] == datetime.date(2025, 6, 10)
+    assert row["lines"] == ["first", "second"]
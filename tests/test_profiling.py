@@ -0,0 +1,72 @@
+"""Tests for the profiling hooks"""
+import argparse
+import os
+import pstats
+import threading
+import pytest
+from unittest.mock import patch
+from opal import metrics
+from opal.profiling import ProfileSession, StackSampler, add_instrumentation_arguments, start_instrumentation
+
+
+def test_sampler_tags_stacks_with_active_stage():
+    """Sampled stacks of other threads start with the thread name and its current stage"""
+    entered = threading.Event()
+    release = threading.Event()
+
+    def worker():
+        with metrics.timer("page_load"):
+            entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=worker, name="court-civil")
+    thread.start()
+    entered.wait(5)
+    sampler = StackSampler()
+    sampler.sample()
+    release.set()
+    thread.join()
+
+    worker_stacks = [stack for stack in sampler.stacks if stack.startswith("court-civil;")]
+    assert len(worker_stacks) == 1
+    frames = worker_stacks[0].split(";")
+    assert frames[1] == "stage:page_load"
+    assert "test_profiling.py:worker" in frames
+    assert sampler.samples == 1
+    assert metrics.get_metrics().active_stages().get(thread.ident) is None
+
+
+def test_profile_session_writes_pstats_and_collapsed_stacks(tmp_path, capsys):
+    """A session writes loadable cProfile stats and the sampled stacks"""
+    prefix = str(tmp_path / "run_profile")
+    with ProfileSession(prefix, sample_interval_ms=1):
+        sum(i * i for i in range(200000))
+
+    assert pstats.Stats(f"{prefix}.pstats").total_calls > 0
+    assert os.path.exists(f"{prefix}.collapsed")
+    with open(f"{prefix}.collapsed", encoding="utf-8") as f:
+        for line in f:
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) > 0
+            assert ";stage:" in stack
+    assert "Profile saved to" in capsys.readouterr().out
+
+
+def test_instrumentation_arguments_start_what_is_asked_for():
+    """The shared options reject a bad sample interval and start profiling with the command's prefix"""
+    parser = argparse.ArgumentParser()
+    add_instrumentation_arguments(parser, "extract_all_court_cases")
+    with pytest.raises(SystemExit):
+        start_instrumentation(parser, parser.parse_args(['--profile', '--profile-sample-ms', '0']),
+                              "extract_all_court_cases")
+
+    args = parser.parse_args(['--profile', '--report', 'run.json'])
+    with patch('opal.profiling.metrics.write_run_outputs_at_exit') as mock_outputs, \
+            patch('opal.profiling.profile_until_exit') as mock_profile, \
+            patch('opal.profiling.monitor_memory_until_exit') as mock_memory:
+        start_instrumentation(parser, args, "extract_all_court_cases")
+
+    assert mock_outputs.call_args.args == ("run.json", None)
+    assert mock_outputs.call_args.kwargs["command"] == "extract_all_court_cases"
+    assert mock_profile.call_args.args[0].startswith("extract_all_court_cases_profile_")
+    mock_memory.assert_not_called()
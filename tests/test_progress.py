@@ -0,0 +1,94 @@
+"""Tests for progress, throughput and ETA reporting"""
+import io
+import json
+import logging
+import pytest
+from unittest.mock import patch
+from opal import metrics
+from opal.log_config import configure_logging
+from opal.progress import ProgressTracker, configure_progress, format_duration
+
+
+@pytest.fixture(autouse=True)
+def reset_progress():
+    metrics.get_metrics().reset()
+    yield
+    configure_progress("auto")
+    logger = logging.getLogger("opal")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.setLevel(logging.NOTSET)
+    logger.propagate = True
+
+
+def test_rate_remaining_and_eta():
+    """Rates count only this run's items and bytes; the ETA follows from the rate"""
+    configure_progress("off")
+    with patch("opal.progress.time.monotonic", return_value=100.0):
+        progress = ProgressTracker("civil", total=40, done=10)
+    metrics.add("page_load", "bytes", 20000)
+    progress.update(items=5, records=125)
+
+    with patch("opal.progress.time.monotonic", return_value=110.0):
+        figures = progress.snapshot()
+    assert figures["done"] == 15
+    assert figures["remaining"] == 25
+    assert figures["records"] == 125
+    assert figures["items_per_second"] == 0.5
+    assert figures["bytes_per_second"] == 2000.0
+    assert figures["eta_seconds"] == 50.0
+
+
+def test_unknown_total_has_no_eta():
+    """Without a total the ETA is unknown until set_total provides one"""
+    configure_progress("off")
+    progress = ProgressTracker("articles")
+    progress.update()
+    assert progress.snapshot()["eta_seconds"] is None
+    assert "ETA ?" in progress.status_line()
+
+    progress.set_total(4)
+    assert progress.snapshot()["remaining"] == 3
+
+
+def test_terminal_line_is_redrawn_and_shared():
+    """Active trackers share one line that is redrawn in place and ended with a newline"""
+    stream = io.StringIO()
+    configure_progress("tty", stream)
+    civil = ProgressTracker("civil", total=4, interval_seconds=0)
+    criminal = ProgressTracker("criminal", total=2, interval_seconds=0)
+    civil.update()
+    criminal.update()
+    criminal.finish()
+    civil.finish()
+
+    output = stream.getvalue()
+    assert "\n" not in output.split("\r")[2]
+    assert "civil 1/4 pages 25%" in output.split("\r")[2]
+    assert "criminal 1/2 pages 50%" in output.split("\r")[2]
+    assert output.endswith("\n")
+    assert output.count("\n") == 2
+
+
+def test_log_records_are_periodic_with_fields():
+    """Without a terminal progress is logged at most once per interval, with the figures as fields"""
+    log_stream = io.StringIO()
+    configure_logging("INFO", "json", stream=log_stream)
+    configure_progress("auto", io.StringIO())
+    progress = ProgressTracker("Articles", total=10, unit="articles", interval_seconds=60)
+    for _ in range(10):
+        progress.update(records=1)
+    progress.finish()
+
+    records = [json.loads(line) for line in log_stream.getvalue().splitlines()]
+    assert [record["done"] for record in records] == [1, 10]
+    assert records[-1]["remaining"] == 0
+    assert records[-1]["label"] == "Articles"
+    assert records[-1]["message"].startswith("Articles 10/10 articles 100%")
+
+
+def test_format_duration():
+    assert format_duration(None) == "?"
+    assert format_duration(45) == "45s"
+    assert format_duration(188) == "3m08s"
+    assert format_duration(7500) == "2h05m"
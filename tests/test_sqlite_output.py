@@ -0,0 +1,51 @@
+"""Tests for the SQLite storage backend"""
+import json
+import sqlite3
+from opal.output_writers import open_writer
+from opal.sqlite_output import SQLiteWriter, canonical_url
+
+
+def test_cases_are_upserted_across_runs(make_case, tmp_path):
+    """A case seen again updates its row and both runs are recorded"""
+    path = str(tmp_path / "opal.db")
+    with SQLiteWriter(path) as writer:
+        writer.write_many([make_case(1), make_case(2)])
+    with SQLiteWriter(path) as writer:
+        writer.write_many([make_case(2, status="Closed"), make_case(3), {"case_number": {"text": ""}}])
+        writer.close({"court": "civil"})
+
+    db = sqlite3.connect(path)
+    rows = db.execute("SELECT case_number, status, filed_date, first_run_id, last_run_id "
+                      "FROM cases ORDER BY case_number").fetchall()
+    assert rows == [
+        ("CL-2025-0001", "Open", "2025-06-10", 1, 1),
+        ("CL-2025-0002", "Closed", "2025-06-10", 1, 2),
+        ("CL-2025-0003", "Open", "2025-06-10", 2, 2),
+    ]
+    runs = db.execute("SELECT status, records, summary FROM runs ORDER BY id").fetchall()
+    assert [run[0] for run in runs] == ["complete", "complete"]
+    assert json.loads(runs[1][2]) == {"court": "civil", "skipped_without_key": 1}
+    assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {row[1] for row in db.execute("PRAGMA index_list(cases)")}
+    assert {"idx_cases_filed_date", "idx_cases_court", "idx_cases_status"} <= indexes
+
+
+def test_articles_are_keyed_by_canonical_url(tmp_path):
+    """The same article under a different URL spelling is stored once"""
+    writer = open_writer("sqlite", str(tmp_path / "ignored"), record_type="articles",
+                         database_path=str(tmp_path / "news.db"))
+    writer.write({"url": "https://1819News.com/news/item/story/?utm_source=x", "title": "Old",
+                  "date": "June 10, 2025", "line_count": 1, "line_content": {"line 1": "a"}})
+    writer.write({"url": "https://1819news.com/news/item/story#comments", "title": "New",
+                  "date": "June 10, 2025", "line_count": 1, "line_content": {"line 1": "a"}})
+    writer.close()
+
+    db = sqlite3.connect(str(tmp_path / "news.db"))
+    assert db.execute("SELECT url, title, published_date FROM articles").fetchall() == [
+        ("https://1819news.com/news/item/story", "New", "2025-06-10")
+    ]
+
+
+def test_canonical_url_keeps_meaningful_query():
+    """Only tracking parameters are removed from the query"""
+    assert canonical_url("HTTPS://Example.com/a/?id=5&utm_medium=m&fbclid=z") == "https://example.com/a?id=5"
@@ -0,0 +1,64 @@
+"""Tests for the synthetic corpus generator"""
+import pytest
+from opal.benchmark import measure_scaling
+from opal.court_case_parser import ParserAppealsAL
+from opal.parser_module import Parser1819, ParserDailyNews
+from opal.synthetic_corpus import (
+    article_html, article_url, court_case, court_results_html, iter_documents, listing_html, write_corpus
+)
+from opal.url_catcher_module import filter_news_links
+
+
+@pytest.mark.parametrize("kind, parser_class", [("1819", Parser1819), ("daily", ParserDailyNews)])
+def test_articles_parse_with_site_parsers(kind, parser_class):
+    """Generated articles carry the title, byline and paragraphs each parser reads"""
+    html = article_html(kind, 7, seed=3, paragraphs=6)
+    article = parser_class().parse_article(html, article_url(kind, 7, seed=3))
+
+    assert article["title"]
+    assert article["author"] != "Unknown Author"
+    assert article["date"] not in ("", "Unknown Date")
+    assert article["line_count"] >= 6
+    assert html == article_html(kind, 7, seed=3, paragraphs=6)
+    assert html != article_html(kind, 8, seed=3, paragraphs=6)
+
+
+def test_listing_pages_link_consecutive_articles():
+    """Each listing page links its own articles once after duplicate filtering"""
+    seen = set()
+    page_1 = filter_news_links(listing_html("1819", 1, 5), "https://1819news.com", "https://1819news.com",
+                               "/news/item", seen)
+    page_2 = filter_news_links(listing_html("1819", 2, 5, total_pages=2), "https://1819news.com/page/2",
+                               "https://1819news.com", "/news/item", seen)
+
+    assert page_1 == [article_url("1819", index) for index in range(5)]
+    assert page_2 == [article_url("1819", index) for index in range(5, 10)]
+    assert "Next" in listing_html("1819", 1, 5, total_pages=2)
+    assert "Next" not in listing_html("1819", 2, 5, total_pages=2)
+
+
+def test_court_pages_parse_into_generated_cases():
+    """Results tables parse back into exactly the generated cases"""
+    cases = ParserAppealsAL().parse_results_html(court_results_html(100, 30, total_elements=1000))["cases"]
+
+    assert cases == [court_case(index) for index in range(100, 130)]
+
+
+def test_iter_documents_splits_corpus_into_pages(tmp_path):
+    """Corpus sizes count articles, links or cases, split into pages as needed"""
+    assert [items for _, _, items in iter_documents("court", 1200, page_size=500)] == [500, 500, 200]
+    assert [items for _, _, items in iter_documents("listing", 45, links_per_page=20)] == [20, 20, 5]
+    assert len(list(iter_documents("daily", 3))) == 3
+
+    paths = write_corpus("1819", 2, str(tmp_path / "corpus"))
+    assert [path.rsplit("/", 1)[1] for path in paths] == ["1819_article_0000000.html", "1819_article_0000001.html"]
+
+
+def test_measure_scaling_reports_items_and_time():
+    """A scaling point counts every generated item and the results kept"""
+    point = measure_scaling("court", 250, keep=True)
+
+    assert point["documents"] == 1
+    assert point["items"] == 250
+    assert point["kept"] == 1
+    assert point["parse_seconds"] >= 0